@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+基准测试脚本
+在合成项目上测量各脚本的耗时、峰值内存与吞吐，
+结果保存为 JSON 基线，后续运行可与之对比
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'scripts'))
+sys.path.insert(0, str(BENCH_DIR))
+
+from synthetic_repo import SIZE_PRESETS, generate_repo  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# 默认回归阈值: 耗时增加超过 20% 视为回归
+DEFAULT_THRESHOLD = 0.2
+
+CODE_SUFFIXES = ('.py', '.ts', '.tsx', '.js', '.jsx')
+
+
+def _code_files(root: Path) -> List[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in ('node_modules', '.mini-wiki', '.git')]
+        files.extend(os.path.join(dirpath, f) for f in filenames if f.endswith(CODE_SUFFIXES))
+    return sorted(files)
+
+
+def bench_analyze_project(root: Path) -> int:
+    from analyze_project import analyze_project
+    return analyze_project(str(root), save_to_cache=False)['stats']['total_files']
+
+
+def bench_detect_changes(root: Path) -> int:
+    from detect_changes import detect_changes
+    # 只测量校验和检测，符号提取由 extract_docs 测试覆盖
+    return len(detect_changes(str(root), track_symbols=False)['current_checksums'])
+
+
+def bench_detect_changes_warm(root: Path) -> int:
+    from detect_changes import detect_changes
+    return len(detect_changes(str(root), track_symbols=False)['current_checksums'])
+
+
+def setup_detect_changes_warm(root: Path) -> None:
+    """写入校验和缓存，使测量覆盖 stat 快速路径"""
+    from detect_changes import detect_changes, update_checksums_cache
+    changes = detect_changes(str(root), track_symbols=False)
+    update_checksums_cache(str(root), changes['current_checksums'],
+                           file_stats=changes['current_stats'])
+
+
+def bench_extract_docs(root: Path) -> int:
+    from extract_docs import extract_docs_from_file
+    files = _code_files(root)
+    for file_path in files:
+        extract_docs_from_file(file_path)
+    return len(files)
+
+
+def bench_generate_toc(root: Path) -> int:
+    from generate_toc import generate_toc
+    wiki = root / '.mini-wiki' / 'wiki'
+    generate_toc(str(wiki))
+    return sum(1 for _ in wiki.rglob('*.md'))
+
+
+def bench_check_wiki_quality(root: Path) -> int:
+    from check_quality import check_wiki_quality
+    return check_wiki_quality(str(root / '.mini-wiki')).total_docs
+
+
+# 名称 -> (测量函数, 准备函数)
+BENCHMARKS: Dict[str, Any] = {
+    'analyze_project': (bench_analyze_project, None),
+    'detect_changes': (bench_detect_changes, None),
+    'detect_changes_warm': (bench_detect_changes_warm, setup_detect_changes_warm),
+    'extract_docs': (bench_extract_docs, None),
+    'generate_toc': (bench_generate_toc, None),
+    'check_wiki_quality': (bench_check_wiki_quality, None),
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def run_single(name: str, root: str) -> Dict[str, Any]:
+    """执行单个基准测试 (通常在独立子进程中运行，保证峰值内存互不影响)"""
+    bench, setup = BENCHMARKS[name]
+    if setup is not None:
+        setup(Path(root))
+
+    started = time.perf_counter()
+    files = bench(Path(root))
+    wall = time.perf_counter() - started
+    return {
+        'wall_seconds': round(wall, 4),
+        'peak_rss_mb': _peak_rss_mb(),
+        'files': files,
+        'files_per_sec': round(files / wall, 1) if wall > 0 else None,
+    }
+
+
+def run_benchmarks(root: Path, names: Optional[List[str]] = None, isolate: bool = True,
+                   log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    在已生成的合成项目上运行基准测试
+
+    Args:
+        root: 合成项目目录
+        names: 要运行的测试名称，默认全部
+        isolate: 每个测试在独立子进程中运行 (峰值内存才有意义)
+        log: 进度输出函数
+
+    Returns:
+        基线数据
+    """
+    names = names or list(BENCHMARKS)
+    results = {}
+    # 项目已有的缓存先移到一旁，测试结束后原样恢复；期间只清理测试自己写入的缓存
+    cache_dir = Path(root) / '.mini-wiki' / 'cache'
+    saved_cache = cache_dir.with_name(f'cache.bench-{os.getpid()}')
+    if cache_dir.exists():
+        cache_dir.rename(saved_cache)
+    try:
+        for name in names:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    result = executor.submit(run_single, name, str(root)).result()
+            else:
+                result = run_single(name, str(root))
+            results[name] = result
+            log(f"  {name:<22} {result['wall_seconds']:>8.3f}s  "
+                f"{result['files_per_sec'] or 0:>10.0f} files/s  "
+                f"{result['peak_rss_mb'] or 0:>7.1f} MB")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if saved_cache.exists():
+            saved_cache.rename(cache_dir)
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    对比本次结果与基线
+
+    Returns:
+        [{"name", "baseline", "current", "ratio", "regression"}]
+    """
+    rows = []
+    for name, result in current.get('results', {}).items():
+        old = baseline.get('results', {}).get(name)
+        if not old or not old.get('wall_seconds'):
+            continue
+        ratio = result['wall_seconds'] / old['wall_seconds']
+        rows.append({
+            'name': name,
+            'baseline': old['wall_seconds'],
+            'current': result['wall_seconds'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 基准测试")
+    parser.add_argument("--size", choices=sorted(SIZE_PRESETS), default="small",
+                        help="合成项目预设规模 (small=1k, medium=10k, large=100k 文件)")
+    parser.add_argument("--files", type=int, default=None, help="源文件数 (覆盖 --size)")
+    parser.add_argument("--repo", default=None, help="复用已生成的合成项目目录")
+    parser.add_argument("--only", default=None, help="只运行指定测试，逗号分隔")
+    parser.add_argument("--output", default=None, help="将结果保存为 JSON 基线")
+    parser.add_argument("--compare", default=None, help="与已有 JSON 基线对比")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="判定回归的耗时增幅 (默认 0.2 即 20%%)")
+    parser.add_argument("--no-isolate", action="store_true", help="在当前进程中运行 (不测量独立峰值内存)")
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else None
+    unknown = [n for n in names or [] if n not in BENCHMARKS]
+    if unknown:
+        print(f"❌ 未知测试: {', '.join(unknown)}")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='mini-wiki-bench-') as tmp:
+        root = Path(args.repo) if args.repo else Path(tmp) / 'repo'
+        repo_info = None
+        if not root.exists():
+            total = args.files or SIZE_PRESETS[args.size]
+            print(f"🏗️ 生成合成项目: {total} 个文件")
+            repo_info = generate_repo(root, total)
+
+        print("⏱️ 运行基准测试:")
+        data = run_benchmarks(root, names, isolate=not args.no_isolate)
+        data['repo'] = repo_info
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"📄 结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_results(data, baseline, args.threshold)
+        print("\n| 测试 | 基线 (s) | 本次 (s) | 比例 |")
+        print("|------|----------|----------|------|")
+        for row in rows:
+            flag = ' ⚠️' if row['regression'] else ''
+            print(f"| {row['name']} | {row['baseline']:.3f} | {row['current']:.3f} | {row['ratio']:.2f}{flag} |")
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
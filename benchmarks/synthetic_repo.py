@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+合成项目生成器
+按指定规模生成 TS/Python 混合的 monorepo，用于基准测试
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Dict
+
+# 预设规模 (文件数)
+SIZE_PRESETS = {
+    'small': 1_000,
+    'medium': 10_000,
+    'large': 100_000,
+}
+
+PY_TEMPLATE = '''"""
+{module} 模块
+
+{paragraph}
+"""
+
+import os
+from typing import Any, Dict, List
+
+from .{sibling} import helper_{sibling}
+
+
+class {cls}:
+    """
+    {cls} 服务
+
+    {paragraph}
+
+    Args:
+        name (str): 名称
+        options (dict): 选项
+    """
+
+    def __init__(self, name: str, options: Dict[str, Any]):
+        self.name = name
+        self.options = options
+
+    def run(self, items: List[str]) -> int:
+        """
+        处理条目
+
+        Args:
+            items (list): 条目列表
+
+        Returns:
+            int: 处理数量
+        """
+        return len(items)
+
+
+def helper_{module}(value: int, scale: float = 1.0) -> float:
+    """
+    {paragraph}
+
+    Args:
+        value (int): 输入值
+        scale (float): 缩放系数
+
+    Returns:
+        float: 计算结果
+    """
+    return value * scale
+'''
+
+TS_TEMPLATE = '''import {{ helper{sibling} }} from './{sibling}';
+import {{ useState }} from 'react';
+
+/**
+ * {cls} 组件配置
+ * {paragraph}
+ */
+export interface {cls}Options {{
+  name: string;
+  retries: number;
+}}
+
+/**
+ * {paragraph}
+ * @param {{string}} name - 名称
+ * @param {{number}} count - 数量
+ * @returns {{number}} 结果
+ */
+export function {module}(name: string, count: number): number {{
+  const label = `${{name}}:${{count}}`;
+  return label.length + helper{sibling}(count);
+}}
+
+/**
+ * {cls} 服务
+ */
+export class {cls} {{
+  constructor(private readonly options: {cls}Options) {{}}
+
+  /**
+   * 执行任务
+   * @param {{string[]}} items - 条目
+   * @returns {{number}} 数量
+   */
+  run(items: string[]): number {{
+    return items.length;
+  }}
+}}
+
+export const {module}Hook = () => useState(0);
+'''
+
+WORDS = ('module', 'service', 'cache', 'render', 'parse', 'index', 'graph', 'token',
+         'stream', 'batch', 'config', 'router', 'handler', 'store', 'query')
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    lines = []
+    for _ in range(sentences):
+        lines.append(' '.join(rng.choice(WORDS) for _ in range(12)) + '.')
+    return '\n    '.join(lines)
+
+
+def generate_repo(root: Path, total_files: int, packages: int = 0, seed: int = 42,
+                  docstring_sentences: int = 8) -> Dict[str, int]:
+    """
+    生成合成项目
+
+    Args:
+        root: 输出目录
+        total_files: 源文件总数 (约一半 Python，一半 TypeScript)
+        packages: monorepo 包数量，0 表示按文件数自动计算
+        seed: 随机种子，保证结果可复现
+        docstring_sentences: 每个文档注释的句子数
+
+    Returns:
+        {"files": 源文件数, "packages": 包数, "wiki_pages": wiki 页面数}
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    if packages <= 0:
+        packages = max(1, total_files // 200)
+
+    (root / 'package.json').write_text('{"name": "synthetic", "workspaces": ["packages/*"]}\n')
+    (root / 'pyproject.toml').write_text('[project]\nname = "synthetic"\n')
+    (root / 'README.md').write_text('# Synthetic\n\nGenerated benchmark project.\n')
+    (root / '.gitignore').write_text('dist/\n*.gen.ts\n')
+
+    # 应被剪枝的目录
+    (root / 'node_modules' / 'dep').mkdir(parents=True, exist_ok=True)
+    for i in range(20):
+        (root / 'node_modules' / 'dep' / f'f{i}.js').write_text('module.exports = 1;\n')
+
+    files = 0
+    for i in range(total_files):
+        pkg = f'pkg{i % packages}'
+        depth = rng.randint(0, 3)
+        sub = '/'.join(f'd{rng.randint(0, 4)}' for _ in range(depth))
+        directory = root / 'packages' / pkg / 'src' / sub if sub else root / 'packages' / pkg / 'src'
+        directory.mkdir(parents=True, exist_ok=True)
+        module = f'mod{i}'
+        fields = {
+            'module': module,
+            'sibling': f'mod{max(0, i - 1)}',
+            'cls': f'Service{i}',
+            'paragraph': _paragraph(rng, docstring_sentences),
+        }
+        if i % 2:
+            (directory / f'{module}.py').write_text(PY_TEMPLATE.format(**fields), encoding='utf-8')
+        else:
+            (directory / f'{module}.ts').write_text(TS_TEMPLATE.format(**fields), encoding='utf-8')
+        files += 1
+
+    # 生成 wiki 页面供 generate_toc / check_quality 使用
+    wiki = root / '.mini-wiki' / 'wiki'
+    (wiki / 'modules').mkdir(parents=True, exist_ok=True)
+    (wiki / 'index.md').write_text('# Home\n\n[Modules](modules/pkg0.md)\n', encoding='utf-8')
+    for p in range(packages):
+        body = [f'# pkg{p}', '', '## Overview', '', _paragraph(rng, 20), '',
+                '```mermaid', 'flowchart TB', '    A --> B', '```', '',
+                '```python', 'print(1)', '```', '', '| a | b |', '|---|---|', '| 1 | 2 |', '',
+                '[Home](../index.md)']
+        (wiki / 'modules' / f'pkg{p}.md').write_text('\n'.join(body) + '\n', encoding='utf-8')
+
+    return {'files': files, 'packages': packages, 'wiki_pages': packages + 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试用的合成项目")
+    parser.add_argument("output", help="输出目录")
+    parser.add_argument("--size", choices=sorted(SIZE_PRESETS), default="small", help="预设规模")
+    parser.add_argument("--files", type=int, default=None, help="源文件数 (覆盖 --size)")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    total = args.files or SIZE_PRESETS[args.size]
+    info = generate_repo(Path(args.output), total, seed=args.seed)
+    print(f"✅ 已生成 {info['files']} 个源文件, {info['packages']} 个包: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -10,7 +10,12 @@ import os
 import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Container, Dict, List, Optional
+
+import cache_store
+from file_walker import WalkEntry, walk_project
+from path_matcher import PathMatcher
+from wiki_config import load_scan_settings
 
 # 忽略的目录
 IGNORE_DIRS = {
@@ -254,47 +259,60 @@ def find_entry_points(root_path: Path, project_types: List[str]) -> List[str]:
     return entries
 
 
-def discover_modules(root_path: Path, exclude_dirs: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
-    """发现项目模块"""
+def discover_modules(root_path: Path, exclude_dirs: Optional[Container[str]] = None,
+                     entries: Optional[List[WalkEntry]] = None) -> List[Dict[str, Any]]:
+    """
+    发现项目模块
+
+    Args:
+        root_path: 项目根目录
+        exclude_dirs: 排除的目录名 (集合或 ExcludeMatcher)
+        entries: 已有的遍历结果 (来自 walk_project)，为空时重新遍历
+    """
     if exclude_dirs is None:
         exclude_dirs = IGNORE_DIRS
+    if entries is None:
+        entries = walk_project(root_path, exclude_dirs)
+    
+    # 一次遍历统计各级目录下的代码文件数
+    top_counts: Dict[str, int] = {}
+    sub_counts: Dict[str, Dict[str, int]] = {}
+    for entry in entries:
+        if entry.suffix not in CODE_EXTENSIONS:
+            continue
+        parts = entry.rel_path.split(os.sep)
+        if len(parts) < 2:
+            continue
+        top_counts[parts[0]] = top_counts.get(parts[0], 0) + 1
+        if len(parts) > 2:
+            children = sub_counts.setdefault(parts[0], {})
+            children[parts[1]] = children.get(parts[1], 0) + 1
     
     modules = []
     src_dirs = ['src', 'lib', 'packages', 'apps', 'modules']
     
     for src_dir in src_dirs:
-        src_path = root_path / src_dir
-        if not src_path.exists():
-            continue
-        
-        for item in src_path.iterdir():
-            if item.is_dir() and item.name not in exclude_dirs:
-                # 统计文件数
-                file_count = sum(1 for f in item.rglob('*') 
-                               if f.is_file() and f.suffix in CODE_EXTENSIONS
-                               and not any(p in f.parts for p in exclude_dirs))
-                
-                if file_count > 0:
-                    modules.append({
-                        'name': item.name,
-                        'path': str(item.relative_to(root_path)),
-                        'files': file_count,
-                        'type': categorize_module(item.name)
-                    })
+        for name, file_count in sorted(sub_counts.get(src_dir, {}).items()):
+            if name in exclude_dirs:
+                continue
+            modules.append({
+                'name': name,
+                'path': str(Path(src_dir) / name),
+                'files': file_count,
+                'type': categorize_module(name)
+            })
     
     # 如果没有找到明确的模块，尝试根目录下的主要目录
     if not modules:
-        for item in root_path.iterdir():
-            if item.is_dir() and item.name not in exclude_dirs and not item.name.startswith('.'):
-                file_count = sum(1 for f in item.rglob('*') 
-                               if f.is_file() and f.suffix in CODE_EXTENSIONS)
-                if file_count > 0:
-                    modules.append({
-                        'name': item.name,
-                        'path': item.name,
-                        'files': file_count,
-                        'type': categorize_module(item.name)
-                    })
+        for name, file_count in sorted(top_counts.items()):
+            if name in exclude_dirs or name.startswith('.'):
+                continue
+            modules.append({
+                'name': name,
+                'path': name,
+                'files': file_count,
+                'type': categorize_module(name)
+            })
     
     return modules
 
@@ -358,18 +376,27 @@ def analyze_project(project_root: str, save_to_cache: bool = True) -> Dict[str,
     # 发现入口文件
     entry_points = find_entry_points(root, project_types)
     
+    # 读取 config.yaml 中的排除规则与文件大小限制
+    settings = load_scan_settings(project_root, IGNORE_DIRS)
+    matcher = settings.matcher
+    
+    # 单次遍历项目文件，供模块发现与统计共用
+    # .gitignore / .mini-wikiignore 忽略的目录在进入前剪枝
+    path_matcher = PathMatcher(root, matcher)
+    entries = [
+        e for e in walk_project(root, matcher, path_matcher.is_ignored)
+        if not (settings.max_file_size and e.suffix in CODE_EXTENSIONS
+                and e.size > settings.max_file_size)
+    ]
+    
     # 发现模块
-    modules = discover_modules(root)
+    modules = discover_modules(root, exclude_dirs=matcher, entries=entries)
     
     # 发现文档
     docs = find_documentation(root)
     
     # 统计代码文件
-    code_files = []
-    for ext in CODE_EXTENSIONS:
-        for f in root.rglob(f'*{ext}'):
-            if not any(p in f.parts for p in IGNORE_DIRS):
-                code_files.append(str(f.relative_to(root)))
+    code_files = [e.rel_path for e in entries if e.suffix in CODE_EXTENSIONS]
     
     result = {
         'project_name': root.name,
@@ -389,10 +416,7 @@ def analyze_project(project_root: str, save_to_cache: bool = True) -> Dict[str,
     if save_to_cache:
         wiki_dir = root / '.mini-wiki'
         if wiki_dir.exists():
-            cache_path = wiki_dir / 'cache' / 'structure.json'
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            cache_store.save_document(str(wiki_dir), 'structure', result)
     
     return result
 
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+批次规划脚本
+按源码大小、行数与符号数估算每个模块的 token 开销，在 token 预算内
+将模块装箱为批次，并把计划与可恢复的游标写入 cache/progress.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cache_store
+from import_graph import build_module_index, module_of
+from module_priority import ModulePriority, rank_project_modules, save_priority
+from wiki_config import DEFAULT_MAX_BATCH_MODULES, DEFAULT_TOKEN_BUDGET, load_batch_settings
+
+# 阅读源码时每个 token 约对应的字节数
+BYTES_PER_TOKEN = 4
+
+# 生成文档每行约消耗的 token 数
+TOKENS_PER_DOC_LINE = 12
+
+# 每个符号 (函数、类、方法) 的说明与示例约消耗的 token 数
+TOKENS_PER_SYMBOL = 80
+
+# 期望文档行数 = max(MIN_DOC_LINES, 源码行数 × DOC_LINES_RATIO)，与质量检查的行数门槛一致
+MIN_DOC_LINES = 100
+DOC_LINES_RATIO = 0.3
+
+
+@dataclass
+class ModuleCost:
+    """模块的 token 开销估算"""
+    name: str
+    bytes: int
+    lines: int
+    symbols: int
+    tokens: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Batch:
+    """一个批次"""
+    modules: List[str] = field(default_factory=list)
+    estimated_tokens: int = 0
+    oversized: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def estimate_tokens(size: int, lines: int, symbols: int) -> int:
+    """
+    估算为一个模块生成文档的 token 开销
+
+    输入: 读取全部源码 (size / BYTES_PER_TOKEN)；
+    输出: 期望文档行数 × TOKENS_PER_DOC_LINE，加上每个符号的说明开销。
+    """
+    doc_lines = max(MIN_DOC_LINES, int(lines * DOC_LINES_RATIO))
+    return size // BYTES_PER_TOKEN + doc_lines * TOKENS_PER_DOC_LINE + symbols * TOKENS_PER_SYMBOL
+
+
+def count_module_symbols(project_root: str, modules: List[Dict[str, Any]],
+                         workers: Optional[int] = None) -> Dict[str, int]:
+    """统计各模块中提取到的符号数 (复用 extract_docs 的按内容哈希缓存)"""
+    from extract_docs import extract_project_docs
+
+    module_index = build_module_index(modules)
+    counts = {m['name']: 0 for m in modules}
+    for record in extract_project_docs(project_root, workers=workers):
+        name = module_of(record['file_path'], module_index)
+        if name is not None:
+            counts[name] += 1
+    return counts
+
+
+def estimate_module_costs(ranking: List[ModulePriority],
+                          symbols: Dict[str, int]) -> List[ModuleCost]:
+    """按优先级顺序估算各模块开销"""
+    return [
+        ModuleCost(name=p.name, bytes=p.bytes, lines=p.lines, symbols=symbols.get(p.name, 0),
+                   tokens=estimate_tokens(p.bytes, p.lines, symbols.get(p.name, 0)))
+        for p in ranking
+    ]
+
+
+def plan_batches(costs: List[ModuleCost], token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 max_batch_modules: int = DEFAULT_MAX_BATCH_MODULES) -> List[Batch]:
+    """
+    按优先级顺序首次适应装箱
+
+    每个模块放入第一个仍有余量的批次，高优先级模块因此总在靠前的批次中，
+    小模块则填充前面批次的剩余空间。单个模块超出预算时独占一个批次并标记 oversized。
+
+    Args:
+        costs: 按优先级排列的模块开销
+        token_budget: 每批 token 预算
+        max_batch_modules: 每批最多模块数
+    """
+    batches: List[Batch] = []
+    # 仍可放入模块的批次 (模块数已满的批次不再参与查找)
+    open_batches: List[Batch] = []
+    for cost in costs:
+        if cost.tokens > token_budget:
+            batches.append(Batch(modules=[cost.name], estimated_tokens=cost.tokens, oversized=True))
+            continue
+        target = next((b for b in open_batches if b.estimated_tokens + cost.tokens <= token_budget), None)
+        if target is None:
+            target = Batch()
+            batches.append(target)
+            open_batches.append(target)
+        target.modules.append(cost.name)
+        target.estimated_tokens += cost.tokens
+        if len(target.modules) >= max_batch_modules:
+            open_batches.remove(target)
+    return batches
+
+
+def save_plan(wiki_dir: str, batches: List[Batch], costs: List[ModuleCost],
+              token_budget: int) -> Dict[str, Any]:
+    """
+    将批次计划写入 progress 并把游标 current_batch 重置到第一批
+
+    已完成的模块不会进入新计划。
+    """
+    progress = cache_store.load_document(wiki_dir, 'progress') or {}
+    progress.update({
+        'current_batch': 0,
+        'total_batches': len(batches),
+        'batch_plan': {
+            'token_budget': token_budget,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'batches': [b.to_dict() for b in batches],
+            'module_costs': {c.name: c.to_dict() for c in costs},
+        },
+        'last_updated': datetime.now(timezone.utc).isoformat(),
+    })
+    cache_store.save_document(wiki_dir, 'progress', progress)
+    return progress
+
+
+def plan_project(project_root: str, token_budget: Optional[int] = None,
+                 max_batch_modules: Optional[int] = None,
+                 workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    排序模块、估算开销并生成批次计划
+
+    Args:
+        project_root: 项目根目录
+        token_budget: 每批 token 预算，默认读取 config.yaml 的 progressive.token_budget
+        max_batch_modules: 每批最多模块数，默认读取 progressive.max_batch_modules
+        workers: 解析进程数
+
+    Returns:
+        更新后的 progress
+    """
+    settings = load_batch_settings(project_root)
+    token_budget = token_budget or settings.token_budget
+    max_batch_modules = max_batch_modules or settings.max_batch_modules
+    wiki_dir = str(Path(project_root) / '.mini-wiki')
+
+    ranking = rank_project_modules(project_root, workers)
+    progress = save_priority(wiki_dir, ranking)
+    completed = set(progress['completed_modules'])
+    pending = [p for p in ranking if p.name not in completed]
+
+    symbols = count_module_symbols(project_root, [{'name': p.name, 'path': p.path} for p in pending],
+                                   workers)
+    costs = estimate_module_costs(pending, symbols)
+    batches = plan_batches(costs, token_budget, max_batch_modules)
+    return save_plan(wiki_dir, batches, costs, token_budget)
+
+
+def next_batch(progress: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """返回游标指向的批次 (计划不存在或已全部完成时为 None)"""
+    batches = progress.get('batch_plan', {}).get('batches', [])
+    cursor = progress.get('current_batch', 0)
+    return batches[cursor] if 0 <= cursor < len(batches) else None
+
+
+def complete_batch(wiki_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    将当前批次标记为完成并前移游标
+
+    批次中的模块移入 completed_modules，并从 pending_modules 中移除。
+
+    Returns:
+        刚完成的批次，没有待处理批次时为 None
+    """
+    progress = cache_store.load_document(wiki_dir, 'progress') or {}
+    batch = next_batch(progress)
+    if batch is None:
+        return None
+
+    completed = progress.get('completed_modules', [])
+    completed.extend(name for name in batch['modules'] if name not in completed)
+    progress['completed_modules'] = completed
+    progress['pending_modules'] = [name for name in progress.get('pending_modules', [])
+                                   if name not in batch['modules']]
+    progress['current_batch'] = progress.get('current_batch', 0) + 1
+    progress['last_updated'] = datetime.now(timezone.utc).isoformat()
+    cache_store.save_document(wiki_dir, 'progress', progress)
+    return batch
+
+
+def _format_batch(progress: Dict[str, Any], batch: Dict[str, Any]) -> str:
+    costs = progress['batch_plan'].get('module_costs', {})
+    lines = [f"📦 第 {progress['current_batch'] + 1}/{progress['total_batches']} 批 "
+             f"(约 {batch['estimated_tokens']} tokens"
+             f"{', 超出预算' if batch.get('oversized') else ''}):"]
+    for name in batch['modules']:
+        cost = costs.get(name, {})
+        lines.append(f"  - {name} ({cost.get('lines', 0)} 行, {cost.get('symbols', 0)} 个符号, "
+                     f"约 {cost.get('tokens', 0)} tokens)")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 批次规划")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser("plan", help="重新排序模块并生成批次计划")
+    plan_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    plan_parser.add_argument("--budget", type=int, default=None, help="每批 token 预算")
+    plan_parser.add_argument("--max-modules", type=int, default=None, help="每批最多模块数")
+    plan_parser.add_argument("--workers", type=int, default=None, help="解析进程数")
+
+    next_parser = subparsers.add_parser("next", help="显示下一批待处理模块")
+    next_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    next_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+
+    done_parser = subparsers.add_parser("done", help="标记当前批次完成并前移游标")
+    done_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+
+    args = parser.parse_args()
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+    if not Path(wiki_dir).exists():
+        print("❌ 未找到 .mini-wiki 目录，请先运行: python scripts/init_wiki.py", file=sys.stderr)
+        return 1
+
+    if args.command == "plan":
+        progress = plan_project(args.project_path, args.budget, args.max_modules, args.workers)
+        plan = progress['batch_plan']
+        print(f"✅ 已规划 {progress['total_batches']} 个批次 "
+              f"({len(plan['module_costs'])} 个待处理模块, 每批预算 {plan['token_budget']} tokens)")
+        batch = next_batch(progress)
+        if batch:
+            print(_format_batch(progress, batch))
+        return 0
+
+    if args.command == "done":
+        batch = complete_batch(wiki_dir)
+        if batch is None:
+            print("⚠️ 没有待处理的批次")
+            return 1
+        print(f"✅ 已完成: {', '.join(batch['modules'])}")
+
+    progress = cache_store.load_document(wiki_dir, 'progress') or {}
+    batch = next_batch(progress)
+    if args.command == "next" and args.json:
+        print(json.dumps(batch, indent=2, ensure_ascii=False))
+        return 0 if batch else 1
+    if batch is None:
+        print("🎉 所有批次已完成" if progress.get('batch_plan') else
+              "⚠️ 尚未生成批次计划，请先运行: python scripts/batch_planner.py plan")
+        return 0 if progress.get('batch_plan') else 1
+    print(_format_batch(progress, batch))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+缓存存储模块
+统一读写 .mini-wiki/cache 下的缓存数据
+
+默认使用 JSON 文件 (checksums.json / structure.json / progress.json 等)；
+当 cache/cache.db 存在时改用 SQLite (WAL 模式)，支持按路径索引查询、
+增量写入与多进程并发读取。使用 `migrate` 命令可一次性从 JSON 迁移。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# SQLite 缓存文件名
+CACHE_DB_NAME = 'cache.db'
+
+# checksums 表中独立成列的字段，其余字段存入 extra
+CHECKSUM_COLUMNS = ('hash', 'doc', 'updated_at', 'size', 'mtime_ns', 'inode')
+
+# 文档提取缓存目录 (按内容哈希寻址，位于 cache/ 下)
+DOCS_CACHE_DIR = 'docs'
+
+# 图表输出缓存目录 (按输入指纹寻址，位于 cache/ 下)
+DIAGRAMS_CACHE_DIR = 'diagrams'
+
+# 迁移时导入的 JSON 文档 (checksums.json 单独处理)
+JSON_DOCUMENTS = ('structure', 'progress', 'dir_hashes', 'import_graph', 'class_index', 'call_graph')
+
+# 表结构版本 (记录在 PRAGMA user_version 中)，结构变化时递增
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS checksums (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    doc TEXT NOT NULL DEFAULT '',
+    updated_at TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_checksums_hash ON checksums(hash);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+'''
+
+
+def get_cache_dir(wiki_dir: str) -> Path:
+    """获取缓存目录路径"""
+    return Path(wiki_dir) / 'cache'
+
+
+def get_db_path(wiki_dir: str) -> Path:
+    """获取 SQLite 缓存文件路径"""
+    return get_cache_dir(wiki_dir) / CACHE_DB_NAME
+
+
+def uses_sqlite(wiki_dir: str) -> bool:
+    """是否使用 SQLite 缓存后端"""
+    return get_db_path(wiki_dir).exists()
+
+
+def connect(wiki_dir: str) -> sqlite3.Connection:
+    """打开 SQLite 缓存 (不存在时创建)，启用 WAL 以支持并发读取"""
+    db_path = get_db_path(wiki_dir)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    # synchronous 只对当前连接生效
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        # WAL 模式与表结构保存在数据库文件中，每个数据库只需初始化一次
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+
+def _record_to_row(path: str, record: Dict[str, Any]) -> tuple:
+    extra = {k: v for k, v in record.items() if k not in CHECKSUM_COLUMNS}
+    return (
+        path,
+        record.get('hash', ''),
+        record.get('doc', ''),
+        record.get('updated_at'),
+        record.get('size'),
+        record.get('mtime_ns'),
+        record.get('inode'),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _row_to_record(row: tuple) -> Dict[str, Any]:
+    record: Dict[str, Any] = {'hash': row[1], 'doc': row[2]}
+    if row[3] is not None:
+        record['updated_at'] = row[3]
+    for key, value in zip(('size', 'mtime_ns', 'inode'), row[4:7]):
+        if value is not None:
+            record[key] = value
+    if row[7]:
+        record.update(json.loads(row[7]))
+    return record
+
+
+_SELECT_CHECKSUMS = 'SELECT path, hash, doc, updated_at, size, mtime_ns, inode, extra FROM checksums'
+_UPSERT_CHECKSUM = '''
+INSERT INTO checksums (path, hash, doc, updated_at, size, mtime_ns, inode, extra)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    hash = excluded.hash, doc = excluded.doc, updated_at = excluded.updated_at,
+    size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode,
+    extra = excluded.extra
+'''
+
+
+def load_checksums(wiki_dir: str) -> Dict[str, Dict[str, Any]]:
+    """加载全部校验和记录"""
+    if uses_sqlite(wiki_dir):
+        with closing(connect(wiki_dir)) as conn:
+            return {row[0]: _row_to_record(row) for row in conn.execute(_SELECT_CHECKSUMS + ' ORDER BY path')}
+
+    cache_path = get_cache_dir(wiki_dir) / 'checksums.json'
+    if cache_path.exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def get_checksums(wiki_dir: str, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """按路径查询校验和记录 (SQLite 后端走主键索引)"""
+    paths = list(paths)
+    if not uses_sqlite(wiki_dir):
+        records = load_checksums(wiki_dir)
+        return {p: records[p] for p in paths if p in records}
+
+    result = {}
+    with closing(connect(wiki_dir)) as conn:
+        # 分批查询，避免超过 SQLite 变量数量上限
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in conn.execute(f'{_SELECT_CHECKSUMS} WHERE path IN ({placeholders})', chunk):
+                result[row[0]] = _row_to_record(row)
+    return result
+
+
+def find_paths_by_hash(wiki_dir: str, file_hash: str) -> List[str]:
+    """查询具有指定校验和的文件路径"""
+    if not uses_sqlite(wiki_dir):
+        return sorted(p for p, r in load_checksums(wiki_dir).items() if r.get('hash') == file_hash)
+    with closing(connect(wiki_dir)) as conn:
+        rows = conn.execute('SELECT path FROM checksums WHERE hash = ? ORDER BY path', (file_hash,))
+        return [row[0] for row in rows]
+
+
+def upsert_checksums(wiki_dir: str, records: Dict[str, Dict[str, Any]]):
+    """插入或更新部分校验和记录"""
+    if not uses_sqlite(wiki_dir):
+        merged = load_checksums(wiki_dir)
+        merged.update(records)
+        _write_json(get_cache_dir(wiki_dir) / 'checksums.json', merged)
+        return
+    with closing(connect(wiki_dir)) as conn, conn:
+        conn.executemany(_UPSERT_CHECKSUM, (_record_to_row(p, r) for p, r in records.items()))
+
+
+def delete_checksums(wiki_dir: str, paths: Iterable[str]):
+    """删除指定路径的校验和记录"""
+    paths = list(paths)
+    if not uses_sqlite(wiki_dir):
+        records = load_checksums(wiki_dir)
+        for p in paths:
+            records.pop(p, None)
+        _write_json(get_cache_dir(wiki_dir) / 'checksums.json', records)
+        return
+    with closing(connect(wiki_dir)) as conn, conn:
+        conn.executemany('DELETE FROM checksums WHERE path = ?', ((p,) for p in paths))
+
+
+def save_checksums(wiki_dir: str, checksums: Dict[str, Dict[str, Any]]):
+    """
+    以 checksums 替换全部校验和记录
+
+    SQLite 后端只写入有变化的行并删除多余的行。
+    """
+    if not uses_sqlite(wiki_dir):
+        _write_json(get_cache_dir(wiki_dir) / 'checksums.json', checksums)
+        return
+
+    with closing(connect(wiki_dir)) as conn, conn:
+        existing = {row[0]: row for row in conn.execute(_SELECT_CHECKSUMS)}
+        rows = []
+        for path, record in checksums.items():
+            row = _record_to_row(path, record)
+            if existing.get(path) != row:
+                rows.append(row)
+        conn.executemany(_UPSERT_CHECKSUM, rows)
+        removed = [(p,) for p in existing if p not in checksums]
+        conn.executemany('DELETE FROM checksums WHERE path = ?', removed)
+
+
+def load_document(wiki_dir: str, name: str) -> Optional[Any]:
+    """加载缓存文档 (如 structure / progress)，不存在时返回 None"""
+    if uses_sqlite(wiki_dir):
+        with closing(connect(wiki_dir)) as conn:
+            row = conn.execute('SELECT data FROM documents WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    cache_path = get_cache_dir(wiki_dir) / f'{name}.json'
+    if cache_path.exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def has_document(wiki_dir: str, name: str) -> bool:
+    """缓存文档是否存在 (不读取内容)"""
+    if uses_sqlite(wiki_dir):
+        with closing(connect(wiki_dir)) as conn:
+            return conn.execute('SELECT 1 FROM documents WHERE name = ?', (name,)).fetchone() is not None
+    return (get_cache_dir(wiki_dir) / f'{name}.json').exists()
+
+
+def save_document(wiki_dir: str, name: str, data: Any):
+    """保存缓存文档"""
+    if uses_sqlite(wiki_dir):
+        with closing(connect(wiki_dir)) as conn, conn:
+            conn.execute(
+                'INSERT INTO documents (name, data) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET data = excluded.data',
+                (name, json.dumps(data, ensure_ascii=False)),
+            )
+        return
+    _write_json(get_cache_dir(wiki_dir) / f'{name}.json', data)
+
+
+def _write_json(path: Path, data: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def get_docs_cache_dir(wiki_dir: str, version: int) -> Path:
+    """获取指定提取器版本的文档缓存目录"""
+    return get_cache_dir(wiki_dir) / DOCS_CACHE_DIR / f'v{version}'
+
+
+def _docs_cache_path(wiki_dir: str, version: int, key: str) -> Path:
+    # 按键的前两位分目录，避免单个目录下文件过多
+    return get_docs_cache_dir(wiki_dir, version) / key[:2] / f'{key}.json'
+
+
+def load_cached_docs(wiki_dir: str, version: int, key: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    读取文档提取缓存
+
+    Args:
+        wiki_dir: Wiki 目录
+        version: 提取器版本
+        key: 缓存键，形如 "<文件哈希>-<语言>"
+
+    Returns:
+        缓存的记录列表，未命中时返回 None
+    """
+    try:
+        with open(_docs_cache_path(wiki_dir, version, key), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_docs(wiki_dir: str, version: int, key: str, records: List[Dict[str, Any]]):
+    """写入文档提取缓存 (先写临时文件再替换)"""
+    path = _docs_cache_path(wiki_dir, version, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def evict_cached_docs(wiki_dir: str, live_hashes: Optional[Set[str]] = None,
+                      keep_version: Optional[int] = None) -> int:
+    """
+    清理文档提取缓存
+
+    Args:
+        wiki_dir: Wiki 目录
+        live_hashes: 仍然有效的文件哈希 (通常来自 checksums)，不在其中的条目被删除；
+            为 None 时不按哈希清理
+        keep_version: 指定时删除其他提取器版本的整个缓存目录
+
+    Returns:
+        删除的缓存条目数
+    """
+    root = get_cache_dir(wiki_dir) / DOCS_CACHE_DIR
+    if not root.exists():
+        return 0
+
+    removed = 0
+    for version_dir in root.iterdir():
+        if not version_dir.is_dir():
+            continue
+        if keep_version is not None and version_dir.name != f'v{keep_version}':
+            removed += sum(1 for _ in version_dir.rglob('*.json'))
+            shutil.rmtree(version_dir, ignore_errors=True)
+            continue
+        if live_hashes is None:
+            continue
+        for entry in version_dir.glob('*/*.json'):
+            if entry.stem.split('-', 1)[0] not in live_hashes:
+                entry.unlink()
+                removed += 1
+    return removed
+
+
+def _diagram_cache_path(wiki_dir: str, key: str) -> Path:
+    return get_cache_dir(wiki_dir) / DIAGRAMS_CACHE_DIR / key[:2] / f'{key}.mmd'
+
+
+def load_cached_diagram(wiki_dir: str, key: str) -> Optional[str]:
+    """读取图表缓存，未命中时返回 None"""
+    try:
+        with open(_diagram_cache_path(wiki_dir, key), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def save_cached_diagram(wiki_dir: str, key: str, diagram: str):
+    """写入图表缓存 (先写临时文件再替换)"""
+    path = _diagram_cache_path(wiki_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(diagram)
+    os.replace(tmp_path, path)
+
+
+def evict_cached_diagrams(wiki_dir: str, live_keys: Set[str]) -> int:
+    """删除不在 live_keys 中的图表缓存，返回删除的条目数"""
+    root = get_cache_dir(wiki_dir) / DIAGRAMS_CACHE_DIR
+    if not root.exists():
+        return 0
+    removed = 0
+    for entry in root.glob('*/*.mmd'):
+        if entry.stem not in live_keys:
+            entry.unlink()
+            removed += 1
+    return removed
+
+
+def migrate_json_cache(wiki_dir: str) -> Dict[str, int]:
+    """
+    将 JSON 缓存一次性迁移到 SQLite
+
+    迁移后原 JSON 文件重命名为 *.json.migrated，避免读到过期数据。
+
+    Returns:
+        {"checksums": 迁移的记录数, "documents": 迁移的文档数}
+    """
+    cache_dir = get_cache_dir(wiki_dir)
+    checksums_path = cache_dir / 'checksums.json'
+
+    checksums: Dict[str, Dict[str, Any]] = {}
+    if checksums_path.exists():
+        with open(checksums_path, 'r', encoding='utf-8') as f:
+            checksums = json.load(f)
+    documents = {}
+    for name in JSON_DOCUMENTS:
+        doc_path = cache_dir / f'{name}.json'
+        if doc_path.exists():
+            with open(doc_path, 'r', encoding='utf-8') as f:
+                documents[name] = json.load(f)
+
+    with closing(connect(wiki_dir)) as conn, conn:
+        conn.executemany(_UPSERT_CHECKSUM, (_record_to_row(p, r) for p, r in checksums.items()))
+        conn.executemany(
+            'INSERT INTO documents (name, data) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET data = excluded.data',
+            ((name, json.dumps(data, ensure_ascii=False)) for name, data in documents.items()),
+        )
+
+    for name in ('checksums', *documents):
+        json_path = cache_dir / f'{name}.json'
+        if json_path.exists():
+            json_path.rename(json_path.with_name(f'{name}.json.migrated'))
+
+    return {'checksums': len(checksums), 'documents': len(documents)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 缓存存储工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="将 JSON 缓存迁移到 SQLite")
+    migrate_parser.add_argument("wiki_dir", nargs="?", default=".mini-wiki", help="Wiki 目录路径")
+
+    show_parser = subparsers.add_parser("show", help="以 JSON 输出缓存文档 (如 progress)")
+    show_parser.add_argument("name", help="文档名称，如 structure / progress / checksums")
+    show_parser.add_argument("wiki_dir", nargs="?", default=".mini-wiki", help="Wiki 目录路径")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        if uses_sqlite(args.wiki_dir):
+            print(f"ℹ️ 已使用 SQLite 缓存: {get_db_path(args.wiki_dir)}")
+            return 0
+        counts = migrate_json_cache(args.wiki_dir)
+        print(f"✅ 已迁移 {counts['checksums']} 条校验和记录, {counts['documents']} 个缓存文档")
+        return 0
+
+    if args.name == "checksums":
+        data: Any = load_checksums(args.wiki_dir)
+    else:
+        data = load_document(args.wiki_dir, args.name)
+    if data is None:
+        print(f"❌ 未找到缓存文档: {args.name}", file=sys.stderr)
+        return 1
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+静态调用图脚本
+用 ast (Python) 与 js_lexer (JS/TS) 提取每个文件的定义、导入别名与调用点，
+按文件哈希增量缓存；再通过项目级符号表把调用解析到已知定义，
+并从入口文件出发在深度 / 广度预算内展开真实调用路径，生成数据流序列图
+"""
+
+import argparse
+import ast
+import json
+import os
+import posixpath
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import cache_store
+from extract_docs import LineIndex
+from file_index import load_file_index, save_file_index, update_file_index
+from import_graph import (
+    JS_EXTENSIONS,
+    PY_EXTENSIONS,
+    ImportResolver,
+    build_module_index,
+    load_modules,
+    module_of,
+)
+from js_lexer import Token, parse_class_member, skip_balanced, tokenize
+
+# 缓存文档名
+CALL_DOCUMENT = 'call_graph'
+
+# 提取或解析规则变化时递增
+CALL_GRAPH_VERSION = 3
+
+# 模块级代码 (不在任何函数内) 的调用方名称
+MODULE_SCOPE = '<module>'
+
+# 调用路径展开的默认预算: 最大深度、每个函数最多展开的被调用者、最多调用步数
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_MAX_BREADTH = 5
+DEFAULT_MAX_CALLS = 40
+
+# 后跟 `(` 但不是调用的 JS 关键字
+JS_NON_CALLS = frozenset({
+    'if', 'for', 'while', 'switch', 'catch', 'return', 'typeof', 'function', 'super',
+    'import', 'require', 'await', 'void', 'delete', 'in', 'of', 'instanceof', 'with',
+})
+
+# 调用构造函数时解析到的方法名
+CONSTRUCTORS = ('__init__', 'constructor')
+
+# 内置类型的常见方法名: 接收者未知时 (如局部变量 `items.append`) 不按项目内唯一方法名解析
+BUILTIN_METHODS = frozenset(
+    {name for builtin in (list, dict, set, str, bytes) for name in dir(builtin) if not name.startswith('_')}
+    | {'push', 'shift', 'unshift', 'map', 'filter', 'reduce', 'forEach', 'some', 'every', 'find',
+       'findIndex', 'includes', 'slice', 'splice', 'concat', 'then', 'catch', 'finally', 'toString',
+       'has', 'delete', 'entries', 'apply', 'call', 'bind', 'log', 'error', 'warn', 'read', 'write',
+       'close', 'open', 'send', 'emit', 'on'}
+)
+
+
+@dataclass
+class CallStep:
+    """调用路径中的一步"""
+    caller: str
+    callee: str
+    caller_file: str
+    callee_file: str
+    depth: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# --- Python ---
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """
+    `a.b.c` 形式的调用目标，其他表达式 (如 `x[0]()`) 返回 None
+
+    链式调用 `Store().save()` 记为 `Store.save`，按类方法解析。
+    """
+    parts = []
+    while isinstance(node, (ast.Attribute, ast.Call)):
+        if isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+        node = node.func if isinstance(node, ast.Call) else node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def _python_imports(tree: ast.AST) -> Dict[str, str]:
+    """
+    导入别名 {本地名: 导入规格}
+
+    规格与 import_graph.parse_python_imports 一致 (`from pkg import name` 记为 `pkg.name`)，
+    `import a.b` 的本地名为 `a.b`。
+    """
+    imports = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = '.' * node.level + (node.module or '')
+            separator = '.' if node.module else ''
+            for alias in node.names:
+                if alias.name != '*':
+                    imports[alias.asname or alias.name] = f'{base}{separator}{alias.name}'
+    return imports
+
+
+def extract_python_calls(content: str) -> Dict[str, Any]:
+    """
+    提取 Python 文件的定义与调用
+
+    定义为顶层函数、类及 (嵌套) 类的方法，名称形如 `Class.method`；
+    嵌套函数内的调用归属于外层定义。
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {'defs': [], 'imports': {}, 'calls': []}
+
+    defs: List[List[Any]] = []
+    calls: List[List[Any]] = []
+    order: Dict[int, Tuple[int, int]] = {}
+
+    def visit(node: ast.AST, scope: str, class_prefix: str):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef) and scope == MODULE_SCOPE:
+                name = class_prefix + child.name
+                defs.append([name, child.lineno])
+                for base in child.bases + child.decorator_list:
+                    visit(base, scope, class_prefix)
+                visit(child, scope, name + '.')
+                continue
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and scope == MODULE_SCOPE:
+                name = class_prefix + child.name
+                defs.append([name, child.lineno])
+                visit(child, name, '')
+                continue
+            if isinstance(child, ast.Call):
+                target = _dotted_name(child.func)
+                if target:
+                    # 按求值顺序排列: 内层调用 (先结束) 在前
+                    order[id(child)] = (child.end_lineno or child.lineno, child.end_col_offset or 0)
+                    calls.append([scope, target, child.lineno, id(child)])
+            visit(child, scope, '' if scope != MODULE_SCOPE else class_prefix)
+
+    visit(tree, MODULE_SCOPE, '')
+    calls.sort(key=lambda call: order[call[3]])
+    return {'defs': defs, 'imports': _python_imports(tree), 'calls': [call[:3] for call in calls]}
+
+
+# --- JS/TS ---
+
+
+def _js_chain(tokens: List[Token], i: int) -> Tuple[str, int]:
+    """读取从 i 开始的 `a.b.c` 链，返回 (文本, 链之后的位置)"""
+    parts = [tokens[i].value]
+    i += 1
+    while (i + 1 < len(tokens) and tokens[i].kind == 'punct' and tokens[i].value in ('.', '?.')
+           and tokens[i + 1].kind == 'ident'):
+        parts.append(tokens[i + 1].value)
+        i += 2
+    return '.'.join(parts), i
+
+
+def _js_function_body(tokens: List[Token], i: int) -> Optional[int]:
+    """
+    i 指向参数列表 `(` 或泛型 `<` 时，返回函数体 `{` 的位置 (非函数或无函数体时为 None)
+
+    允许返回类型注解与箭头 `=>`。
+    """
+    if i < len(tokens) and tokens[i].value == '<':
+        i = skip_balanced(tokens, i)
+    if i >= len(tokens) or tokens[i].value != '(':
+        return None
+    i = skip_balanced(tokens, i)
+    if i < len(tokens) and tokens[i].value == ':':
+        i += 1
+        while i < len(tokens) and tokens[i].value not in ('{', '=>', ';'):
+            i = skip_balanced(tokens, i) if tokens[i].value in ('(', '[', '<') else i + 1
+        # 对象字面量返回类型 `(): { a: number } {`
+        if i < len(tokens) and tokens[i].value == '{' and i + 1 < len(tokens):
+            after = skip_balanced(tokens, i)
+            if after < len(tokens) and tokens[after].value in ('{', '=>'):
+                i = after
+    if i < len(tokens) and tokens[i].value == '=>':
+        i += 1
+    return i if i < len(tokens) and tokens[i].value == '{' else None
+
+
+def _js_imports(tokens: List[Token]) -> Dict[str, str]:
+    """
+    导入别名 {本地名: 规格}
+
+    `import { a as b } from './x'` 记为 `b: ./x#a`，默认导入记为 `./x#default`，
+    命名空间导入与 `const x = require('./x')` 记为 `./x` (模块本身)。
+    """
+    imports = {}
+    for i, token in enumerate(tokens):
+        if token.kind == 'ident' and token.value == 'import' and not (i > 0 and tokens[i - 1].value == '.'):
+            j = i + 1
+            if j < len(tokens) and tokens[j].value == 'type':
+                j += 1
+            names: List[Tuple[str, str]] = []
+            while j < len(tokens) and tokens[j].value not in ('from', ';') and tokens[j].kind != 'string':
+                if tokens[j].value == '*' and j + 2 < len(tokens) and tokens[j + 1].value == 'as':
+                    names.append((tokens[j + 2].value, ''))
+                    j += 3
+                elif tokens[j].value == '{':
+                    end = skip_balanced(tokens, j) - 1
+                    k = j + 1
+                    while k < end:
+                        if tokens[k].kind == 'ident' and tokens[k].value != 'type':
+                            if k + 2 < end and tokens[k + 1].value == 'as':
+                                names.append((tokens[k + 2].value, tokens[k].value))
+                                k += 3
+                            else:
+                                names.append((tokens[k].value, tokens[k].value))
+                                k += 1
+                        else:
+                            k += 1
+                    j = end + 1
+                elif tokens[j].kind == 'ident':
+                    names.append((tokens[j].value, 'default'))
+                    j += 1
+                else:
+                    j += 1
+            if j + 1 < len(tokens) and tokens[j].value == 'from' and tokens[j + 1].kind == 'string':
+                spec = tokens[j + 1].value[1:-1]
+                for local, imported in names:
+                    imports[local] = f'{spec}#{imported}' if imported else spec
+        elif (token.kind == 'ident' and token.value == 'require' and i >= 2
+              and tokens[i - 1].value == '=' and tokens[i - 2].kind == 'ident'
+              and i + 2 < len(tokens) and tokens[i + 1].value == '(' and tokens[i + 2].kind == 'string'):
+            imports[tokens[i - 2].value] = tokens[i + 2].value[1:-1]
+    return imports
+
+
+def extract_js_calls(content: str) -> Dict[str, Any]:
+    """
+    提取 JS/TS 文件的定义与调用
+
+    定义为函数声明、赋值为函数的变量、类及类方法 (`Class.method`)、
+    顶层变量所赋对象字面量的方法 (`obj.method`)；调用为 `name(`、`a.b(` 与 `new Name(`，归属于所在的最内层定义。
+    """
+    tokens = tokenize(content)
+    line_index = LineIndex(content)
+    defs: List[List[Any]] = []
+    calls: List[List[Any]] = []
+
+    # 作用域栈: (定义名, 函数体 `{` 的位置, 是否为类体)
+    scopes: List[Tuple[str, int, bool]] = []
+    # 函数体 `{` 位置 -> (定义名, 是否为类体)
+    pending: Dict[int, Tuple[str, bool]] = {}
+    braces: List[int] = []
+    # 顶层变量所赋对象字面量: `{` 的位置 -> 变量名；objects 栈为 (变量名, 括号深度)
+    pending_objects: Dict[int, str] = {}
+    objects: List[Tuple[str, int]] = []
+
+    def current() -> Tuple[str, bool]:
+        return (scopes[-1][0], scopes[-1][2]) if scopes else (MODULE_SCOPE, False)
+
+    def define(name: str, body: int, token: Token, is_class: bool = False):
+        scope, in_class = current()
+        qualname = f'{scope}.{name}' if in_class else name
+        # 只登记顶层定义与类成员，函数内部的局部函数并入外层
+        if scope == MODULE_SCOPE or in_class:
+            defs.append([qualname, line_index.line_of(token.start)])
+        else:
+            qualname = scope
+        pending[body] = (qualname, is_class)
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'punct':
+            if token.value == '{':
+                braces.append(i)
+                if i in pending:
+                    name, is_class = pending.pop(i)
+                    scopes.append((name, len(braces), is_class))
+                elif i in pending_objects:
+                    objects.append((pending_objects.pop(i), len(braces)))
+            elif token.value == '}' and braces:
+                if scopes and scopes[-1][1] == len(braces):
+                    scopes.pop()
+                if objects and objects[-1][1] == len(braces):
+                    objects.pop()
+                braces.pop()
+            i += 1
+            continue
+        if token.kind != 'ident' or (i > 0 and tokens[i - 1].value in ('.', '?.')):
+            i += 1
+            continue
+
+        scope, in_class = current()
+        following = tokens[i + 1].value if i + 1 < len(tokens) else ''
+        if token.value == 'class' and i + 1 < len(tokens) and tokens[i + 1].kind == 'ident':
+            j = i + 2
+            while j < len(tokens) and tokens[j].value != '{':
+                j = skip_balanced(tokens, j) if tokens[j].value in ('(', '<') else j + 1
+            if j < len(tokens):
+                define(tokens[i + 1].value, j, tokens[i + 1], is_class=True)
+            i += 2
+            continue
+        if token.value == 'function':
+            j = i + 1
+            if j < len(tokens) and tokens[j].value == '*':
+                j += 1
+            if j < len(tokens) and tokens[j].kind == 'ident':
+                body = _js_function_body(tokens, j + 1)
+                if body is not None:
+                    define(tokens[j].value, body, tokens[j])
+                i = j + 1
+                continue
+        if in_class:
+            # 类成员与文档提取、类索引共用 js_lexer 的成员解析
+            member = parse_class_member(content, tokens, i)
+            if member is not None and member.kind == 'method' and member.body >= 0:
+                define(member.name, member.body, tokens[member.name_index])
+                i = member.body
+                continue
+        if following == '=' and (token.value not in ('const', 'let', 'var')):
+            j = i + 2
+            if j < len(tokens) and tokens[j].value == 'async':
+                j += 1
+            if j < len(tokens) and tokens[j].value == 'function':
+                j += 1
+                if j < len(tokens) and tokens[j].kind == 'ident':
+                    j += 1
+            elif j < len(tokens) and tokens[j].kind == 'ident' and j + 1 < len(tokens) and tokens[j + 1].value == '=>':
+                j += 2
+                if j < len(tokens) and tokens[j].value == '{':
+                    define(token.value, j, token)
+                    i = j
+                    continue
+            # 变量赋值只在声明处 (const/let/var 之后) 视为定义，类字段由成员解析处理
+            declared = i > 0 and tokens[i - 1].value in ('const', 'let', 'var')
+            if declared and scope == MODULE_SCOPE and j < len(tokens) and tokens[j].value == '{':
+                pending_objects[j] = token.value
+            body = _js_function_body(tokens, j)
+            if body is not None and declared:
+                define(token.value, body, token)
+                i = body
+                continue
+
+        if token.value in JS_NON_CALLS or token.value in ('const', 'let', 'var', 'class', 'new'):
+            i += 1
+            continue
+        chain, j = _js_chain(tokens, i)
+        if j < len(tokens) and tokens[j].value == '<' and i > 0 and tokens[i - 1].value == 'new':
+            j = skip_balanced(tokens, j)
+        if j < len(tokens) and tokens[j].value in ('(', '?.') and (
+                tokens[j].value == '(' or j + 1 < len(tokens) and tokens[j + 1].value == '('):
+            body = _js_function_body(tokens, j) if tokens[j].value == '(' else None
+            after = skip_balanced(tokens, j) if tokens[j].value == '(' else j
+            # `name(...) {` 是对象字面量方法，不是调用
+            if body is None or not (after < len(tokens) and tokens[after].value in ('{', ':')):
+                calls.append([scope, chain, line_index.line_of(token.start)])
+            elif '.' not in chain:
+                if objects and objects[-1][1] == len(braces):
+                    # 顶层变量的对象字面量方法按 `obj.method` 登记
+                    qualname = f'{objects[-1][0]}.{chain}'
+                    defs.append([qualname, line_index.line_of(token.start)])
+                    pending[body] = (qualname, False)
+                else:
+                    # 其余对象字面量 (如实参) 的方法不作为定义，并入所在作用域，
+                    # 避免同名调用经唯一名称解析到它
+                    pending[body] = (scope, False)
+                i = body
+                continue
+        i = j if j > i + 1 else i + 1
+
+    return {'defs': defs, 'imports': _js_imports(tokens), 'calls': calls}
+
+
+def extract_calls(file_path: str, content: str) -> Dict[str, Any]:
+    """按文件类型提取定义与调用"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in PY_EXTENSIONS:
+        return extract_python_calls(content)
+    if ext in JS_EXTENSIONS:
+        return extract_js_calls(content)
+    return {'defs': [], 'imports': {}, 'calls': []}
+
+
+# --- 解析 ---
+
+
+class SymbolTable:
+    """
+    项目级符号表
+
+    以每个文件的定义为基础，将调用表达式解析为 (定义所在文件, 定义名)：
+    本文件定义 → `self.` / `this.` 方法 → 导入别名 (经 ImportResolver 定位文件)
+    → 项目内唯一的方法名 (接收者不是导入且方法名不是内置类型的常见方法时)。
+    """
+
+    def __init__(self, files: Dict[str, Dict[str, Any]], modules: List[Dict[str, Any]]):
+        self.files = files
+        self.resolver = ImportResolver(files, modules)
+        self.defs: Dict[str, Set[str]] = {file: {d[0] for d in record['defs']}
+                                          for file, record in files.items()}
+        # 方法短名 -> 定义 (只在项目内唯一时用于解析 obj.method())
+        methods: Dict[str, List[Tuple[str, str]]] = {}
+        for file, names in self.defs.items():
+            for name in names:
+                if '.' in name:
+                    methods.setdefault(name.rsplit('.', 1)[1], []).append((file, name))
+        self.unique_methods = {short: targets[0] for short, targets in methods.items()
+                               if len(targets) == 1 and short not in CONSTRUCTORS}
+
+    def _lookup(self, file: str, name: str) -> Optional[Tuple[str, str]]:
+        """file 中的定义 name；name 为类时解析到其构造函数 (存在时)"""
+        names = self.defs.get(file, ())
+        if name not in names:
+            return None
+        for constructor in CONSTRUCTORS:
+            if f'{name}.{constructor}' in names:
+                return file, f'{name}.{constructor}'
+        return file, name
+
+    def _import_target(self, file: str, spec: str) -> Tuple[Optional[str], str]:
+        """导入规格 -> (目标文件, 导入的名称，导入整个模块时为空)"""
+        if file.endswith(PY_EXTENSIONS):
+            kind, target = self.resolver.resolve(file, spec)
+            if kind != 'internal' or target not in self.defs:
+                return None, ''
+            # 回退到父模块时，最后一段是从模块中导入的名称
+            stem = posixpath.splitext(target)[0]
+            imported = spec.rsplit('.', 1)[-1]
+            if stem.endswith('/__init__'):
+                stem = posixpath.dirname(stem)
+            return target, '' if stem.endswith('/' + imported) or stem == imported else imported
+        spec, _, imported = spec.partition('#')
+        kind, target = self.resolver.resolve(file, spec)
+        if kind != 'internal' or target not in self.defs:
+            return None, ''
+        return target, imported
+
+    def resolve(self, file: str, caller: str, callee: str) -> Optional[Tuple[str, str]]:
+        """
+        解析调用
+
+        Args:
+            file: 调用所在文件
+            caller: 调用方定义名 (模块级代码为 MODULE_SCOPE)
+            callee: 调用表达式 (如 `helper`、`self.load`、`utils.format`)
+
+        Returns:
+            (定义所在文件, 定义名)，无法解析到项目内定义时为 None
+        """
+        head, _, rest = callee.partition('.')
+        if head in ('self', 'this', 'cls') and rest and '.' in caller:
+            owner = caller.rsplit('.', 1)[0]
+            found = self._lookup(file, f'{owner}.{rest}')
+            if found:
+                return found
+        elif not rest or head not in self.files[file]['imports']:
+            found = self._lookup(file, callee)
+            if found:
+                return found
+
+        # 最长的导入别名前缀 (Python 的 `import a.b` 别名为 `a.b`)；
+        # 接收者是导入时只按导入解析，外部模块 (如 `os.path.join`) 不产生调用边
+        imports = self.files[file]['imports']
+        parts = callee.split('.')
+        for size in range(len(parts), 0, -1):
+            alias = '.'.join(parts[:size])
+            if alias not in imports:
+                continue
+            target, imported = self._import_target(file, imports[alias])
+            if target is None:
+                return None
+            member = parts[size:]
+            if imported and imported != 'default':
+                member = [imported] + member
+            elif imported == 'default' and not member:
+                member = [alias]
+            return self._lookup(target, '.'.join(member)) if member else None
+
+        if rest and parts[-1] not in BUILTIN_METHODS:
+            return self.unique_methods.get(parts[-1])
+        return None
+
+
+def _parse_file(rel_path: str, content: str) -> Dict[str, Any]:
+    return extract_calls(rel_path, content)
+
+
+def load_call_graph(wiki_dir: str) -> Dict[str, Any]:
+    """加载缓存的调用图，不存在或版本不符时返回空图"""
+    return load_file_index(wiki_dir, CALL_DOCUMENT, CALL_GRAPH_VERSION)
+
+
+def update_call_graph(project_root: str, checksums: Optional[Dict[str, str]] = None,
+                      modules: Optional[List[Dict[str, Any]]] = None,
+                      workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    增量更新调用图
+
+    只重新解析哈希变化的文件；调用解析依赖整个符号表，每次对全部文件
+    重新计算并把解析出的边 [调用方, 目标文件, 目标定义] 写回各文件记录。
+
+    Returns:
+        {"updated": 重新解析的文件数, "removed": 删除的文件数, "edges": 解析出的调用边数}
+    """
+    graph, counts = update_file_index(project_root, CALL_DOCUMENT, CALL_GRAPH_VERSION,
+                                      JS_EXTENSIONS + PY_EXTENSIONS, _parse_file, checksums, workers)
+    files: Dict[str, Dict[str, Any]] = graph['files']
+    table = SymbolTable(files, modules if modules is not None else load_modules(project_root))
+
+    total = 0
+    for file, record in files.items():
+        edges: Dict[Tuple[str, str, str], None] = {}
+        for caller, callee, _ in record['calls']:
+            target = table.resolve(file, caller, callee)
+            if target and target != (file, caller):
+                edges[(caller, *target)] = None
+        record['edges'] = [list(edge) for edge in edges]
+        total += len(edges)
+
+    save_file_index(str(Path(project_root) / '.mini-wiki'), CALL_DOCUMENT, graph)
+    return {**counts, 'edges': total}
+
+
+def trace_calls(graph: Dict[str, Any], entry_points: List[str],
+                max_depth: int = DEFAULT_MAX_DEPTH, max_breadth: int = DEFAULT_MAX_BREADTH,
+                max_calls: int = DEFAULT_MAX_CALLS) -> List[CallStep]:
+    """
+    从入口文件出发按调用顺序深度优先展开调用路径
+
+    入口文件的模块级代码为起点 (没有模块级调用时从其顶层定义开始)；
+    每个定义最多展开 max_breadth 个被调用者，已展开的定义不再重复展开。
+
+    Args:
+        graph: 调用图 (load_call_graph 输出)
+        entry_points: 入口文件 (find_entry_points 输出)
+        max_depth: 最大调用深度
+        max_breadth: 每个定义最多展开的被调用者数
+        max_calls: 最多调用步数
+    """
+    files = graph.get('files', {})
+    callees: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    for file, record in files.items():
+        for caller, target_file, target in record.get('edges', []):
+            callees.setdefault((file, caller), []).append((target_file, target))
+
+    steps: List[CallStep] = []
+    expanded: Set[Tuple[str, str]] = set()
+
+    def walk(node: Tuple[str, str], depth: int):
+        expanded.add(node)
+        for target in callees.get(node, [])[:max_breadth]:
+            if len(steps) >= max_calls:
+                return
+            steps.append(CallStep(caller=node[1], callee=target[1], caller_file=node[0],
+                                  callee_file=target[0], depth=depth))
+            if depth < max_depth and target not in expanded:
+                walk(target, depth + 1)
+
+    for entry in entry_points:
+        entry = entry.replace(os.sep, '/')
+        if entry not in files:
+            continue
+        roots = [(entry, MODULE_SCOPE)]
+        if (entry, MODULE_SCOPE) not in callees:
+            roots = [(entry, d[0]) for d in files[entry]['defs'] if (entry, d[0]) in callees][:max_breadth]
+        for root in roots:
+            if len(steps) < max_calls and root not in expanded:
+                walk(root, 1)
+    return steps
+
+
+def call_flow(steps: List[CallStep], entry_points: List[str],
+              modules: List[Dict[str, Any]]) -> List[Tuple[Optional[str], Optional[str], str]]:
+    """
+    将调用步骤转换为序列图消息 (调用方参与者, 被调用方参与者, 标签)
+
+    参与者为定义所在模块 (不在任何模块中时为文件名)，入口文件为 None。
+    """
+    module_index = build_module_index(modules)
+    entries = {entry.replace(os.sep, '/') for entry in entry_points}
+
+    def participant(file: str) -> Optional[str]:
+        if file in entries:
+            return None
+        return module_of(file, module_index) or posixpath.basename(file)
+
+    return [(participant(s.caller_file), participant(s.callee_file), f'{s.callee}()') for s in steps]
+
+
+def load_call_flow(wiki_dir: str, max_depth: int = DEFAULT_MAX_DEPTH,
+                   max_breadth: int = DEFAULT_MAX_BREADTH,
+                   max_calls: int = DEFAULT_MAX_CALLS) -> List[Tuple[Optional[str], Optional[str], str]]:
+    """从缓存的调用图与 structure 计算入口调用流 (未建立调用图时为空)"""
+    if not cache_store.has_document(wiki_dir, CALL_DOCUMENT):
+        return []
+    structure = cache_store.load_document(wiki_dir, 'structure') or {}
+    entry_points = structure.get('entry_points', [])
+    steps = trace_calls(load_call_graph(wiki_dir), entry_points, max_depth, max_breadth, max_calls)
+    return call_flow(steps, entry_points, structure.get('modules', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 静态调用图")
+    parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    parser.add_argument("--entry", action="append", default=None,
+                        help="入口文件 (可重复，默认使用 structure 中的 entry_points)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_MAX_DEPTH, help="最大调用深度")
+    parser.add_argument("--breadth", type=int, default=DEFAULT_MAX_BREADTH, help="每个函数最多展开的调用数")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出调用路径")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数")
+    args = parser.parse_args()
+
+    from analyze_project import detect_project_types, find_entry_points
+    from detect_changes import detect_changes
+    from generate_diagram import generate_data_flow_diagram
+
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+    checksums = detect_changes(args.project_path, track_symbols=False)["current_checksums"]
+    modules = load_modules(args.project_path)
+    counts = update_call_graph(args.project_path, checksums, modules, args.workers)
+
+    entry_points = args.entry
+    if not entry_points:
+        structure = cache_store.load_document(wiki_dir, 'structure') or {}
+        entry_points = structure.get('entry_points') or find_entry_points(
+            Path(args.project_path), detect_project_types(Path(args.project_path)))
+    steps = trace_calls(load_call_graph(wiki_dir), entry_points, args.depth, args.breadth)
+
+    if args.json:
+        print(json.dumps([s.to_dict() for s in steps], indent=2, ensure_ascii=False))
+        return 0
+    print(f"✅ 调用图: 解析 {counts['updated']} 个文件, 删除 {counts['removed']} 个文件, "
+          f"共 {counts['edges']} 条调用边")
+    if not steps:
+        print("⚠️ 未从入口文件找到可解析的调用")
+        return 0
+    print(generate_data_flow_diagram(entry_points, modules, call_flow(steps, entry_points, modules)))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+类索引脚本
+一次扫描收集 Python (ast) 与 JS/TS (js_lexer) 中的类、接口、字段、方法
+以及继承 / 组合关系，按文件哈希增量缓存，并为每个模块生成 classDiagram
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from diagram_cache import DiagramCache
+from extract_docs import LineIndex
+from file_index import load_file_index, save_file_index, update_file_index
+from generate_diagram import generate_class_diagram
+from import_graph import JS_EXTENSIONS, PY_EXTENSIONS, build_module_index, load_modules, module_of
+from js_lexer import Token, parse_class_member, skip_balanced, skip_value, token_is, tokenize
+
+# 缓存文档名
+CLASS_DOCUMENT = 'class_index'
+
+# 提取规则变化时递增
+CLASS_INDEX_VERSION = 4
+
+# 每张类图最多的类数与每个类最多显示的字段 / 方法数
+MAX_DIAGRAM_CLASSES = 30
+MAX_CLASS_MEMBERS = 12
+
+# 不作为继承关系显示的基类
+IGNORED_BASES = {'object', 'Generic', 'Protocol', 'ABC', 'Object'}
+
+TS_MEMBER_MODIFIERS = {
+    'public', 'private', 'protected', 'static', 'readonly', 'abstract',
+    'override', 'declare', 'async', 'accessor',
+}
+TS_VISIBILITY = {'private': '-', 'protected': '#', 'public': '+'}
+
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+
+
+def _visibility(name: str) -> str:
+    if name.startswith('__') and name.endswith('__'):
+        return '+'
+    return '-' if name.startswith(('_', '#')) else '+'
+
+
+def _type_names(text: str) -> List[str]:
+    """类型表达式中出现的标识符 (组合关系的候选)"""
+    return list(dict.fromkeys(_IDENTIFIER.findall(text)))
+
+
+def _base_name(text: str) -> str:
+    """`pkg.Base[T]` / `Base<T>` -> `Base`"""
+    return re.split(r'[\[<(]', text, 1)[0].strip().rsplit('.', 1)[-1]
+
+
+# --- Python ---
+
+
+def _python_field(target: ast.AST, annotation: Optional[ast.AST], value: Optional[ast.AST],
+                  self_name: Optional[str] = None,
+                  params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    if self_name:
+        if not (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                and target.value.id == self_name):
+            return None
+        name = target.attr
+    elif isinstance(target, ast.Name):
+        name = target.id
+    else:
+        return None
+
+    type_text = ast.unparse(annotation) if annotation is not None else ''
+    # self.store = store (参数有注解) 或 self.store = Store(...) 推断字段类型
+    if not type_text and params and isinstance(value, ast.Name):
+        type_text = params.get(value.id, '')
+    if not type_text and isinstance(value, ast.Call):
+        func = value.func
+        if isinstance(func, ast.Name):
+            type_text = func.id
+        elif isinstance(func, ast.Attribute):
+            type_text = func.attr
+    return {'name': name, 'type': type_text, 'visibility': _visibility(name)}
+
+
+def _python_class(node: ast.ClassDef, qualname: str) -> Dict[str, Any]:
+    fields: Dict[str, Dict[str, str]] = {}
+    methods = []
+    for item in node.body:
+        if isinstance(item, ast.AnnAssign):
+            field = _python_field(item.target, item.annotation, item.value)
+        elif isinstance(item, ast.Assign) and len(item.targets) == 1:
+            field = _python_field(item.targets[0], None, item.value)
+        else:
+            field = None
+        if field and not field['name'].isupper():
+            fields.setdefault(field['name'], field)
+
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if item.name.startswith('__') and item.name.endswith('__') and item.name != '__init__':
+                continue
+            decorators = {d.id for d in item.decorator_list if isinstance(d, ast.Name)}
+            if 'property' in decorators:
+                returns = ast.unparse(item.returns) if item.returns else ''
+                fields.setdefault(item.name, {'name': item.name, 'type': returns,
+                                              'visibility': _visibility(item.name)})
+                continue
+            methods.append({'name': item.name, 'visibility': _visibility(item.name)})
+            if item.name == '__init__' and item.args.args:
+                self_name = item.args.args[0].arg
+                params = {arg.arg: ast.unparse(arg.annotation).strip('\'"')
+                          for arg in item.args.args + item.args.kwonlyargs if arg.annotation}
+                for stmt in ast.walk(item):
+                    if isinstance(stmt, ast.AnnAssign):
+                        field = _python_field(stmt.target, stmt.annotation, stmt.value, self_name, params)
+                    elif isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+                        field = _python_field(stmt.targets[0], None, stmt.value, self_name, params)
+                    else:
+                        continue
+                    if field:
+                        fields.setdefault(field['name'], field)
+
+    bases = [_base_name(ast.unparse(base)) for base in node.bases]
+    return {
+        'name': qualname,
+        'kind': 'class',
+        'line': node.lineno,
+        'bases': [b for b in bases if b and b not in IGNORED_BASES],
+        'implements': [],
+        'fields': list(fields.values()),
+        'methods': methods,
+    }
+
+
+def extract_python_classes(content: str) -> List[Dict[str, Any]]:
+    """用 ast 提取 Python 类 (含嵌套类，名称为 Outer.Inner)"""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return []
+
+    classes = []
+    stack = [(tree, '')]
+    while stack:
+        parent, prefix = stack.pop()
+        for node in ast.iter_child_nodes(parent):
+            if isinstance(node, ast.ClassDef):
+                qualname = f'{prefix}{node.name}'
+                classes.append(_python_class(node, qualname))
+                stack.append((node, qualname + '.'))
+            elif isinstance(node, (ast.If, ast.Try, ast.With)):
+                stack.append((node, prefix))
+    classes.sort(key=lambda c: c['line'])
+    return classes
+
+
+# --- JS/TS ---
+
+
+def _source_text(content: str, tokens: List[Token], start: int, end: int) -> str:
+    if start >= end:
+        return ''
+    return ' '.join(content[tokens[start].start:tokens[end - 1].end].split())
+
+
+def _parse_ts_body(content: str, tokens: List[Token], i: int, end: int,
+                   record: Dict[str, Any]) -> None:
+    """
+    解析类或接口体 (tokens[i] 为 `{` 之后的第一个记号，end 为对应 `}` 的位置)
+
+    成员由 js_lexer.parse_class_member 解析，与文档提取、调用图保持一致。
+    """
+    fields: Dict[str, Dict[str, str]] = {}
+    methods = []
+    while i < end:
+        if tokens[i].kind == 'doc' or token_is(tokens, i, ';', ','):
+            i += 1
+            continue
+        if token_is(tokens, i, '['):
+            # 索引签名 / 计算属性
+            i = skip_value(content, tokens, skip_balanced(tokens, i))
+            continue
+        if token_is(tokens, i, '{'):
+            # 静态初始化块
+            i = skip_balanced(tokens, i)
+            continue
+        member = parse_class_member(content, tokens, i)
+        if member is None or member.name_index >= end:
+            i += 1
+            continue
+        i = member.end
+        visibility = next((TS_VISIBILITY[m] for m in member.modifiers if m in TS_VISIBILITY), None)
+        visibility = visibility or _visibility(member.name)
+
+        if member.name == 'constructor' and member.params >= 0:
+            params_end = skip_balanced(tokens, member.params) - 1
+            _parse_parameter_properties(content, tokens, member.params + 1, params_end, fields)
+        elif member.kind == 'method':
+            methods.append({'name': member.name, 'visibility': visibility})
+        else:
+            type_text = _source_text(content, tokens, *member.type_range)
+            value = tokens[member.value_range[0]:member.value_range[1]]
+            if not type_text and len(value) > 1 and value[0].value == 'new' and value[1].kind == 'ident':
+                type_text = value[1].value
+            fields.setdefault(member.name, {'name': member.name, 'type': type_text, 'visibility': visibility})
+
+    record['fields'] = list(fields.values())
+    record['methods'] = methods
+
+
+def _parse_parameter_properties(content: str, tokens: List[Token], i: int, end: int,
+                                fields: Dict[str, Dict[str, str]]) -> None:
+    """constructor(private readonly store: Store) 中带修饰符的参数是字段"""
+    while i < end:
+        visibility = None
+        has_modifier = False
+        while i < end and tokens[i].kind == 'ident' and tokens[i].value in TS_MEMBER_MODIFIERS:
+            visibility = TS_VISIBILITY.get(tokens[i].value, visibility)
+            has_modifier = True
+            i += 1
+        param_end = i
+        while param_end < end and tokens[param_end].value != ',':
+            if tokens[param_end].value in ('(', '[', '{', '<') and tokens[param_end].kind == 'punct':
+                param_end = skip_balanced(tokens, param_end)
+            else:
+                param_end += 1
+        if has_modifier and i < param_end and tokens[i].kind == 'ident':
+            name = tokens[i].value
+            type_text = ''
+            colon = next((j for j in range(i, param_end) if tokens[j].value == ':'), None)
+            if colon is not None:
+                eq = next((j for j in range(colon, param_end) if tokens[j].value == '='), param_end)
+                type_text = _source_text(content, tokens, colon + 1, eq)
+            fields.setdefault(name, {'name': name, 'type': type_text,
+                                     'visibility': visibility or _visibility(name)})
+        i = param_end + 1
+
+
+def extract_ts_classes(content: str) -> List[Dict[str, Any]]:
+    """用 js_lexer 记号提取 JS/TS 类与接口"""
+    tokens = tokenize(content)
+    classes = []
+    line_index = LineIndex(content)
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if (token.kind != 'ident' or token.value not in ('class', 'interface')
+                or i + 1 >= len(tokens) or (i > 0 and tokens[i - 1].value in ('.', '?.'))):
+            i += 1
+            continue
+        kind = token.value
+        following = tokens[i + 1]
+        if following.kind == 'ident' and following.value not in ('extends', 'implements'):
+            name = following.value
+            i += 2
+        elif kind == 'class' and i > 0 and tokens[i - 1].value == 'default':
+            # export default class extends Base {} / export default class {}
+            name = 'default'
+            i += 1
+        else:
+            i += 1
+            continue
+        record = {'name': name, 'kind': kind, 'line': line_index.line_of(token.start),
+                  'bases': [], 'implements': [], 'fields': [], 'methods': []}
+        if i < len(tokens) and tokens[i].value == '<':
+            i = skip_balanced(tokens, i)
+        # extends / implements 子句
+        relation = 'bases'
+        while i < len(tokens) and tokens[i].value != '{':
+            if tokens[i].kind == 'ident' and tokens[i].value in ('extends', 'implements'):
+                relation = 'bases' if tokens[i].value == 'extends' else 'implements'
+                i += 1
+                continue
+            if tokens[i].kind == 'ident':
+                name = tokens[i].value
+                while i + 2 < len(tokens) and tokens[i + 1].value == '.' and tokens[i + 2].kind == 'ident':
+                    i += 2
+                    name = tokens[i].value
+                if name not in IGNORED_BASES:
+                    record[relation].append(name)
+                i += 1
+                if i < len(tokens) and tokens[i].value == '<':
+                    i = skip_balanced(tokens, i)
+                continue
+            if tokens[i].value in ('(', '['):
+                i = skip_balanced(tokens, i)
+                continue
+            if tokens[i].value in (';', '}'):
+                break
+            i += 1
+        if i >= len(tokens) or tokens[i].value != '{':
+            continue
+        body_end = skip_balanced(tokens, i) - 1
+        _parse_ts_body(content, tokens, i + 1, body_end, record)
+        classes.append(record)
+        i = body_end + 1
+    return classes
+
+
+def extract_classes(file_path: str, content: str) -> List[Dict[str, Any]]:
+    """按文件类型提取类"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in PY_EXTENSIONS:
+        return extract_python_classes(content)
+    if ext in JS_EXTENSIONS:
+        return extract_ts_classes(content)
+    return []
+
+
+# --- 索引与类图 ---
+
+
+def _parse_file(rel_path: str, content: str) -> Dict[str, Any]:
+    return {'classes': extract_classes(rel_path, content)}
+
+
+def load_class_index(wiki_dir: str) -> Dict[str, Any]:
+    """加载缓存的类索引"""
+    return load_file_index(wiki_dir, CLASS_DOCUMENT, CLASS_INDEX_VERSION)
+
+
+def update_class_index(project_root: str, checksums: Optional[Dict[str, str]] = None,
+                       workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    增量更新类索引 (只重新解析哈希变化的文件)
+
+    Returns:
+        {"updated": 重新解析的文件数, "removed": 删除的文件数, "classes": 类总数}
+    """
+    index, counts = update_file_index(project_root, CLASS_DOCUMENT, CLASS_INDEX_VERSION,
+                                      JS_EXTENSIONS + PY_EXTENSIONS, _parse_file, checksums, workers)
+    save_file_index(str(Path(project_root) / '.mini-wiki'), CLASS_DOCUMENT, index)
+    total = sum(len(record['classes']) for record in index['files'].values())
+    return {**counts, 'classes': total}
+
+
+def module_classes(index: Dict[str, Any], modules: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    按模块汇总类，并解析组合关系
+
+    字段类型中出现的项目内类名记为组合 (`composes`)，继承关系保留在 `bases`。
+
+    Returns:
+        {模块名: [类信息]}，可直接传给 generate_class_diagram
+    """
+    module_index = build_module_index(modules)
+    known: Set[str] = set()
+    for record in index.get('files', {}).values():
+        known.update(c['name'].rsplit('.', 1)[-1] for c in record.get('classes', []))
+
+    result: Dict[str, List[Dict[str, Any]]] = {m['name']: [] for m in modules}
+    for file, record in index.get('files', {}).items():
+        module = module_of(file, module_index)
+        if module is None:
+            continue
+        for cls in record.get('classes', []):
+            own_name = cls['name'].rsplit('.', 1)[-1]
+            composes = []
+            for field in cls['fields']:
+                composes.extend(t for t in _type_names(field['type']) if t in known and t != own_name)
+            result[module].append({
+                'name': cls['name'],
+                'kind': cls['kind'],
+                'file': file,
+                'line': cls['line'],
+                'bases': cls['bases'],
+                'implements': cls['implements'],
+                'composes': list(dict.fromkeys(composes)),
+                'properties': [f"{f['visibility']}{f['name']}: {f['type']}" if f['type']
+                               else f"{f['visibility']}{f['name']}" for f in cls['fields']],
+                'methods': [f"{m['visibility']}{m['name']}" for m in cls['methods']],
+            })
+    return result
+
+
+def generate_module_class_diagrams(index: Dict[str, Any], modules: List[Dict[str, Any]],
+                                   max_classes: int = MAX_DIAGRAM_CLASSES,
+                                   cache: Optional[DiagramCache] = None) -> Dict[str, str]:
+    """
+    为每个包含类的模块生成 classDiagram
+
+    类较多的模块拆分为多个代码块 (每块最多 max_classes 个类)，不会丢弃类。
+    提供 cache 时，类信息未变化的模块直接复用缓存的图表。
+    """
+    def render(classes: List[Dict[str, Any]]) -> str:
+        return '\n\n'.join(
+            generate_class_diagram(classes[i:i + max_classes], max_classes=max_classes,
+                                   max_members=MAX_CLASS_MEMBERS)
+            for i in range(0, len(classes), max_classes)
+        )
+
+    diagrams = {}
+    for name, classes in module_classes(index, modules).items():
+        if not classes:
+            continue
+        if cache is None:
+            diagrams[name] = render(classes)
+        else:
+            # 行号不参与渲染，类上方的改动不应使缓存失效
+            inputs = {'classes': [{k: v for k, v in c.items() if k != 'line'} for c in classes],
+                      'max_classes': max_classes, 'max_members': MAX_CLASS_MEMBERS}
+            diagrams[name] = cache.render(f'class:{name}', inputs, lambda: render(classes))
+    return diagrams
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 类索引与类图")
+    parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    parser.add_argument("--module", default=None, help="只输出指定模块的类图")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出各模块的类信息")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数")
+    args = parser.parse_args()
+
+    from detect_changes import detect_changes
+
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+    checksums = detect_changes(args.project_path, track_symbols=False)["current_checksums"]
+    counts = update_class_index(args.project_path, checksums, args.workers)
+    modules = load_modules(args.project_path)
+    index = load_class_index(wiki_dir)
+
+    if args.json:
+        print(json.dumps(module_classes(index, modules), indent=2, ensure_ascii=False))
+        return 0
+    print(f"✅ 类索引: 解析 {counts['updated']} 个文件, 删除 {counts['removed']} 个文件, "
+          f"共 {counts['classes']} 个类")
+    diagrams = generate_module_class_diagrams(index, modules)
+    if args.module:
+        if args.module not in diagrams:
+            print(f"❌ 模块中没有类: {args.module}")
+            return 1
+        diagrams = {args.module: diagrams[args.module]}
+    for name, diagram in diagrams.items():
+        print(f"\n=== 类图: {name} ===")
+        print(diagram)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
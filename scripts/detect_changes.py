@@ -4,12 +4,24 @@
 对比文件校验和，检测项目变更以支持增量更新
 """
 
+import argparse
 import json
 import hashlib
+import mmap
 import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+import cache_store
+from file_walker import walk_project
+from path_matcher import ExcludeMatcher, PathMatcher
+from wiki_config import load_scan_settings
 
 # 默认排除规则
 DEFAULT_EXCLUDES = {
@@ -30,94 +42,641 @@ CODE_EXTENSIONS = {
 # 文档扩展名
 DOC_EXTENSIONS = {'.md', '.mdx', '.rst', '.txt'}
 
+# 扫描开始前该时间窗口内修改的文件不记录 stat (纳秒)
+RACY_WINDOW_NS = 2_000_000_000
+
+# 哈希读取缓冲区大小
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# 超过该大小的文件使用 mmap 计算哈希
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# 默认哈希线程数 (I/O 密集，hashlib 计算时会释放 GIL)
+DEFAULT_HASH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+@dataclass
+class HashStats:
+    """哈希阶段的吞吐统计"""
+    files: int = 0
+    total_bytes: int = 0
+    seconds: float = 0.0
+    workers: int = 1
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.total_bytes / 1024 / 1024 / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "bytes": self.total_bytes,
+            "seconds": round(self.seconds, 4),
+            "workers": self.workers,
+            "files_per_sec": round(self.files_per_sec, 1),
+            "mb_per_sec": round(self.mb_per_sec, 2),
+        }
+
 
 def calculate_file_hash(file_path: str) -> str:
     """计算文件的 SHA256 哈希值"""
     sha256 = hashlib.sha256()
     try:
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    sha256.update(mapped)
+            else:
+                for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b''):
+                    sha256.update(chunk)
         return sha256.hexdigest()[:16]  # 只取前16位
-    except OSError:
+    except (OSError, ValueError):
         return ""
 
 
+def hash_files(file_paths: List[str], workers: Optional[int] = None) -> List[str]:
+    """
+    使用有界线程池并行计算文件哈希
+    
+    Args:
+        file_paths: 文件路径列表
+        workers: 线程数，默认 DEFAULT_HASH_WORKERS，1 表示串行
+    
+    Returns:
+        与 file_paths 顺序一致的哈希列表
+    """
+    if workers is None:
+        workers = DEFAULT_HASH_WORKERS
+    if workers <= 1 or len(file_paths) <= 1:
+        return [calculate_file_hash(p) for p in file_paths]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(calculate_file_hash, file_paths))
+
+
+@lru_cache(maxsize=32)
+def _compile_exclude_set(excludes: FrozenSet[str]) -> ExcludeMatcher:
+    return ExcludeMatcher(excludes)
+
+
 def should_include_file(file_path: Path, excludes: Set[str]) -> bool:
-    """判断文件是否应该被包含"""
-    # 检查是否在排除目录中
-    for part in file_path.parts:
-        if part in excludes:
-            return False
-        # 检查 glob 模式
-        for pattern in excludes:
-            if pattern.startswith('*') and file_path.name.endswith(pattern[1:]):
-                return False
+    """判断文件是否应该被包含 (兼容接口，规则编译后缓存)"""
+    return is_scannable(_compile_exclude_set(frozenset(excludes)), str(file_path))
+
+
+def stat_signature(st: os.stat_result) -> Dict[str, int]:
+    """提取用于快速比对的 stat 字段"""
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+    }
+
+
+def stat_unchanged(record: Dict[str, Any], st: os.stat_result) -> bool:
+    """缓存记录中的 (size, mtime_ns, inode) 与当前 stat 是否一致"""
+    return (
+        record.get("size") == st.st_size
+        and record.get("mtime_ns") == st.st_mtime_ns
+        and record.get("inode") == st.st_ino
+    )
+
+
+def compile_excludes(excludes: Union[Set[str], ExcludeMatcher, None]) -> ExcludeMatcher:
+    """将排除规则编译为 ExcludeMatcher (已编译的直接返回)"""
+    if isinstance(excludes, ExcludeMatcher):
+        return excludes
+    return _compile_exclude_set(frozenset(DEFAULT_EXCLUDES if excludes is None else excludes))
+
+
+def is_scannable(matcher: ExcludeMatcher, rel_path: str) -> bool:
+    """判断相对路径 (未经遍历剪枝) 是否应参与扫描"""
+    parts = rel_path.split(os.sep)
+    if any(matcher.excludes_dir(part) for part in parts[:-1]):
+        return False
+    if matcher.excludes_file(parts[-1]):
+        return False
+    suffix = os.path.splitext(parts[-1])[1]
+    return suffix in CODE_EXTENSIONS or suffix in DOC_EXTENSIONS
+
+
+def scan_project_records(project_root: str, excludes: Union[Set[str], ExcludeMatcher, None] = None,
+                         cached: Optional[Dict[str, Dict[str, Any]]] = None,
+                         paranoid: bool = False, workers: Optional[int] = None,
+                         stats: Optional[HashStats] = None,
+                         max_file_size: Optional[int] = None,
+                         use_gitignore: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    扫描项目文件，生成包含校验和与 stat 信息的记录
+    
+    stat 信息与缓存一致的文件直接复用缓存中的校验和，不再读取文件内容。
+    
+    Args:
+        project_root: 项目根目录
+        excludes: 排除规则
+        cached: 缓存的校验和记录 (来自 checksums.json)
+        paranoid: 为 True 时忽略 stat 快速路径，重新计算所有文件的校验和
+        workers: 哈希线程数，默认 DEFAULT_HASH_WORKERS
+        stats: 可选的 HashStats，用于回传哈希吞吐统计
+        max_file_size: 超过该大小 (字节) 的文件在 stat 阶段直接跳过
+        use_gitignore: 是否应用 .gitignore / .mini-wikiignore 规则
+    
+    Returns:
+        {相对路径: {"hash", "size", "mtime_ns", "inode"}}
+    """
+    matcher = compile_excludes(excludes)
+    path_filter = PathMatcher(project_root, matcher).is_ignored if use_gitignore else None
+    if cached is None:
+        cached = {}
+    
+    records: Dict[str, Dict[str, Any]] = {}
+    candidates: List[Tuple[str, str, os.stat_result]] = []
+    
+    # 排除目录与被忽略的目录在遍历时直接剪枝，不会进入 node_modules、构建产物等目录
+    for entry in walk_project(project_root, matcher, path_filter):
+        suffix = entry.suffix
+        if suffix not in CODE_EXTENSIONS and suffix not in DOC_EXTENSIONS:
+            continue
+        if path_filter is None and matcher.excludes_file(entry.name):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            records[entry.rel_path] = {"hash": ""}
+            continue
+        if max_file_size and st.st_size > max_file_size:
+            continue
+        candidates.append((entry.rel_path, entry.path, st))
     
-    # 只包含代码和文档文件
-    return file_path.suffix in CODE_EXTENSIONS or file_path.suffix in DOC_EXTENSIONS
+    records.update(build_file_records(candidates, cached, paranoid, workers, stats))
+    return dict(sorted(records.items()))
 
 
-def scan_project_files(project_root: str, excludes: Optional[Set[str]] = None) -> Dict[str, str]:
+def build_file_records(files: List[Tuple[str, str, os.stat_result]],
+                       cached: Dict[str, Dict[str, Any]], paranoid: bool = False,
+                       workers: Optional[int] = None,
+                       stats: Optional[HashStats] = None) -> Dict[str, Dict[str, Any]]:
     """
-    扫描项目文件并计算校验和
+    为给定文件生成校验和记录，stat 与缓存一致的文件跳过读取
+    
+    Args:
+        files: [(相对路径, 绝对路径, stat 结果)]
+        cached: 缓存的校验和记录
+        paranoid: 忽略 stat 快速路径
+        workers: 哈希线程数
+        stats: 可选的 HashStats，用于回传哈希吞吐统计
     
     Returns:
-        {相对路径: 校验和}
+        {相对路径: {"hash", "size", "mtime_ns", "inode"}}，顺序与 files 一致
     """
-    if excludes is None:
-        excludes = DEFAULT_EXCLUDES
+    # 扫描开始前不久被修改的文件不记录 stat，下次运行时重新计算校验和，
+    # 避免同一时间戳粒度内的后续写入被快速路径漏掉
+    racy_after_ns = time.time_ns() - RACY_WINDOW_NS
+    records: Dict[str, Dict[str, Any]] = {}
+    to_hash: List[Tuple[str, str, os.stat_result]] = []
     
-    root = Path(project_root)
-    checksums = {}
+    for rel_path, abs_path, st in files:
+        previous = cached.get(rel_path)
+        if previous and previous.get("hash") and not paranoid and stat_unchanged(previous, st):
+            records[rel_path] = {"hash": previous["hash"], **stat_signature(st)}
+        else:
+            # 先占位，保证输出顺序与输入顺序一致
+            records[rel_path] = {}
+            to_hash.append((rel_path, abs_path, st))
+    
+    started = time.perf_counter()
+    hashes = hash_files([path for _, path, _ in to_hash], workers)
+    
+    for (rel_path, _, st), file_hash in zip(to_hash, hashes):
+        record: Dict[str, Any] = {"hash": file_hash}
+        if file_hash and st.st_mtime_ns < racy_after_ns:
+            record.update(stat_signature(st))
+        records[rel_path] = record
     
-    for file_path in root.rglob('*'):
-        if file_path.is_file() and should_include_file(file_path, excludes):
-            rel_path = str(file_path.relative_to(root))
-            checksums[rel_path] = calculate_file_hash(str(file_path))
+    if stats is not None:
+        stats.files = len(to_hash)
+        stats.total_bytes = sum(st.st_size for _, _, st in to_hash)
+        stats.seconds = time.perf_counter() - started
+        stats.workers = workers or DEFAULT_HASH_WORKERS
     
-    return checksums
+    return records
 
 
-def load_cached_checksums(wiki_dir: str) -> Dict[str, Dict[str, str]]:
+def scan_project_files(project_root: str,
+                       excludes: Union[Set[str], ExcludeMatcher, None] = None) -> Dict[str, str]:
+    """
+    扫描项目文件并计算校验和
+    
+    Returns:
+        {相对路径: 校验和}
+    """
+    records = scan_project_records(project_root, excludes)
+    return {path: record["hash"] for path, record in records.items()}
+
+
+def load_cached_checksums(wiki_dir: str) -> Dict[str, Dict[str, Any]]:
     """加载缓存的校验和"""
-    cache_path = Path(wiki_dir) / "cache" / "checksums.json"
-    if cache_path.exists():
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return cache_store.load_checksums(wiki_dir)
 
 
-def save_checksums(wiki_dir: str, checksums: Dict[str, Dict[str, str]]):
+def save_checksums(wiki_dir: str, checksums: Dict[str, Dict[str, Any]]):
     """保存校验和到缓存"""
-    cache_path = Path(wiki_dir) / "cache" / "checksums.json"
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(cache_path, 'w', encoding='utf-8') as f:
-        json.dump(checksums, f, indent=2, ensure_ascii=False)
+    cache_store.save_checksums(wiki_dir, checksums)
+
+
+def build_dir_hashes(checksums: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    基于文件校验和构建目录哈希树 (Merkle 树)
+    
+    每个目录的摘要由其直接子文件与子目录的摘要计算得出，
+    任意文件变更只会改变从该文件到根目录路径上的目录摘要。
+    
+    Returns:
+        {目录相对路径 ("" 为根目录): {"hash": 摘要, "dirs": [子目录名]}}
+    """
+    # 目录 -> [(类型, 名称, 摘要)]
+    children: Dict[str, List[Tuple[str, str, str]]] = {'': []}
+    for path, file_hash in checksums.items():
+        parent, name = os.path.split(path)
+        # 补全尚未出现的祖先目录 (已出现的目录其祖先必然已存在)
+        ancestor = parent
+        while ancestor not in children:
+            children[ancestor] = []
+            ancestor = os.path.dirname(ancestor)
+        children[parent].append(('f', name, file_hash))
+    
+    tree: Dict[str, Dict[str, Any]] = {}
+    # 由深到浅计算，保证子目录先于父目录
+    for dir_path in sorted(children, key=lambda d: d.count(os.sep) + bool(d), reverse=True):
+        items = children[dir_path]
+        digest_input = '\n'.join(f'{kind} {name} {digest}' for kind, name, digest in sorted(items))
+        digest = hashlib.sha256(digest_input.encode('utf-8')).hexdigest()[:16]
+        tree[dir_path] = {
+            "hash": digest,
+            "dirs": sorted(name for kind, name, _ in items if kind == 'd'),
+        }
+        if dir_path:
+            parent, name = os.path.split(dir_path)
+            children[parent].append(('d', name, digest))
+    
+    return dict(sorted(tree.items()))
+
+
+def diff_dir_hashes(old_tree: Dict[str, Dict[str, Any]],
+                    new_tree: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    比较两棵目录哈希树，返回摘要发生变化的目录
+    
+    从根目录开始只进入摘要不同的目录，未变更的子树整体跳过。
+    """
+    changed = []
+    stack = ['']
+    while stack:
+        dir_path = stack.pop()
+        old_node = old_tree.get(dir_path)
+        new_node = new_tree.get(dir_path)
+        if old_node and new_node and old_node["hash"] == new_node["hash"]:
+            continue
+        changed.append(dir_path)
+        names = set((old_node or {}).get("dirs", [])) | set((new_node or {}).get("dirs", []))
+        stack.extend(os.path.join(dir_path, name) for name in names)
+    return sorted(changed)
+
+
+def is_dir_changed(old_tree: Dict[str, Dict[str, Any]], new_tree: Dict[str, Dict[str, Any]],
+                   dir_path: str) -> bool:
+    """判断目录 (如模块路径) 下是否有变更"""
+    dir_path = os.path.normpath(dir_path) if dir_path not in ('', '.') else ''
+    old_node = old_tree.get(dir_path)
+    new_node = new_tree.get(dir_path)
+    if old_node is None or new_node is None:
+        return old_node is not new_node
+    return old_node["hash"] != new_node["hash"]
+
+
+def find_changed_modules(modules: List[Dict[str, Any]], old_tree: Dict[str, Dict[str, Any]],
+                         new_tree: Dict[str, Dict[str, Any]]) -> List[str]:
+    """根据目录哈希树找出有变更的模块 (modules 来自 structure.json)"""
+    return [m['name'] for m in modules if is_dir_changed(old_tree, new_tree, m.get('path', ''))]
+
+
+def load_dir_hashes(wiki_dir: str) -> Dict[str, Dict[str, Any]]:
+    """加载缓存的目录哈希树"""
+    return cache_store.load_document(wiki_dir, 'dir_hashes') or {}
+
 
+def save_dir_hashes(wiki_dir: str, tree: Dict[str, Dict[str, Any]]):
+    """保存目录哈希树到缓存"""
+    cache_store.save_document(wiki_dir, 'dir_hashes', tree)
 
-def detect_changes(project_root: str, excludes: Optional[Set[str]] = None) -> Dict[str, Any]:
+
+def run_git(project_root: str, args: List[str]) -> Optional[str]:
+    """在项目目录下执行 git 命令，失败时返回 None"""
+    try:
+        completed = subprocess.run(
+            ['git', *args], cwd=project_root, capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.decode('utf-8', errors='surrogateescape')
+
+
+def get_head_commit(project_root: str) -> Optional[str]:
+    """获取当前 HEAD 提交，非 git 仓库时返回 None"""
+    output = run_git(project_root, ['rev-parse', '--verify', '--quiet', 'HEAD'])
+    return output.strip() if output else None
+
+
+def load_last_commit(wiki_dir: str) -> Optional[str]:
+    """读取上次更新 wiki 时记录的提交 (meta.json 的 last_commit)"""
+    meta_path = Path(wiki_dir) / "meta.json"
+    if meta_path.exists():
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("last_commit")
+        except (OSError, json.JSONDecodeError):
+            return None
+    return None
+
+
+def save_last_commit(wiki_dir: str, commit: str, dirty_paths: Optional[List[str]] = None) -> None:
+    """
+    将提交记录到 meta.json 的 last_commit
+
+    Args:
+        dirty_paths: 记录时相对该提交有未提交修改的已跟踪文件。这些文件的缓存哈希
+            来自工作区而非提交，之后即使改回与提交一致，git 也不会再报告它们
+    """
+    meta_path = Path(wiki_dir) / "meta.json"
+    meta: Dict[str, Any] = {}
+    if meta_path.exists():
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            meta = {}
+    meta["last_commit"] = commit
+    if dirty_paths:
+        meta["dirty_paths"] = sorted(p.replace(os.sep, '/') for p in dirty_paths)
+    else:
+        meta.pop("dirty_paths", None)
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+
+def load_dirty_paths(wiki_dir: str) -> Set[str]:
+    """读取记录 last_commit 时有未提交修改的文件 (本地路径分隔符)"""
+    meta_path = Path(wiki_dir) / "meta.json"
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            paths = json.load(f).get("dirty_paths") or []
+    except (OSError, json.JSONDecodeError):
+        return set()
+    return {p.replace('/', os.sep) for p in paths}
+
+
+def get_dirty_paths(project_root: str) -> List[str]:
+    """获取相对 HEAD 有未提交修改 (含暂存) 的已跟踪文件，非 git 仓库时返回空列表"""
+    output = run_git(project_root, ['diff', '--name-only', '-z', '--no-renames', '--relative', 'HEAD', '--'])
+    return _split_git_paths(output or '')
+
+
+def _split_git_paths(output: str) -> List[str]:
+    """解析 -z 输出的路径列表并转换为本地路径分隔符"""
+    return [p.replace('/', os.sep) for p in output.split('\0') if p]
+
+
+def collect_git_candidates(project_root: str, since: str, excludes: ExcludeMatcher,
+                           similarity: Optional[int] = None,
+                           path_matcher: Optional[PathMatcher] = None
+                           ) -> Optional[Tuple[Set[str], Set[str], List[Tuple[str, str, int]]]]:
+    """
+    通过 git 获取当前文件列表与自 since 以来可能变更的文件
+    
+    已跟踪文件由 git 借助自身索引判断是否变更，无需读取内容；
+    未跟踪文件全部作为候选，交给校验和扫描处理。
+    
+    Args:
+        similarity: 相似度阈值 (百分比)，提供时启用 git 的重命名检测
+        path_matcher: 可选的 PathMatcher，与扫描模式保持一致的忽略规则
+    
+    Returns:
+        (当前文件集合, 候选变更文件集合, [(原路径, 新路径, 相似度)])，
+        git 不可用或引用无效时返回 None
+    """
+    rename_arg = f'--find-renames={similarity}%' if similarity else '--no-renames'
+    tracked_out = run_git(project_root, ['ls-files', '-z'])
+    diff_out = run_git(project_root, ['diff', '--name-status', '-z', rename_arg,
+                                      '--relative', since, '--'])
+    if tracked_out is None or diff_out is None:
+        return None
+    missing_out = run_git(project_root, ['ls-files', '-z', '--deleted']) or ''
+    untracked_out = run_git(project_root, ['ls-files', '-z', '--others', '--exclude-standard']) or ''
+    
+    # --name-status -z 输出形如 "M\0path\0R087\0old\0new\0"
+    fields = _split_git_paths(diff_out)
+    changed: Set[str] = set()
+    removed: Set[str] = set()
+    renames: List[Tuple[str, str, int]] = []
+    i = 0
+    while i + 1 < len(fields):
+        status = fields[i]
+        if status[:1] in ('R', 'C') and i + 2 < len(fields):
+            old_path, new_path = fields[i + 1], fields[i + 2]
+            changed.add(new_path)
+            if status[0] == 'R':
+                removed.add(old_path)
+                renames.append((old_path, new_path, int(status[1:] or 100)))
+            i += 3
+            continue
+        if status.startswith('D'):
+            removed.add(fields[i + 1])
+        else:
+            changed.add(fields[i + 1])
+        i += 2
+    removed.update(_split_git_paths(missing_out))
+    
+    untracked = set(_split_git_paths(untracked_out))
+    current = (set(_split_git_paths(tracked_out)) - removed) | untracked
+    current = {p for p in current if is_scannable(excludes, p)
+               and not (path_matcher and path_matcher.is_path_ignored(p))}
+    candidates = (changed | untracked) & current
+    return current, candidates, renames
+
+
+def detect_renames(added: List[str], deleted: List[str], current_checksums: Dict[str, str],
+                   cached_checksums: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    按内容哈希匹配删除与新增的文件，识别重命名/移动
+    
+    同一哈希有多个候选时优先匹配文件名相同的路径，其余按路径顺序配对。
+    
+    Returns:
+        [{"from": 原路径, "to": 新路径, "similarity": 100}]
+    """
+    deleted_by_hash: Dict[str, List[str]] = {}
+    for path in sorted(deleted):
+        file_hash = cached_checksums.get(path, '')
+        if file_hash:
+            deleted_by_hash.setdefault(file_hash, []).append(path)
+    
+    added_by_hash: Dict[str, List[str]] = {}
+    for path in sorted(added):
+        file_hash = current_checksums.get(path, '')
+        if file_hash in deleted_by_hash:
+            added_by_hash.setdefault(file_hash, []).append(path)
+    
+    renamed = []
+    for file_hash, targets in added_by_hash.items():
+        sources = deleted_by_hash[file_hash]
+        # 先配对文件名相同的路径
+        for target in list(targets):
+            name = os.path.basename(target)
+            source = next((s for s in sources if os.path.basename(s) == name), None)
+            if source is not None:
+                renamed.append({"from": source, "to": target, "similarity": 100})
+                sources.remove(source)
+                targets.remove(target)
+        for source, target in zip(sources, targets):
+            renamed.append({"from": source, "to": target, "similarity": 100})
+    
+    return sorted(renamed, key=lambda r: r["to"])
+
+
+def diff_symbols(old_symbols: Dict[str, str], new_symbols: Dict[str, str]) -> Dict[str, List[str]]:
+    """比较文件前后的符号哈希"""
+    return {
+        "symbols_added": sorted(new_symbols.keys() - old_symbols.keys()),
+        "symbols_changed": sorted(
+            name for name in new_symbols.keys() & old_symbols.keys()
+            if new_symbols[name] != old_symbols[name]
+        ),
+        "symbols_removed": sorted(old_symbols.keys() - new_symbols.keys()),
+    }
+
+
+def collect_symbols(project_root: str, paths: List[str], checksums: Dict[str, str],
+                    workers: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """
+    提取源文件的符号哈希 (结果按内容哈希缓存在 cache/docs/，未命中的文件较多时并行计算)
+
+    Returns:
+        {文件: {符号名: 符号哈希}}，不支持提取文档的文件不出现在结果中
+    """
+    # 延迟导入: extract_docs 依赖本模块的排除规则与哈希函数
+    from extract_docs import SOURCE_EXTENSIONS, extract_files_symbols
+    
+    wiki_dir = str(Path(project_root) / ".mini-wiki")
+    sources = [path for path in paths if os.path.splitext(path)[1].lower() in SOURCE_EXTENSIONS]
+    return extract_files_symbols(project_root, sources, checksums, wiki_dir, workers)
+
+
+def detect_changes(project_root: str, excludes: Union[Set[str], ExcludeMatcher, None] = None,
+                   paranoid: bool = False, workers: Optional[int] = None,
+                   since: Optional[str] = None,
+                   rename_similarity: Optional[int] = None,
+                   max_file_size: Optional[int] = None,
+                   use_gitignore: bool = True,
+                   track_symbols: bool = True) -> Dict[str, Any]:
     """
     检测项目变更
     
+    Args:
+        project_root: 项目根目录
+        excludes: 排除规则，默认为 DEFAULT_EXCLUDES 与 config.yaml 中 exclude 的合集
+        paranoid: 忽略 stat 快速路径，重新读取并校验所有文件
+        workers: 哈希线程数，默认 DEFAULT_HASH_WORKERS
+        since: git 引用 (如上次更新 wiki 时的提交)。提供时只对 git 报告的变更文件、
+            未跟踪文件以及上次更新时有未提交修改的文件计算校验和；
+            非 git 仓库或引用无效时回退到全量扫描
+        rename_similarity: git 模式下的重命名相似度阈值 (百分比)，用于识别
+            移动后又有修改的文件；内容完全相同的移动始终按哈希识别
+        max_file_size: 跳过大于该大小 (字节) 的文件，默认读取 config.yaml 的
+            generation.max_file_size
+        use_gitignore: 是否应用 .gitignore / .mini-wikiignore 规则
+        track_symbols: 存在 .mini-wiki 目录时，为新增、修改及缺少符号记录的源文件
+            提取符号哈希 (文件较多时使用进程池)，并报告修改文件的符号级变更
+    
     Returns:
         {
             "added": [新增的文件列表],
             "modified": [修改的文件列表],
             "deleted": [删除的文件列表],
+            "renamed": [{"from": 原路径, "to": 新路径, "similarity": 相似度}],
             "unchanged": [未变更的文件列表],
+            "changed_dirs": [摘要发生变化的目录],
+            "changed_modules": [有变更的模块名 (基于 structure.json)],
+            "symbol_changes": {修改的文件: {"symbols_added", "symbols_changed", "symbols_removed"}},
             "has_changes": bool,
-            "summary": 变更摘要字符串
+            "summary": 变更摘要字符串,
+            "mode": "git" 或 "scan"
         }
     """
+    # 读取 config.yaml 中的排除规则与文件大小限制
+    settings = load_scan_settings(project_root, DEFAULT_EXCLUDES)
+    matcher = settings.matcher if excludes is None else compile_excludes(excludes)
+    if max_file_size is None:
+        max_file_size = settings.max_file_size
+    
     root = Path(project_root)
     wiki_dir = root / ".mini-wiki"
     
-    # 获取当前文件校验和
-    current_checksums = scan_project_files(project_root, excludes)
-    
     # 加载缓存的校验和
     cached = load_cached_checksums(str(wiki_dir))
+    hash_stats = HashStats()
+    
+    git_files = None
+    git_renames: List[Tuple[str, str, int]] = []
+    if since and not paranoid:
+        path_matcher = PathMatcher(project_root, matcher) if use_gitignore else None
+        git_files = collect_git_candidates(project_root, since, matcher, rename_similarity, path_matcher)
+    
+    if git_files is not None:
+        current_files, candidates, git_renames = git_files
+        # 上次更新时工作区有修改的文件，缓存哈希可能与 since 的内容不一致
+        candidates = candidates | load_dirty_paths(str(wiki_dir))
+        files = []
+        records: Dict[str, Dict[str, Any]] = {}
+        for rel_path in sorted(current_files):
+            previous = cached.get(rel_path)
+            if rel_path not in candidates and previous and previous.get("hash"):
+                if max_file_size and previous.get("size", 0) > max_file_size:
+                    continue
+                # git 报告未变更，直接沿用缓存记录
+                records[rel_path] = {k: previous[k] for k in ("hash", "size", "mtime_ns", "inode")
+                                     if k in previous}
+                continue
+            abs_path = root / rel_path
+            try:
+                st = abs_path.stat()
+            except OSError:
+                records[rel_path] = {"hash": ""}
+                continue
+            if max_file_size and st.st_size > max_file_size:
+                continue
+            files.append((rel_path, str(abs_path), st))
+        records.update(build_file_records(files, cached, workers=workers, stats=hash_stats))
+        records = dict(sorted(records.items()))
+        mode = "git"
+    else:
+        # 获取当前文件校验和 (stat 未变的文件复用缓存)
+        records = scan_project_records(project_root, matcher, cached=cached, paranoid=paranoid,
+                                       workers=workers, stats=hash_stats, max_file_size=max_file_size,
+                                       use_gitignore=use_gitignore)
+        mode = "scan"
+    
+    current_checksums = {path: record["hash"] for path, record in records.items()}
+    current_stats = {
+        path: {k: record[k] for k in ("size", "mtime_ns", "inode")}
+        for path, record in records.items() if "mtime_ns" in record
+    }
+    
     cached_checksums = {k: v.get('hash', '') for k, v in cached.items()}
     
     current_files = set(current_checksums.keys())
@@ -136,7 +695,54 @@ def detect_changes(project_root: str, excludes: Optional[Set[str]] = None) -> Di
         else:
             unchanged.append(file_path)
     
-    has_changes = bool(added or modified or deleted)
+    # 识别重命名：内容相同的按哈希匹配，其余使用 git 的相似度匹配
+    renamed = detect_renames(added, deleted, current_checksums, cached_checksums)
+    renamed_from = {r["from"] for r in renamed}
+    renamed_to = {r["to"] for r in renamed}
+    for old_path, new_path, score in git_renames:
+        if (old_path in cached_files and new_path in current_files
+                and new_path not in cached_files
+                and old_path not in renamed_from and new_path not in renamed_to):
+            renamed.append({"from": old_path, "to": new_path, "similarity": score})
+            renamed_from.add(old_path)
+            renamed_to.add(new_path)
+            # 内容有变化，文档需要更新
+            if current_checksums[new_path] != cached_checksums[old_path]:
+                modified.append(new_path)
+    renamed.sort(key=lambda r: r["to"])
+    added = [p for p in added if p not in renamed_to]
+    deleted = [p for p in deleted if p not in renamed_from]
+    
+    has_changes = bool(added or modified or deleted or renamed)
+    
+    # 符号级变更：修改的文件与上次记录的符号哈希比较，只需重新生成受影响的 API 章节
+    current_symbols: Dict[str, Dict[str, str]] = {}
+    symbol_changes: Dict[str, Dict[str, List[str]]] = {}
+    if track_symbols and wiki_dir.is_dir():
+        renamed_old = {r["to"]: r["from"] for r in renamed}
+        # 缺少符号记录的文件 (首次运行或旧版本缓存) 一并补齐
+        missing = [p for p in unchanged if "symbols" not in cached.get(p, {})]
+        current_symbols = collect_symbols(project_root, sorted(set(added) | set(modified) | set(missing)),
+                                          current_checksums)
+        for file_path in sorted(modified):
+            old_record = cached.get(renamed_old.get(file_path, file_path), {})
+            if "symbols" in old_record and file_path in current_symbols:
+                symbol_changes[file_path] = diff_symbols(old_record["symbols"], current_symbols[file_path])
+    
+    # 目录级变更：只沿摘要不同的目录向下比较
+    dir_hashes = build_dir_hashes(current_checksums)
+    cached_dir_hashes = load_dir_hashes(str(wiki_dir))
+    if not cached_dir_hashes and cached_checksums:
+        cached_dir_hashes = build_dir_hashes(cached_checksums)
+    changed_dirs = diff_dir_hashes(cached_dir_hashes, dir_hashes) if has_changes else []
+    
+    changed_modules: List[str] = []
+    if has_changes:
+        try:
+            structure = cache_store.load_document(str(wiki_dir), 'structure') or {}
+        except (OSError, json.JSONDecodeError):
+            structure = {}
+        changed_modules = find_changed_modules(structure.get('modules', []), cached_dir_hashes, dir_hashes)
     
     summary_parts = []
     if added:
@@ -145,6 +751,8 @@ def detect_changes(project_root: str, excludes: Optional[Set[str]] = None) -> Di
         summary_parts.append(f"~{len(modified)} 修改")
     if deleted:
         summary_parts.append(f"-{len(deleted)} 删除")
+    if renamed:
+        summary_parts.append(f"→{len(renamed)} 重命名")
     if not summary_parts:
         summary_parts.append("无变更")
     
@@ -152,37 +760,86 @@ def detect_changes(project_root: str, excludes: Optional[Set[str]] = None) -> Di
         "added": sorted(added),
         "modified": sorted(modified),
         "deleted": sorted(deleted),
+        "renamed": renamed,
         "unchanged": sorted(unchanged),
+        "changed_dirs": changed_dirs,
+        "changed_modules": changed_modules,
+        "symbol_changes": symbol_changes,
         "has_changes": has_changes,
         "summary": ", ".join(summary_parts),
-        "current_checksums": current_checksums
+        "mode": mode,
+        "current_checksums": current_checksums,
+        "current_stats": current_stats,
+        "current_symbols": current_symbols,
+        "dir_hashes": dir_hashes,
+        "scan_stats": hash_stats.to_dict()
     }
 
 
 def update_checksums_cache(project_root: str, current_checksums: Dict[str, str],
-                           doc_mapping: Optional[Dict[str, str]] = None) -> None:
+                           doc_mapping: Optional[Dict[str, str]] = None,
+                           file_stats: Optional[Dict[str, Dict[str, int]]] = None,
+                           renamed: Optional[List[Dict[str, Any]]] = None,
+                           symbols: Optional[Dict[str, Dict[str, str]]] = None) -> None:
     """
     更新校验和缓存
     
     Args:
         project_root: 项目根目录
         current_checksums: 当前文件校验和
-        doc_mapping: 文件到文档的映射 {源文件: 生成的文档路径}
+        doc_mapping: 文件到文档的映射 {源文件: 生成的文档路径}，未提供的文件保留原有映射
+        file_stats: 文件 stat 信息 {源文件: {"size", "mtime_ns", "inode"}} (来自 detect_changes)
+        renamed: 重命名列表 (来自 detect_changes)，原路径的文档映射迁移到新路径
+        symbols: 文件的符号哈希 {源文件: {符号名: 符号哈希}} (来自 detect_changes)，
+            内容未变的文件保留原有记录
     """
     wiki_dir = Path(project_root) / ".mini-wiki"
     
     if doc_mapping is None:
         doc_mapping = {}
+    if file_stats is None:
+        file_stats = {}
+    if symbols is None:
+        symbols = {}
+    
+    previous = load_cached_checksums(str(wiki_dir))
+    now = datetime.now(timezone.utc).isoformat()
+    
+    # 重命名的文件沿用原路径的文档映射，无需重新生成
+    for rename in renamed or []:
+        old_record = previous.get(rename["from"])
+        if old_record and rename["to"] not in previous:
+            previous[rename["to"]] = old_record
     
     cache_data = {}
     for file_path, file_hash in current_checksums.items():
-        cache_data[file_path] = {
+        old_record = previous.get(file_path, {})
+        record = {
             "hash": file_hash,
-            "doc": doc_mapping.get(file_path, ""),
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "doc": doc_mapping.get(file_path, old_record.get("doc", "")),
+            "updated_at": now,
+            **file_stats.get(file_path, {})
         }
+        # 内容、文档映射与 stat 均未变化的记录保留原时间，SQLite 后端不必重写该行
+        if "updated_at" in old_record and all(
+                record.get(key) == old_record.get(key) for key in ("hash", "doc", "size", "mtime_ns", "inode")):
+            record["updated_at"] = old_record["updated_at"]
+        if file_path in symbols:
+            record["symbols"] = symbols[file_path]
+        elif "symbols" in old_record and old_record.get("hash") == file_hash:
+            record["symbols"] = old_record["symbols"]
+        cache_data[file_path] = record
     
     save_checksums(str(wiki_dir), cache_data)
+    save_dir_hashes(str(wiki_dir), build_dir_hashes(current_checksums))
+    
+    # 文档提取缓存按内容哈希寻址，不再出现在校验和中的条目已无用
+    cache_store.evict_cached_docs(str(wiki_dir), set(current_checksums.values()))
+    
+    # 记录本次更新对应的提交，供 --since 增量检测使用
+    commit = get_head_commit(project_root)
+    if commit:
+        save_last_commit(str(wiki_dir), commit, get_dirty_paths(project_root))
 
 
 def print_changes(changes: Dict[str, Any]):
@@ -204,17 +861,119 @@ def print_changes(changes: Dict[str, Any]):
         if len(changes["modified"]) > 10:
             print(f"  ... 还有 {len(changes['modified']) - 10} 个文件")
     
+    symbol_changes = changes.get("symbol_changes") or {}
+    if symbol_changes:
+        print("\n🔣 符号级变更:")
+        for f, diff in list(symbol_changes.items())[:10]:
+            parts = [f"+{name}" for name in diff["symbols_added"]]
+            parts += [f"~{name}" for name in diff["symbols_changed"]]
+            parts += [f"-{name}" for name in diff["symbols_removed"]]
+            print(f"  {f}: {', '.join(parts) if parts else '无符号变化'}")
+        if len(symbol_changes) > 10:
+            print(f"  ... 还有 {len(symbol_changes) - 10} 个文件")
+    
     if changes["deleted"]:
         print("\n🗑️ 删除的文件:")
         for f in changes["deleted"][:10]:
             print(f"  - {f}")
         if len(changes["deleted"]) > 10:
             print(f"  ... 还有 {len(changes['deleted']) - 10} 个文件")
+    
+    if changes.get("renamed"):
+        print("\n🔀 重命名的文件:")
+        for r in changes["renamed"][:10]:
+            print(f"  {r['from']} → {r['to']}")
+        if len(changes["renamed"]) > 10:
+            print(f"  ... 还有 {len(changes['renamed']) - 10} 个文件")
 
 
-if __name__ == '__main__':
-    import sys
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 变更检测工具")
+    parser.add_argument(
+        "project_path",
+        nargs="?",
+        default=os.getcwd(),
+        help="项目根目录 (默认: 当前目录)"
+    )
+    parser.add_argument(
+        "--paranoid",
+        action="store_true",
+        help="忽略 stat 快速路径，重新读取并校验所有文件"
+    )
+    parser.add_argument(
+        "--since",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="REF",
+        help="基于 git 检测自 REF 以来的变更；省略 REF 时使用上次更新记录的提交"
+    )
+    parser.add_argument(
+        "--rename-similarity",
+        type=int,
+        default=None,
+        metavar="PCT",
+        help="git 模式下识别移动后又修改的文件的相似度阈值 (如 50)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"哈希线程数 (默认: {DEFAULT_HASH_WORKERS})"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="输出哈希吞吐统计 (files/s, MB/s)"
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="检测完成后将当前校验和写入 cache/checksums.json"
+    )
+    
+    args = parser.parse_args()
+    
+    since = args.since
+    if since == "":
+        since = load_last_commit(str(Path(args.project_path) / ".mini-wiki"))
+        if since is None:
+            print("⚠️ 未找到上次更新记录的提交，使用全量扫描")
     
-    project_path = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    changes = detect_changes(project_path)
+    changes = detect_changes(args.project_path, paranoid=args.paranoid, workers=args.workers,
+                             since=since, rename_similarity=args.rename_similarity)
     print_changes(changes)
+    
+    if args.stats:
+        stats = changes["scan_stats"]
+        print(f"\n⚡ 哈希: {stats['files']} 个文件, {stats['bytes'] / 1024 / 1024:.1f} MB, "
+              f"{stats['seconds']:.2f}s, {stats['files_per_sec']:.0f} files/s, "
+              f"{stats['mb_per_sec']:.1f} MB/s ({stats['workers']} 线程)")
+    
+    if args.update:
+        update_checksums_cache(args.project_path, changes["current_checksums"],
+                               file_stats=changes["current_stats"], renamed=changes["renamed"],
+                               symbols=changes["current_symbols"])
+        # 已建立符号索引时同步更新 (延迟导入: symbol_index 依赖本模块)
+        from symbol_index import get_index_path, sync_index
+        if get_index_path(str(Path(args.project_path) / ".mini-wiki")).exists():
+            counts = sync_index(args.project_path, changes["current_checksums"])
+            print(f"\n🔎 符号索引已更新: {counts['updated']} 个文件, 共 {counts['symbols']} 个符号")
+        # 已建立导入图时只重新解析变化的文件
+        from import_graph import GRAPH_DOCUMENT, update_import_graph
+        if cache_store.has_document(str(Path(args.project_path) / ".mini-wiki"), GRAPH_DOCUMENT):
+            counts = update_import_graph(args.project_path, changes["current_checksums"])
+            print(f"🔗 导入图已更新: {counts['updated']} 个文件, 共 {counts['edges']} 条内部依赖")
+        from class_index import CLASS_DOCUMENT, update_class_index
+        if cache_store.has_document(str(Path(args.project_path) / ".mini-wiki"), CLASS_DOCUMENT):
+            counts = update_class_index(args.project_path, changes["current_checksums"])
+            print(f"🧩 类索引已更新: {counts['updated']} 个文件, 共 {counts['classes']} 个类")
+        from call_graph import CALL_DOCUMENT, update_call_graph
+        if cache_store.has_document(str(Path(args.project_path) / ".mini-wiki"), CALL_DOCUMENT):
+            counts = update_call_graph(args.project_path, changes["current_checksums"])
+            print(f"📞 调用图已更新: {counts['updated']} 个文件, 共 {counts['edges']} 条调用边")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
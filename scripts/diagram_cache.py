@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+图表输出缓存
+渲染好的 Mermaid 文本按输入指纹 (图表类型、输入数据、生成器版本) 存放在
+.mini-wiki/cache/diagrams/ 下，输入未变化的图表直接复用，并统计命中 / 未命中次数
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Set
+
+import cache_store
+
+
+def diagram_cache_key(kind: str, inputs: Any, version: int) -> str:
+    """
+    计算图表缓存键
+
+    Args:
+        kind: 图表类型 (如 architecture、module_deps:core)
+        inputs: 渲染所需的全部输入 (可 JSON 序列化，字典键顺序不影响结果)
+        version: 生成器版本，渲染逻辑变化时递增
+    """
+    payload = json.dumps({'kind': kind, 'version': version, 'inputs': inputs},
+                         sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class DiagramCache:
+    """
+    带命中统计的图表缓存
+
+    用法: `cache.render('module_deps:core', deps, lambda: generate(...))`，
+    输入指纹命中时不调用生成函数。
+    """
+
+    def __init__(self, wiki_dir: str, version: int, enabled: bool = True):
+        self.wiki_dir = wiki_dir
+        self.version = version
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # 本次运行用到的缓存键，用于清理过期条目
+        self.used: Set[str] = set()
+
+    def render(self, kind: str, inputs: Any, generate: Callable[[], str]) -> str:
+        """返回缓存的图表，未命中时调用 generate 渲染并写入缓存"""
+        if not self.enabled:
+            self.misses += 1
+            return generate()
+        key = diagram_cache_key(kind, inputs, self.version)
+        self.used.add(key)
+        diagram = cache_store.load_cached_diagram(self.wiki_dir, key)
+        if diagram is not None:
+            self.hits += 1
+            return diagram
+        self.misses += 1
+        diagram = generate()
+        cache_store.save_cached_diagram(self.wiki_dir, key, diagram)
+        return diagram
+
+    def prune(self) -> int:
+        """删除本次运行未用到的缓存条目 (仅在完整重新生成全部图表后调用)"""
+        if not self.enabled:
+            return 0
+        return cache_store.evict_cached_diagrams(self.wiki_dir, self.used)
+
+    def stats(self) -> Dict[str, int]:
+        """命中统计"""
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+图表规模控制模块
+节点或边数超出预算时，依次对图做传递归约、按目录折叠，
+仍然超出时拆分为相互链接的子图，保证大型项目的 Mermaid 图完整且可渲染
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from graph_utils import layer_graph
+
+# 单张 Mermaid 图的默认预算
+DEFAULT_MAX_NODES = 60
+DEFAULT_MAX_EDGES = 200
+
+
+@dataclass
+class DiagramGraph:
+    """
+    与具体图表类型无关的有向图
+
+    节点 ID 为 `/` 分隔的路径 (如模块路径)，按目录折叠时据此分组；
+    links 记录拆分后指向其他子图的占位节点 {节点 ID: 子图序号}。
+    """
+    nodes: Dict[str, str]
+    edges: List[Tuple[str, str]]
+    title: str = ''
+    links: Dict[str, int] = field(default_factory=dict)
+
+    def within(self, max_nodes: int, max_edges: int) -> bool:
+        """是否在预算内"""
+        return len(self.nodes) <= max_nodes and len(self.edges) <= max_edges
+
+
+def transitive_reduction(graph: DiagramGraph) -> DiagramGraph:
+    """
+    删除可由其他路径推出的边 (a→b→c 时去掉 a→c)
+
+    先缩点再在 DAG 上归约，环内部的边全部保留。可达集合用整数位图表示，
+    整体为 O(V·E / 字长)。
+    """
+    adjacency: Dict[str, List[str]] = {}
+    for source, target in graph.edges:
+        adjacency.setdefault(source, []).append(target)
+    layered = layer_graph(list(graph.nodes), adjacency)
+
+    # 分量按逆拓扑序编号: 后继分量的编号总是更小
+    reach = [0] * len(layered.components)
+    redundant: Set[Tuple[int, int]] = set()
+    for i in range(len(layered.components)):
+        successors = layered.edges[i]
+        via_others = 0
+        for j in successors:
+            via_others |= reach[j]
+        redundant.update((i, j) for j in successors if via_others >> j & 1)
+        reach[i] = via_others
+        for j in successors:
+            reach[i] |= 1 << j
+
+    component_of = layered.component_of
+    edges = []
+    for source, target in dict.fromkeys(graph.edges):
+        if source == target or source not in component_of or target not in component_of:
+            continue
+        pair = (component_of[source], component_of[target])
+        if pair not in redundant:
+            edges.append((source, target))
+    return DiagramGraph(nodes=dict(graph.nodes), edges=edges, title=graph.title, links=dict(graph.links))
+
+
+def _group_key(node_id: str, depth: int) -> str:
+    return '/'.join(node_id.split('/')[:depth])
+
+
+def choose_collapse_depth(node_ids: Iterable[str], max_nodes: int) -> Optional[int]:
+    """
+    选择折叠的目录深度
+
+    优先选择分组数不超过 max_nodes 的最深层级；各层级都超出时选择分组最少
+    (但不少于 2 组) 的层级，剩余部分交给拆分处理。无法减少节点时返回 None。
+    """
+    node_ids = list(node_ids)
+    max_depth = max((len(n.split('/')) for n in node_ids), default=0)
+    counts = {depth: len({_group_key(n, depth) for n in node_ids}) for depth in range(1, max_depth)}
+    useful = {depth: count for depth, count in counts.items() if 2 <= count < len(node_ids)}
+    if not useful:
+        return None
+    fitting = [depth for depth, count in useful.items() if count <= max_nodes]
+    if fitting:
+        return max(fitting)
+    return min(useful, key=lambda depth: (useful[depth], -depth))
+
+
+def collapse_graph(graph: DiagramGraph, depth: int) -> DiagramGraph:
+    """按目录前缀 (前 depth 段) 合并节点，合并后的节点标签带有成员数"""
+    groups: Dict[str, List[str]] = {}
+    for node_id in graph.nodes:
+        groups.setdefault(_group_key(node_id, depth), []).append(node_id)
+
+    nodes = {}
+    mapping = {}
+    for key, members in sorted(groups.items()):
+        nodes[key] = graph.nodes[members[0]] if len(members) == 1 else f'{key}/ ({len(members)})'
+        for member in members:
+            mapping[member] = key
+
+    edges = list(dict.fromkeys(
+        (mapping[s], mapping[t]) for s, t in graph.edges
+        if s in mapping and t in mapping and mapping[s] != mapping[t]
+    ))
+    return DiagramGraph(nodes=nodes, edges=edges, title=graph.title)
+
+
+def split_graph(graph: DiagramGraph, max_nodes: int) -> List[DiagramGraph]:
+    """
+    按节点 ID 顺序 (相邻目录在一起) 拆分为不超过 max_nodes 个节点的子图
+
+    跨子图的边指向代表目标子图的占位节点，每个子图对每个目标子图只有一个占位节点。
+    """
+    ordered = sorted(graph.nodes)
+    parts = max(1, math.ceil(len(ordered) / max_nodes))
+    size = math.ceil(len(ordered) / parts) if ordered else 0
+    part_of = {node_id: i // size for i, node_id in enumerate(ordered)} if size else {}
+
+    subgraphs = [
+        DiagramGraph(nodes={}, edges=[], title=f'{graph.title} ({i + 1}/{parts})'.strip())
+        for i in range(parts)
+    ]
+    for node_id in ordered:
+        subgraphs[part_of[node_id]].nodes[node_id] = graph.nodes[node_id]
+    for source, target in graph.edges:
+        if source not in part_of or target not in part_of:
+            continue
+        sub = subgraphs[part_of[source]]
+        target_part = part_of[target]
+        if target_part != part_of[source]:
+            stub = f'@part{target_part + 1}'
+            if stub not in sub.nodes:
+                sub.nodes[stub] = f'↗ 第 {target_part + 1} 部分'
+                sub.links[stub] = target_part
+            target = stub
+        if (source, target) not in sub.edges:
+            sub.edges.append((source, target))
+    return subgraphs
+
+
+def govern_graph(graph: DiagramGraph, max_nodes: int = DEFAULT_MAX_NODES,
+                 max_edges: int = DEFAULT_MAX_EDGES) -> List[DiagramGraph]:
+    """
+    将图控制在预算内
+
+    1. 边数超出时做传递归约；
+    2. 节点数超出时按目录折叠 (见 choose_collapse_depth)，必要时再次归约；
+    3. 仍然超出时拆分为相互链接的子图。
+
+    Returns:
+        一个或多个子图，预算内的图原样返回
+    """
+    if graph.within(max_nodes, max_edges):
+        return [graph]
+
+    if len(graph.edges) > max_edges:
+        graph = transitive_reduction(graph)
+    if len(graph.nodes) > max_nodes:
+        depth = choose_collapse_depth(graph.nodes, max_nodes)
+        if depth is not None:
+            graph = collapse_graph(graph, depth)
+            if len(graph.edges) > max_edges:
+                graph = transitive_reduction(graph)
+    if graph.within(max_nodes, max_edges):
+        return [graph]
+
+    # 按边数拆分时，子图数与超出的倍数成正比
+    parts = max(math.ceil(len(graph.nodes) / max_nodes), math.ceil(len(graph.edges) / max_edges))
+    return split_graph(graph, max(1, math.ceil(len(graph.nodes) / parts)))
+
+
+def summarize_items(items: List[str], max_items: int = DEFAULT_MAX_NODES) -> List[Tuple[str, int]]:
+    """
+    将过长的叶子列表 (如依赖路径、包名) 按目录或作用域折叠
+
+    Returns:
+        [(条目或目录前缀, 合并的条目数)]；折叠后仍超出时，最后一项为
+        ('', 其余条目数)，由调用方显示为 "其余 N 个"
+    """
+    if len(items) <= max_items:
+        return [(item, 1) for item in items]
+
+    normalized = [item[2:] if item.startswith('./') else item for item in items]
+    depth = choose_collapse_depth(normalized, max_items)
+    groups: Dict[str, List[str]] = {}
+    for item, original in zip(normalized, items):
+        groups.setdefault(_group_key(item, depth) if depth else item, []).append(original)
+    summary = [(members[0], 1) if len(members) == 1 else (key, len(members))
+               for key, members in groups.items()]
+    if len(summary) > max_items:
+        rest = sum(count for _, count in summary[max_items - 1:])
+        summary = summary[:max_items - 1] + [('', rest)]
+    return summary
@@ -4,10 +4,47 @@
 从代码文件中提取 JSDoc/TSDoc/DocString 注释
 """
 
+import argparse
+import ast
+import hashlib
+import json
+import os
 import re
-from dataclasses import dataclass
+import sys
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+import cache_store
+from detect_changes import DEFAULT_EXCLUDES, hash_files, stat_unchanged
+from file_walker import WalkEntry, walk_project
+from js_lexer import (
+    Token,
+    is_function_value,
+    parse_class_member,
+    skip_balanced,
+    skip_decorators,
+    token_is,
+    tokenize,
+)
+from path_matcher import PathMatcher
+from wiki_config import load_scan_settings
+
+# 支持提取文档的文件扩展名
+JS_EXTENSIONS = {'.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs'}
+PY_EXTENSIONS = {'.py', '.pyi'}
+SOURCE_EXTENSIONS = JS_EXTENSIONS | PY_EXTENSIONS
+
+# 项目模式输出的缓存文件名 (位于 .mini-wiki/cache 下)
+DOCS_CACHE_NAME = 'docs.jsonl'
+
+# 提取器版本，提取结果格式或逻辑变化时递增，使旧的提取缓存失效
+EXTRACTOR_VERSION = 5
+
+# 文件数少于该值时在当前进程内提取，避免进程池启动开销
+PARALLEL_MIN_FILES = 64
 
 
 @dataclass
@@ -21,59 +58,283 @@ class DocEntry:
     examples: List[str]
     line_number: int
     file_path: str
+    # 声明结束行
+    end_line: int = 0
+    # 符号内容哈希 (签名 + 注释 + 实现，类不含已单独记录的成员)，用于符号级变更检测
+    symbol_hash: str = ''
 
 
-def extract_jsdoc(content: str, file_path: str) -> List[DocEntry]:
-    """从 JavaScript/TypeScript 文件中提取 JSDoc 注释"""
-    entries = []
-    
-    # JSDoc 注释模式
-    jsdoc_pattern = r'/\*\*\s*([\s\S]*?)\*/\s*(?:export\s+)?(?:async\s+)?(?:function|class|const|let|var|interface|type)\s+(\w+)'
+class LineIndex:
+    """
+    换行符偏移索引
+
+    每个文件只扫描一次换行位置，之后按二分查找把字符偏移换算为行号，
+    避免对每个匹配都重新统计前缀中的换行数
+    """
+
+    def __init__(self, content: str):
+        self.newlines = [m.start() for m in re.finditer('\n', content)]
+        self.length = len(content)
+
+    def line_of(self, offset: int) -> int:
+        """返回偏移所在的行号 (从 1 开始)"""
+        return bisect_left(self.newlines, offset) + 1
+
+    def offset_of(self, line: int) -> int:
+        """返回行首的字符偏移，超出末行时返回内容长度"""
+        if line <= 1:
+            return 0
+        if line - 2 < len(self.newlines):
+            return self.newlines[line - 2] + 1
+        return self.length
+
+
+def compute_symbol_hash(text: str) -> str:
+    """计算符号源码的哈希，忽略行尾空白与首尾空行，行号变化不影响结果"""
+    normalized = '\n'.join(line.rstrip() for line in text.strip('\n').split('\n'))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def _symbol_hashes(content: str, spans: List[Tuple[str, str, int, int]]) -> List[str]:
+    """
+    计算符号哈希
+
+    spans 为 (名称, 类型, 起始偏移, 结束偏移)，返回与 spans 顺序一致的哈希；
+    类的哈希排除其中已单独记录的成员，修改某个方法时只有该方法被视为变化。
+    """
+    order = sorted(range(len(spans)), key=lambda k: (spans[k][2], -spans[k][3]))
+    hashes = [''] * len(spans)
+    for position, k in enumerate(order):
+        name, symbol_type, start, end = spans[k]
+        parts = []
+        pos = start
+        if symbol_type == 'class':
+            prefix = name + '.'
+            for other in order[position + 1:]:
+                other_name, _, other_start, other_end = spans[other]
+                if other_start >= end:
+                    break
+                if other_start < pos or other_end > end or not other_name.startswith(prefix):
+                    continue
+                parts.append(content[pos:other_start])
+                pos = other_end
+        parts.append(content[pos:end])
+        hashes[k] = compute_symbol_hash(''.join(parts))
+    return hashes
+
+
+def parse_jsdoc(doc_text: str) -> Tuple[str, List[Dict[str, str]], Optional[str], List[str]]:
+    """
+    解析 JSDoc 注释正文
+
+    Returns:
+        (描述, 参数列表, 返回值, 示例)
+    """
+    description_lines = []
+    params = []
+    returns = None
+    examples = []
     
-    for match in re.finditer(jsdoc_pattern, content):
-        doc_text = match.group(1)
-        name = match.group(2)
-        line_number = content[:match.start()].count('\n') + 1
+    for line in doc_text.split('\n'):
+        line = line.strip().lstrip('* ')
         
-        # 解析描述
-        description_lines = []
-        params = []
-        returns = None
-        examples = []
-        
-        for line in doc_text.split('\n'):
-            line = line.strip().lstrip('* ')
-            
-            if line.startswith('@param'):
-                param_match = re.match(r'@param\s+{([^}]+)}\s+(\w+)\s*-?\s*(.*)', line)
-                if param_match:
-                    params.append({
-                        'type': param_match.group(1),
-                        'name': param_match.group(2),
-                        'description': param_match.group(3)
-                    })
-            elif line.startswith('@returns') or line.startswith('@return'):
-                return_match = re.match(r'@returns?\s+{([^}]+)}\s*(.*)', line)
-                if return_match:
-                    returns = f"{return_match.group(1)}: {return_match.group(2)}"
-            elif line.startswith('@example'):
-                # 收集示例代码直到下一个 @ 标签
+        if line.startswith('@param'):
+            param_match = re.match(r'@param\s+{([^}]+)}\s+(\w+)\s*-?\s*(.*)', line)
+            if param_match:
+                params.append({
+                    'type': param_match.group(1),
+                    'name': param_match.group(2),
+                    'description': param_match.group(3)
+                })
+        elif line.startswith('@returns') or line.startswith('@return'):
+            return_match = re.match(r'@returns?\s+{([^}]+)}\s*(.*)', line)
+            if return_match:
+                returns = f"{return_match.group(1)}: {return_match.group(2)}"
+        elif line.startswith('@example'):
+            # 收集示例代码直到下一个 @ 标签
+            continue
+        elif not line.startswith('@'):
+            description_lines.append(line)
+    
+    description = ' '.join(description_lines).strip()
+    return description, params, returns, examples
+
+
+def _parse_declaration(tokens: List[Token], index: int) -> Optional[Tuple[str, str]]:
+    """解析顶层 (非类体) 声明，返回 (名称, 类型)"""
+    is_default = False
+    while token_is(tokens, index, 'export', 'declare'):
+        index += 1
+    if token_is(tokens, index, 'default'):
+        is_default = True
+        index += 1
+    while token_is(tokens, index, 'abstract', 'async'):
+        index += 1
+    if index >= len(tokens):
+        return None
+    
+    keyword = tokens[index].value if tokens[index].kind == 'ident' else None
+    following = tokens[index + 1] if index + 1 < len(tokens) else None
+    if keyword == 'const' and token_is(tokens, index + 1, 'enum'):
+        keyword, index = 'enum', index + 1
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+    
+    if keyword in ('function', 'class'):
+        if keyword == 'function' and token_is(tokens, index + 1, '*'):
+            index += 1
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if following is not None and following.kind == 'ident' and following.value not in ('extends', 'implements'):
+            return following.value, keyword
+        return ('default', keyword) if is_default else None
+    if keyword in ('const', 'let', 'var'):
+        if following is not None and following.kind == 'ident':
+            return following.value, 'function'
+        return None
+    if keyword in ('interface', 'type', 'enum') and following is not None and following.kind == 'ident':
+        if keyword == 'type' and not token_is(tokens, index + 2, '=', '<'):
+            return None
+        return following.value, 'interface' if keyword == 'interface' else 'type'
+    if is_default and is_function_value(tokens, index):
+        return 'default', 'function'
+    return None
+
+
+def _class_body_index(tokens: List[Token], index: int) -> int:
+    """返回 `class` 之后类体 `{` 的位置，跳过泛型参数与 extends 中的括号"""
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind == 'punct':
+            if token.value == '{':
+                return index
+            if token.value in ('<', '('):
+                index = skip_balanced(tokens, index)
                 continue
-            elif not line.startswith('@'):
-                description_lines.append(line)
-        
-        description = ' '.join(description_lines).strip()
+            if token.value in (';', '}'):
+                return -1
+        index += 1
+    return -1
+
+
+def _declaration_end(tokens: List[Token], index: int) -> int:
+    """
+    返回声明最后一个记号的位置
+
+    声明在深度 0 的第一个代码块 `{...}` 结束处或 `;` 处结束，类声明在类体结束处
+    结束 (泛型约束中的 `{` 不算)，遇到下一个 JSDoc 或外层代码块结束时停止。
+    """
+    depth = 0
+    last = max(index - 1, 0)
+    for i in range(index, len(tokens)):
+        token = tokens[i]
+        if token.kind == 'doc':
+            return last
+        if (depth <= 0 and token.kind == 'ident' and token.value == 'class'
+                and not token_is(tokens, i - 1, '.')):
+            body = _class_body_index(tokens, i + 1)
+            if body >= 0:
+                return skip_balanced(tokens, body) - 1
+        if token.kind == 'punct':
+            if token.value in ('(', '['):
+                depth += 1
+            elif token.value in (')', ']'):
+                depth -= 1
+            elif depth <= 0 and token.value == '{':
+                return skip_balanced(tokens, i) - 1
+            elif depth <= 0 and token.value == '}':
+                return last
+            elif depth <= 0 and token.value == ';':
+                return i
+        last = i
+    return last
+
+
+def _js_symbols(content: str, tokens: List[Token]) -> List[Tuple[str, str, Optional[Token], int, int, str]]:
+    """
+    扫描 JS/TS 的全部顶层声明与类方法 (无论是否有 JSDoc)
+
+    声明只在语句开头识别 (文件开头、`;` / `{` / `}` / 注释之后或换行处)，
+    函数体内部的局部声明不记录。
+
+    Returns:
+        [(名称, 类型, 紧邻的 JSDoc 记号或 None, 起始偏移, 结束偏移, 符号哈希)]，
+        有 JSDoc 时起始偏移为注释开头
+    """
+    declarations: List[Tuple[str, str, Optional[Token], int, int]] = []
+    
+    # 花括号栈: 类体为类名，其他为 None
+    braces: List[Optional[str]] = []
+    pending_class: Optional[str] = None
+    # 类体 `{` 的位置 (跳过泛型约束与 extends 表达式中的花括号)
+    class_body = -1
+    # 已识别声明的关键字位置，之前的记号 (装饰器等) 不再作为声明开头
+    next_start = 0
+    
+    for i, token in enumerate(tokens):
+        if token.kind == 'punct':
+            if token.value == '{':
+                braces.append(pending_class if i == class_body else None)
+                if i == class_body:
+                    pending_class = None
+            elif token.value == '}' and braces:
+                braces.pop()
+            if token.value != '@':
+                continue
+        if token.kind == 'ident' and token.value == 'class' and not token_is(tokens, i - 1, '.'):
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            if following is not None and following.kind == 'ident' and following.value not in ('extends', 'implements'):
+                pending_class = following.value
+            else:
+                pending_class = 'default' if token_is(tokens, i - 1, 'default') else ''
+            class_body = _class_body_index(tokens, i + 1)
+        if token.kind == 'doc' or i < next_start:
+            continue
+        class_name = braces[-1] if braces else None
+        if braces and class_name is None:
+            continue
+        previous = tokens[i - 1] if i > 0 else None
+        at_statement_start = (
+            previous is None or previous.kind == 'doc'
+            or token_is(tokens, i - 1, ';', '{', '}')
+            or '\n' in content[previous.end:token.start]
+        )
+        if not at_statement_start:
+            continue
         
-        # 确定类型
-        if 'class' in match.group(0).lower():
-            entry_type = 'class'
-        elif 'interface' in match.group(0).lower():
-            entry_type = 'interface'
-        elif 'type' in match.group(0):
-            entry_type = 'type'
+        start = skip_decorators(tokens, i)
+        if class_name is not None:
+            member = parse_class_member(content, tokens, start)
+            declaration = (member.name, 'method') if member is not None and member.kind == 'method' else None
+            if declaration is not None and class_name:
+                declaration = (f'{class_name}.{declaration[0]}', declaration[1])
         else:
-            entry_type = 'function'
+            declaration = _parse_declaration(tokens, start)
+        if declaration is None:
+            continue
         
+        next_start = start + 1
+        doc = previous if previous is not None and previous.kind == 'doc' else None
+        end = tokens[_declaration_end(tokens, start)].end if start < len(tokens) else token.end
+        declarations.append((declaration[0], declaration[1], doc, (doc or token).start, end))
+    
+    hashes = _symbol_hashes(content, [(name, kind, start, end) for name, kind, _, start, end in declarations])
+    return [(*declaration, symbol_hash) for declaration, symbol_hash in zip(declarations, hashes)]
+
+
+def extract_jsdoc(content: str, file_path: str) -> List[DocEntry]:
+    """
+    从 JavaScript/TypeScript 文件中提取 JSDoc 注释
+
+    基于 js_lexer 单次前向扫描，JSDoc 只关联紧随其后的声明 (允许装饰器)：
+    函数、类、变量 (含箭头函数导出)、interface / type / enum、
+    `export default` 以及类方法 (限定名如 `Class.method`)。
+    """
+    entries = []
+    line_index = LineIndex(content)
+    
+    for name, entry_type, doc, _, end, symbol_hash in _js_symbols(content, tokenize(content)):
+        if doc is None:
+            continue
+        description, params, returns, examples = parse_jsdoc(doc.value)
         entries.append(DocEntry(
             name=name,
             type=entry_type,
@@ -81,16 +342,150 @@ def extract_jsdoc(content: str, file_path: str) -> List[DocEntry]:
             params=params,
             returns=returns,
             examples=examples,
-            line_number=line_number,
-            file_path=file_path
+            line_number=line_index.line_of(doc.start),
+            file_path=file_path,
+            end_line=line_index.line_of(end - 1),
+            symbol_hash=symbol_hash
         ))
-    
     return entries
 
 
+def parse_python_docstring(docstring: str) -> Tuple[str, List[Dict[str, str]], Optional[str], List[str]]:
+    """
+    解析 Google/NumPy 风格 docstring
+
+    Returns:
+        (描述, 参数列表, 返回值, 示例)
+    """
+    description_lines = []
+    params = []
+    returns = None
+    examples = []
+    
+    current_section = 'description'
+    
+    for line in docstring.split('\n'):
+        stripped = line.strip()
+        
+        if stripped in ('Args:', 'Arguments:', 'Parameters:'):
+            current_section = 'params'
+            continue
+        elif stripped in ('Returns:', 'Return:'):
+            current_section = 'returns'
+            continue
+        elif stripped in ('Example:', 'Examples:'):
+            current_section = 'examples'
+            continue
+        elif stripped.endswith(':') and not ':' in stripped[:-1]:
+            current_section = 'other'
+            continue
+        
+        if current_section == 'description':
+            description_lines.append(stripped)
+        elif current_section == 'params':
+            param_match = re.match(r'(\w+)\s*(?:\(([^)]+)\))?\s*:\s*(.*)', stripped)
+            if param_match:
+                params.append({
+                    'name': param_match.group(1),
+                    'type': param_match.group(2) or 'Any',
+                    'description': param_match.group(3)
+                })
+        elif current_section == 'returns':
+            returns = stripped
+        elif current_section == 'examples':
+            examples.append(stripped)
+    
+    description = ' '.join(description_lines).strip()
+    return description, params, returns, examples
+
+
+def _iter_definitions(parent: ast.AST):
+    """按源码顺序产出节点体内的函数/类定义，包括 if/try/with 等语句块中的定义"""
+    pending = list(ast.iter_child_nodes(parent))
+    pending.reverse()
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield node
+        elif isinstance(node, (ast.stmt, ast.excepthandler, ast.match_case)):
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()
+            pending.extend(children)
+
+
+def _python_symbols(content: str, tree: ast.AST) -> List[Tuple[ast.AST, str, str, str]]:
+    """
+    列出模块中的全部函数、类与 (嵌套) 类成员 (无论是否有 DocString)
+
+    Returns:
+        [(节点, 限定名, 类型, 符号哈希)]，符号范围包含装饰器
+    """
+    definitions: List[Tuple[ast.AST, str, str]] = []
+    # (节点, 限定名前缀, 是否位于类体内)
+    stack: List[Tuple[ast.AST, str, bool]] = [(tree, '', False)]
+    while stack:
+        parent, prefix, in_class = stack.pop()
+        children = []
+        for node in _iter_definitions(parent):
+            qualname = f'{prefix}{node.name}'
+            if isinstance(node, ast.ClassDef):
+                def_type = 'class'
+                children.append((node, qualname + '.', True))
+            else:
+                def_type = 'method' if in_class else 'function'
+            definitions.append((node, qualname, def_type))
+        stack.extend(reversed(children))
+    
+    line_index = LineIndex(content)
+    spans = []
+    for node, qualname, def_type in definitions:
+        first_line = min([d.lineno for d in node.decorator_list] + [node.lineno])
+        end_line = node.end_lineno or node.lineno
+        spans.append((qualname, def_type, line_index.offset_of(first_line), line_index.offset_of(end_line + 1)))
+    hashes = _symbol_hashes(content, spans)
+    return [(*definition, symbol_hash) for definition, symbol_hash in zip(definitions, hashes)]
+
+
 def extract_python_docstring(content: str, file_path: str) -> List[DocEntry]:
-    """从 Python 文件中提取 DocString"""
+    """
+    从 Python 文件中提取 DocString
+
+    基于 ast 单次遍历模块，类中的方法与嵌套类使用限定名 (如 `Class.method`)，
+    行号为 def/class 所在行；函数体内部的局部定义不提取。
+    文件无法解析时回退到正则提取。
+    """
+    try:
+        tree = ast.parse(content, filename=file_path)
+    except (SyntaxError, ValueError):
+        return extract_python_docstring_regex(content, file_path)
+    
+    entries = []
+    for node, qualname, def_type, symbol_hash in _python_symbols(content, tree):
+        docstring = ast.get_docstring(node)
+        if docstring is None:
+            continue
+        description, params, returns, examples = parse_python_docstring(docstring)
+        entries.append(DocEntry(
+            name=qualname,
+            type=def_type,
+            description=description,
+            params=params,
+            returns=returns,
+            examples=examples,
+            line_number=node.lineno,
+            file_path=file_path,
+            end_line=node.end_lineno or node.lineno,
+            symbol_hash=symbol_hash
+        ))
+    
+    entries.sort(key=lambda e: e.line_number)
+    return entries
+
+
+def extract_python_docstring_regex(content: str, file_path: str) -> List[DocEntry]:
+    """基于正则从 Python 文件中提取 DocString (用于无法解析的文件)"""
     entries = []
+    line_index = LineIndex(content)
     
     # 函数/类定义模式
     def_pattern = r'(?:^|\n)((?:async\s+)?def|class)\s+(\w+)[^:]*:\s*(?:\n\s+)?(?:"""([\s\S]*?)"""|\'\'\'([\s\S]*?)\'\'\')'
@@ -99,48 +494,8 @@ def extract_python_docstring(content: str, file_path: str) -> List[DocEntry]:
         def_type = 'function' if 'def' in match.group(1) else 'class'
         name = match.group(2)
         docstring = match.group(3) or match.group(4) or ''
-        line_number = content[:match.start()].count('\n') + 1
-        
-        # 解析 Google/NumPy 风格 docstring
-        description_lines = []
-        params = []
-        returns = None
-        examples = []
-        
-        current_section = 'description'
-        
-        for line in docstring.split('\n'):
-            stripped = line.strip()
-            
-            if stripped in ('Args:', 'Arguments:', 'Parameters:'):
-                current_section = 'params'
-                continue
-            elif stripped in ('Returns:', 'Return:'):
-                current_section = 'returns'
-                continue
-            elif stripped in ('Example:', 'Examples:'):
-                current_section = 'examples'
-                continue
-            elif stripped.endswith(':') and not ':' in stripped[:-1]:
-                current_section = 'other'
-                continue
-            
-            if current_section == 'description':
-                description_lines.append(stripped)
-            elif current_section == 'params':
-                param_match = re.match(r'(\w+)\s*(?:\(([^)]+)\))?\s*:\s*(.*)', stripped)
-                if param_match:
-                    params.append({
-                        'name': param_match.group(1),
-                        'type': param_match.group(2) or 'Any',
-                        'description': param_match.group(3)
-                    })
-            elif current_section == 'returns':
-                returns = stripped
-            elif current_section == 'examples':
-                examples.append(stripped)
-        
-        description = ' '.join(description_lines).strip()
+        line_number = line_index.line_of(match.start())
+        description, params, returns, examples = parse_python_docstring(docstring)
         
         entries.append(DocEntry(
             name=name,
@@ -150,7 +505,9 @@ def extract_python_docstring(content: str, file_path: str) -> List[DocEntry]:
             returns=returns,
             examples=examples,
             line_number=line_number,
-            file_path=file_path
+            file_path=file_path,
+            end_line=line_index.line_of(match.end()),
+            symbol_hash=compute_symbol_hash(match.group(0))
         ))
     
     return entries
@@ -168,14 +525,309 @@ def extract_docs_from_file(file_path: str) -> List[DocEntry]:
     
     suffix = path.suffix.lower()
     
-    if suffix in {'.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs'}:
+    if suffix in JS_EXTENSIONS:
         return extract_jsdoc(content, file_path)
-    elif suffix in {'.py', '.pyi'}:
+    elif suffix in PY_EXTENSIONS:
         return extract_python_docstring(content, file_path)
     
     return []
 
 
+def _find_source_entries(project_root: str, use_gitignore: bool = True) -> List[WalkEntry]:
+    settings = load_scan_settings(project_root, DEFAULT_EXCLUDES)
+    matcher = settings.matcher
+    path_filter = PathMatcher(project_root, matcher).is_ignored if use_gitignore else None
+    
+    entries = []
+    for entry in walk_project(project_root, matcher, path_filter):
+        if entry.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+        if path_filter is None and matcher.excludes_file(entry.name):
+            continue
+        try:
+            if settings.max_file_size and entry.size > settings.max_file_size:
+                continue
+        except OSError:
+            continue
+        entries.append(entry)
+    return entries
+
+
+def find_source_files(project_root: str, use_gitignore: bool = True) -> List[str]:
+    """
+    列出项目中可提取文档的源文件
+
+    与 detect_changes 使用相同的排除规则 (内置规则、config.yaml 的 exclude 与
+    generation.max_file_size、.gitignore / .mini-wikiignore)。
+
+    Returns:
+        按路径排序的相对路径列表 (本地分隔符)
+    """
+    return [entry.rel_path for entry in _find_source_entries(project_root, use_gitignore)]
+
+
+def doc_cache_key(file_hash: str, file_path: str) -> str:
+    """提取缓存键: 内容哈希 + 语言 (相同内容在不同语言下提取结果不同)"""
+    lang = 'js' if Path(file_path).suffix.lower() in JS_EXTENSIONS else 'py'
+    return f'{file_hash}-{lang}'
+
+
+def _extract_file_records(task: Tuple[str, str]) -> List[Dict[str, Any]]:
+    """进程池任务: 提取单个文件并转为可序列化的记录，file_path 为相对路径"""
+    project_root, rel_path = task
+    file_path = rel_path.replace(os.sep, '/')
+    records = []
+    for entry in extract_docs_from_file(os.path.join(project_root, rel_path)):
+        entry.file_path = file_path
+        records.append(asdict(entry))
+    return records
+
+
+def _unique_symbols(pairs: Iterator[Tuple[str, str]]) -> Dict[str, str]:
+    """同名符号 (如重载或条件定义) 按出现顺序追加 `#2`、`#3` 区分"""
+    symbols: Dict[str, str] = {}
+    for name, symbol_hash in pairs:
+        key, n = name, 1
+        while key in symbols:
+            n += 1
+            key = f'{name}#{n}'
+        symbols[key] = symbol_hash
+    return symbols
+
+
+def symbol_map(records: List[Dict[str, Any]]) -> Dict[str, str]:
+    """由提取记录生成 {符号名: 符号哈希} (仅含有文档的符号)"""
+    return _unique_symbols((record['name'], record.get('symbol_hash', '')) for record in records)
+
+
+def extract_symbol_hashes(content: str, file_path: str) -> Dict[str, str]:
+    """
+    计算文件中全部函数、类与类成员的符号哈希 (无论是否有文档注释)
+
+    Returns:
+        {符号名: 符号哈希}，Python 文件无法解析时只包含正则回退能识别的带 DocString 的符号
+    """
+    if Path(file_path).suffix.lower() in JS_EXTENSIONS:
+        symbols = [(name, symbol_hash) for name, _, _, _, _, symbol_hash in _js_symbols(content, tokenize(content))]
+    else:
+        try:
+            tree = ast.parse(content, filename=file_path)
+        except (SyntaxError, ValueError):
+            symbols = [(e.name, e.symbol_hash) for e in extract_python_docstring_regex(content, file_path)]
+        else:
+            symbols = [(name, symbol_hash) for _, name, _, symbol_hash in _python_symbols(content, tree)]
+    return _unique_symbols(symbols)
+
+
+def _extract_file_symbols(task: Tuple[str, str]) -> List[List[str]]:
+    """进程池任务: 计算单个文件的符号哈希，返回 [[符号名, 符号哈希]] (保持顺序，便于缓存)"""
+    project_root, rel_path = task
+    try:
+        with open(os.path.join(project_root, rel_path), 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except OSError:
+        return []
+    return [[name, symbol_hash] for name, symbol_hash in extract_symbol_hashes(content, rel_path).items()]
+
+
+def extract_file_records(project_root: str, rel_path: str, file_hash: str = '',
+                         wiki_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    提取单个文件的文档记录，有文件哈希与 Wiki 目录时读写提取缓存
+
+    Args:
+        project_root: 项目根目录
+        rel_path: 相对路径
+        file_hash: 文件内容哈希 (来自 detect_changes)
+        wiki_dir: .mini-wiki 目录，为空时不使用缓存
+
+    Returns:
+        DocEntry 字典列表 (file_path 为相对项目根目录的 POSIX 路径)
+    """
+    file_path = rel_path.replace(os.sep, '/')
+    key = doc_cache_key(file_hash, rel_path) if file_hash and wiki_dir else None
+    if key is not None:
+        records = cache_store.load_cached_docs(wiki_dir, EXTRACTOR_VERSION, key)
+        if records is not None:
+            return [{**record, 'file_path': file_path} for record in records]
+    
+    records = _extract_file_records((project_root, rel_path))
+    if key is not None:
+        cache_store.save_cached_docs(wiki_dir, EXTRACTOR_VERSION, key, [
+            {k: v for k, v in record.items() if k != 'file_path'} for record in records
+        ])
+    return records
+
+
+def extract_file_symbols(project_root: str, rel_path: str, file_hash: str = '',
+                         wiki_dir: Optional[str] = None) -> Dict[str, str]:
+    """获取单个文件的符号哈希 {符号名: 符号哈希}，参数同 extract_file_records"""
+    return extract_files_symbols(project_root, [rel_path], {rel_path: file_hash}, wiki_dir, workers=1)[rel_path]
+
+
+def extract_files_symbols(project_root: str, paths: List[str], checksums: Dict[str, str],
+                          wiki_dir: Optional[str] = None,
+                          workers: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """
+    批量获取文件的符号哈希，缓存未命中的文件较多时在进程池中计算
+
+    结果按 (内容哈希, 提取器版本) 缓存在 cache/docs/ 下 (键后缀 `-symbols`)。
+
+    Args:
+        project_root: 项目根目录
+        paths: 相对路径列表
+        checksums: {相对路径: 内容哈希}，缺少哈希的文件不使用缓存
+        wiki_dir: .mini-wiki 目录，为空时不使用缓存
+        workers: 进程数，默认 CPU 核数；为 1 时在当前进程内运行
+
+    Returns:
+        {相对路径: {符号名: 符号哈希}}
+    """
+    keys: Dict[str, str] = {}
+    results: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        file_hash = checksums.get(path, '')
+        if not (file_hash and wiki_dir):
+            continue
+        keys[path] = f'{doc_cache_key(file_hash, path)}-symbols'
+        pairs = cache_store.load_cached_docs(wiki_dir, EXTRACTOR_VERSION, keys[path])
+        if pairs is not None:
+            results[path] = dict(pairs)
+    
+    misses = [path for path in paths if path not in results]
+    tasks = [(project_root, path) for path in misses]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+        computed = [_extract_file_symbols(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            computed = list(executor.map(_extract_file_symbols, tasks, chunksize=chunksize))
+    
+    for path, pairs in zip(misses, computed):
+        results[path] = dict(pairs)
+        if path in keys:
+            cache_store.save_cached_docs(wiki_dir, EXTRACTOR_VERSION, keys[path], pairs)
+    return {path: results[path] for path in paths}
+
+
+def _lookup_file_hashes(project_root: str, wiki_dir: str, entries: List[WalkEntry]) -> List[str]:
+    """获取文件内容哈希，stat 与 checksums 记录一致的文件直接复用缓存的哈希"""
+    checksums = cache_store.load_checksums(wiki_dir)
+    hashes: List[str] = []
+    to_hash: List[int] = []
+    for i, entry in enumerate(entries):
+        record = checksums.get(entry.rel_path)
+        try:
+            unchanged = bool(record and record.get('hash')) and stat_unchanged(record, entry.stat())
+        except OSError:
+            unchanged = False
+        hashes.append(record['hash'] if unchanged else '')
+        if not unchanged:
+            to_hash.append(i)
+    
+    for i, file_hash in zip(to_hash, hash_files([entries[i].path for i in to_hash])):
+        hashes[i] = file_hash
+    return hashes
+
+
+def extract_project_docs(project_root: str, workers: Optional[int] = None,
+                         use_gitignore: bool = True, use_cache: bool = True,
+                         stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    在进程池中提取整个项目的文档，按文件路径顺序逐条产出记录
+
+    项目存在 .mini-wiki 目录时，提取结果按 (内容哈希, 提取器版本) 缓存在
+    cache/docs/ 下，未变化的文件只需一次查找而无需重新解析。
+
+    Args:
+        project_root: 项目根目录
+        workers: 进程数，默认 CPU 核数；为 1 时在当前进程内运行
+        use_gitignore: 是否应用 .gitignore / .mini-wikiignore 规则
+        use_cache: 是否使用提取缓存
+        stats: 可选字典，回传缓存命中数 hits 与解析的文件数 misses
+
+    Yields:
+        DocEntry 字典 (file_path 为相对项目根目录的 POSIX 路径)
+    """
+    entries = _find_source_entries(project_root, use_gitignore)
+    wiki_dir = str(Path(project_root) / '.mini-wiki')
+    use_cache = use_cache and Path(wiki_dir).is_dir()
+    if stats is None:
+        stats = {}
+    stats.update(hits=0, misses=0)
+    
+    keys: List[Optional[str]] = [None] * len(entries)
+    cached: Dict[int, List[Dict[str, Any]]] = {}
+    if use_cache:
+        cache_store.evict_cached_docs(wiki_dir, keep_version=EXTRACTOR_VERSION)
+        for i, file_hash in enumerate(_lookup_file_hashes(project_root, wiki_dir, entries)):
+            if not file_hash:
+                continue
+            keys[i] = doc_cache_key(file_hash, entries[i].name)
+            records = cache_store.load_cached_docs(wiki_dir, EXTRACTOR_VERSION, keys[i])
+            if records is not None:
+                cached[i] = records
+    
+    misses = [i for i in range(len(entries)) if i not in cached]
+    tasks = [(project_root, entries[i].rel_path) for i in misses]
+    stats['hits'] = len(cached)
+    stats['misses'] = len(misses)
+    workers = workers or os.cpu_count() or 1
+    
+    def _emit(results: Iterator[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        # 缓存命中与新解析的结果按文件顺序合并输出
+        for i, entry in enumerate(entries):
+            if i in cached:
+                file_path = entry.rel_path.replace(os.sep, '/')
+                for record in cached[i]:
+                    yield {**record, 'file_path': file_path}
+                continue
+            records = next(results)
+            if keys[i] is not None:
+                cache_store.save_cached_docs(wiki_dir, EXTRACTOR_VERSION, keys[i], [
+                    {k: v for k, v in record.items() if k != 'file_path'} for record in records
+                ])
+            yield from records
+    
+    if workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+        yield from _emit(_extract_file_records(task) for task in tasks)
+        return
+    
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map 按提交顺序返回结果，先完成的文件也会按顺序输出
+        yield from _emit(executor.map(_extract_file_records, tasks, chunksize=chunksize))
+
+
+def write_jsonl(records: Iterator[Dict[str, Any]], out: IO[str]) -> int:
+    """将记录逐行写为 JSON Lines，返回写入的条数"""
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def save_docs_cache(project_root: str, records: Iterator[Dict[str, Any]]) -> Tuple[Path, int]:
+    """
+    将记录写入 .mini-wiki/cache/docs.jsonl
+
+    先写入临时文件再替换，读取方不会看到写了一半的文件。
+
+    Returns:
+        (缓存文件路径, 写入的条数)
+    """
+    cache_path = cache_store.get_cache_dir(str(Path(project_root) / '.mini-wiki')) / DOCS_CACHE_NAME
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        count = write_jsonl(records, f)
+    os.replace(tmp_path, cache_path)
+    return cache_path, count
+
+
 def docs_to_markdown(entries: List[DocEntry]) -> str:
     """将文档条目转换为 Markdown"""
     lines = []
@@ -183,6 +835,7 @@ def docs_to_markdown(entries: List[DocEntry]) -> str:
     # 按类型分组
     functions = [e for e in entries if e.type == 'function']
     classes = [e for e in entries if e.type == 'class']
+    methods = [e for e in entries if e.type == 'method']
     types = [e for e in entries if e.type in {'type', 'interface'}]
     
     if functions:
@@ -206,6 +859,21 @@ def docs_to_markdown(entries: List[DocEntry]) -> str:
             lines.append(f'### `{cls.name}`\n')
             lines.append(f'{cls.description}\n')
     
+    if methods:
+        lines.append('## 方法\n')
+        for method in methods:
+            lines.append(f'### `{method.name}`\n')
+            lines.append(f'{method.description}\n')
+            
+            if method.params:
+                lines.append('**参数:**\n')
+                for param in method.params:
+                    lines.append(f"- `{param['name']}` ({param['type']}): {param['description']}")
+                lines.append('')
+            
+            if method.returns:
+                lines.append(f'**返回值:** {method.returns}\n')
+    
     if types:
         lines.append('## 类型定义\n')
         for t in types:
@@ -215,14 +883,59 @@ def docs_to_markdown(entries: List[DocEntry]) -> str:
     return '\n'.join(lines)
 
 
-if __name__ == '__main__':
-    import sys
+def main():
+    parser = argparse.ArgumentParser(description="从代码文件中提取 JSDoc/TSDoc/DocString 注释")
+    parser.add_argument("path", help="源文件路径，或项目/目录路径 (项目模式)")
+    parser.add_argument("--format", choices=["markdown", "jsonl"], default=None,
+                        help="输出格式，单文件默认 markdown，项目模式默认 jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="项目模式的进程数 (默认 CPU 核数)")
+    parser.add_argument("--output", default=None, help="写入指定文件而不是标准输出")
+    parser.add_argument("--cache", action="store_true",
+                        help="项目模式: 写入 .mini-wiki/cache/docs.jsonl")
+    parser.add_argument("--no-gitignore", action="store_true", help="不应用 .gitignore 规则")
+    parser.add_argument("--fresh", action="store_true", help="项目模式: 不使用提取缓存 (cache/docs/)，重新解析所有文件")
+    args = parser.parse_args()
     
-    if len(sys.argv) < 2:
-        print("用法: python extract_docs.py <文件路径>")
-        sys.exit(1)
+    path = Path(args.path)
+    if not path.exists():
+        print(f"❌ 路径不存在: {args.path}", file=sys.stderr)
+        return 1
     
-    file_path = sys.argv[1]
-    entries = extract_docs_from_file(file_path)
+    if path.is_dir():
+        stats: Dict[str, int] = {}
+        records = extract_project_docs(str(path), args.workers, not args.no_gitignore,
+                                       use_cache=not args.fresh, stats=stats)
+        if args.format == "markdown":
+            entries = [DocEntry(**record) for record in records]
+            output = docs_to_markdown(entries)
+        elif args.cache:
+            cache_path, count = save_docs_cache(str(path), records)
+            print(f"✅ 已写入 {count} 条文档记录: {cache_path} "
+                  f"(缓存命中 {stats['hits']} 个文件, 解析 {stats['misses']} 个文件)", file=sys.stderr)
+            return 0
+        elif args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                count = write_jsonl(records, f)
+            print(f"✅ 已写入 {count} 条文档记录: {args.output} "
+                  f"(缓存命中 {stats['hits']} 个文件, 解析 {stats['misses']} 个文件)", file=sys.stderr)
+            return 0
+        else:
+            write_jsonl(records, sys.stdout)
+            return 0
+    else:
+        entries = extract_docs_from_file(str(path))
+        if args.format == "jsonl":
+            output = ''.join(json.dumps(asdict(e), ensure_ascii=False) + '\n' for e in entries).rstrip('\n')
+        else:
+            output = docs_to_markdown(entries)
     
-    print(docs_to_markdown(entries))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+按文件增量维护的缓存索引
+导入图、类索引等按文件解析的结果存为一个缓存文档
+{"version": 版本, "files": {相对路径: {"hash": 哈希, ...解析结果}}}，
+只对哈希变化的文件重新解析
+"""
+
+import os
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cache_store
+
+# 解析函数: (相对路径, 文件内容) -> 写入文件记录的字段
+ParseFunc = Callable[[str, str], Dict[str, Any]]
+
+
+def load_file_index(wiki_dir: str, name: str, version: int) -> Dict[str, Any]:
+    """加载缓存索引，不存在或版本不符时返回空索引"""
+    index = cache_store.load_document(wiki_dir, name)
+    if not index or index.get('version') != version:
+        return {'version': version, 'files': {}}
+    return index
+
+
+def save_file_index(wiki_dir: str, name: str, index: Dict[str, Any]):
+    """按路径排序后保存索引"""
+    index['files'] = dict(sorted(index['files'].items()))
+    cache_store.save_document(wiki_dir, name, index)
+
+
+def _parse_task(parse: ParseFunc, task: Tuple[str, str]) -> Dict[str, Any]:
+    project_root, rel_path = task
+    try:
+        with open(Path(project_root) / rel_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError:
+        content = ''
+    return parse(rel_path, content)
+
+
+def update_file_index(project_root: str, name: str, version: int, extensions: Tuple[str, ...],
+                      parse: ParseFunc, checksums: Optional[Dict[str, str]] = None,
+                      workers: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    增量更新缓存索引 (不保存，调用方补充派生数据后调用 save_file_index)
+
+    Args:
+        project_root: 项目根目录
+        name: 缓存文档名
+        version: 解析规则版本，变化时整体重建
+        extensions: 参与解析的文件扩展名 (小写)
+        parse: 模块级解析函数 (需要能被子进程 pickle)
+        checksums: 当前文件校验和 {相对路径: 哈希}，为空时读取 checksums 缓存
+        workers: 解析进程数，默认 CPU 核数
+
+    Returns:
+        (索引, {"updated": 重新解析的文件数, "removed": 删除的文件数})
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from extract_docs import PARALLEL_MIN_FILES
+
+    wiki_dir = str(Path(project_root) / '.mini-wiki')
+    if checksums is None:
+        checksums = {path: record.get('hash', '')
+                     for path, record in cache_store.load_checksums(wiki_dir).items()}
+    current = {path.replace(os.sep, '/'): (path, file_hash)
+               for path, file_hash in checksums.items()
+               if path.lower().endswith(extensions)}
+
+    index = load_file_index(wiki_dir, name, version)
+    files: Dict[str, Dict[str, Any]] = index['files']
+    to_update = [file for file, (_, file_hash) in sorted(current.items())
+                 if not file_hash or files.get(file, {}).get('hash') != file_hash]
+    removed = [file for file in files if file not in current]
+
+    task = partial(_parse_task, parse)
+    tasks = [(project_root, current[file][0]) for file in to_update]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+        results = [task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(task, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+
+    for file in removed:
+        del files[file]
+    for file, data in zip(to_update, results):
+        files[file] = {'hash': current[file][1], **data}
+    return index, {'updated': len(to_update), 'removed': len(removed)}
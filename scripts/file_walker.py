@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+文件遍历模块
+基于 os.scandir 的单次遍历，在进入目录之前剪枝忽略目录，
+供 analyze_project / detect_changes 共享使用
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Container, List, Optional, Union
+
+
+class WalkEntry:
+    """
+    遍历得到的文件条目
+
+    包装 os.DirEntry，stat 结果由 DirEntry 自身缓存，
+    同一次运行中多次读取 size / mtime 不会重复系统调用
+    """
+
+    __slots__ = ('rel_path', 'entry')
+
+    def __init__(self, rel_path: str, entry: os.DirEntry):
+        self.rel_path = rel_path
+        self.entry = entry
+
+    @property
+    def name(self) -> str:
+        return self.entry.name
+
+    @property
+    def path(self) -> str:
+        return self.entry.path
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.entry.name)[1]
+
+    def stat(self) -> os.stat_result:
+        return self.entry.stat()
+
+    @property
+    def size(self) -> int:
+        return self.stat().st_size
+
+    @property
+    def mtime_ns(self) -> int:
+        return self.stat().st_mtime_ns
+
+    @property
+    def inode(self) -> int:
+        return self.stat().st_ino
+
+    def __repr__(self) -> str:
+        return f'WalkEntry({self.rel_path!r})'
+
+
+def walk_project(project_root: Union[str, Path], ignore_dirs: Container[str],
+                 path_filter: Optional[Callable[[str, bool], bool]] = None) -> List[WalkEntry]:
+    """
+    单次遍历项目目录
+
+    Args:
+        project_root: 项目根目录
+        ignore_dirs: 忽略的目录名 (集合或 ExcludeMatcher)，命中后不会进入该目录
+        path_filter: 可选的忽略判断 (相对路径, 是否目录) -> 是否忽略，
+            如 PathMatcher.is_ignored；对目录调用时在进入前剪枝
+
+    Returns:
+        按相对路径排序的文件条目列表
+    """
+    root = os.fspath(project_root)
+    entries: List[WalkEntry] = []
+    # (绝对路径, 相对路径前缀)
+    stack = [(root, '')]
+
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                children = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for child in children:
+            rel_path = rel_prefix + child.name
+            try:
+                if child.is_dir(follow_symlinks=False):
+                    if child.name in ignore_dirs:
+                        continue
+                    if path_filter is not None and path_filter(rel_path, True):
+                        continue
+                    subdirs.append((child.path, rel_path + os.sep))
+                elif child.is_file():
+                    if path_filter is not None and path_filter(rel_path, False):
+                        continue
+                    entries.append(WalkEntry(rel_path, child))
+            except OSError:
+                continue
+
+        # 逆序入栈，保证按名称顺序深度优先
+        stack.extend(reversed(subdirs))
+
+    entries.sort(key=lambda e: e.rel_path)
+    return entries
@@ -4,22 +4,55 @@ Mermaid 图表生成脚本
 根据项目结构生成架构图、依赖图、模块关系图
 """
 
-import json
+import argparse
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import cache_store
+from diagram_cache import DiagramCache
+from diagram_governor import DEFAULT_MAX_EDGES, DEFAULT_MAX_NODES, DiagramGraph, govern_graph, summarize_items
+from graph_utils import layer_graph
 
-def generate_architecture_diagram(structure: Dict[str, Any]) -> str:
+# 生成器版本，渲染逻辑变化时递增以使图表缓存 (cache/diagrams/) 失效
+DIAGRAM_VERSION = 2
+
+# 环 (强连通分量) 节点标签中最多列出的模块数
+CYCLE_LABEL_LIMIT = 4
+
+
+def _take(items: List[Any], limit: int) -> Tuple[List[Any], int]:
+    """
+    截取最多 limit 项 (与 summarize_items 相同，超出时最后一个位置留给汇总节点)
+
+    Returns:
+        (保留的项, 省略的项数)，省略的项由调用方显示为 "其余 N 个" 节点，不会静默丢弃
+    """
+    if len(items) <= limit:
+        return items, 0
+    kept = max(limit - 1, 0)
+    return items[:kept], len(items) - kept
+
+
+def generate_architecture_diagram(structure: Dict[str, Any],
+                                  dependencies: Optional[Dict[str, Dict[str, List[str]]]] = None) -> str:
     """
     生成项目架构图
     
+    提供模块依赖时按真实导入图分层 (见 generate_layered_architecture_diagram)，
+    否则按模块路径中的关键字粗略分为前端 / 核心 / 工具层。
+    
     Args:
         structure: 项目结构数据 (来自 structure.json)
+        dependencies: 模块级依赖 (来自 import_graph.module_dependencies)
     
     Returns:
         Mermaid 图表代码
     """
+    if dependencies:
+        module_paths = {m['name']: m['path'] for m in structure.get('modules', []) if m.get('path')}
+        return generate_layered_architecture_diagram(dependencies, module_paths)
+    
     modules = structure.get('modules', [])
     project_type = structure.get('project_type', [])
     
@@ -30,9 +63,12 @@ def generate_architecture_diagram(structure: Dict[str, Any]) -> str:
         lines.append('    subgraph Frontend["前端层"]')
         frontend_modules = [m for m in modules if any(p in m.get('path', '') 
                           for p in ['components', 'pages', 'views', 'ui'])]
-        for m in frontend_modules[:5]:
+        shown, rest = _take(frontend_modules, 5)
+        for m in shown:
             safe_name = re.sub(r'[^a-zA-Z0-9]', '', m['name'])
             lines.append(f'        {safe_name}["{m["name"]}"]')
+        if rest:
+            lines.append(f'        FrontendRest["其余 {rest} 个"]')
         if not frontend_modules:
             lines.append('        UI["用户界面"]')
         lines.append('    end')
@@ -43,9 +79,12 @@ def generate_architecture_diagram(structure: Dict[str, Any]) -> str:
                    for p in ['core', 'lib', 'services', 'api', 'src']) 
                    and not any(p in m.get('path', '') 
                    for p in ['components', 'pages', 'views', 'ui', 'utils'])]
-    for m in core_modules[:5]:
+    shown, rest = _take(core_modules, 5)
+    for m in shown:
         safe_name = re.sub(r'[^a-zA-Z0-9]', '', m['name'])
         lines.append(f'        {safe_name}["{m["name"]}"]')
+    if rest:
+        lines.append(f'        CoreRest["其余 {rest} 个"]')
     if not core_modules:
         lines.append('        Logic["业务逻辑"]')
     lines.append('    end')
@@ -54,9 +93,12 @@ def generate_architecture_diagram(structure: Dict[str, Any]) -> str:
     lines.append('    subgraph Utils["工具层"]')
     util_modules = [m for m in modules if any(p in m.get('path', '') 
                    for p in ['utils', 'helpers', 'common', 'shared'])]
-    for m in util_modules[:3]:
+    shown, rest = _take(util_modules, 3)
+    for m in shown:
         safe_name = re.sub(r'[^a-zA-Z0-9]', '', m['name'])
         lines.append(f'        {safe_name}["{m["name"]}"]')
+    if rest:
+        lines.append(f'        UtilsRest["其余 {rest} 个"]')
     if not util_modules:
         lines.append('        Utilities["工具函数"]')
     lines.append('    end')
@@ -70,13 +112,88 @@ def generate_architecture_diagram(structure: Dict[str, Any]) -> str:
     return '\n'.join(lines)
 
 
-def generate_module_dependency_diagram(module_name: str, dependencies: Dict[str, List[str]]) -> str:
+def generate_layered_architecture_diagram(dependencies: Dict[str, Dict[str, List[str]]],
+                                          module_paths: Optional[Dict[str, str]] = None,
+                                          max_nodes: int = DEFAULT_MAX_NODES,
+                                          max_edges: int = DEFAULT_MAX_EDGES) -> str:
+    """
+    根据模块依赖生成分层架构图
+    
+    循环依赖的模块缩为一个节点，各节点按最长路径分层: 不依赖其他模块的
+    位于最底层，依赖者总在被依赖者之上。超出节点 / 边预算时由 govern_graph
+    归约、按目录折叠或拆分为多张相互链接的图。
+    
+    Args:
+        dependencies: 模块级依赖 {模块名: {"internal": [...], "external": [...]}}
+        module_paths: {模块名: 模块路径}，用于按目录折叠，缺失时使用模块名
+        max_nodes: 单张图的节点预算
+        max_edges: 单张图的边预算
+    
+    Returns:
+        Mermaid 图表代码 (拆分时为多个代码块)
+    """
+    module_paths = module_paths or {}
+    ids = {name: str(module_paths.get(name, name)).replace('\\', '/') for name in dependencies}
+    graph = DiagramGraph(
+        nodes={ids[name]: name for name in sorted(dependencies)},
+        edges=[(ids[name], ids[dep]) for name in sorted(dependencies)
+               for dep in dependencies[name].get('internal', []) if dep in ids],
+        title='架构图',
+    )
+    parts = govern_graph(graph, max_nodes, max_edges)
+    return '\n\n'.join(_render_layered(part, titled=len(parts) > 1) for part in parts)
+
+
+def _render_layered(graph: DiagramGraph, titled: bool = False) -> str:
+    node_ids = sorted(graph.nodes)
+    adjacency: Dict[str, List[str]] = {}
+    for source, target in graph.edges:
+        adjacency.setdefault(source, []).append(target)
+    layered = layer_graph(node_ids, adjacency)
+    
+    lines = ['```mermaid']
+    if titled:
+        lines.extend(['---', f'title: {graph.title}', '---'])
+    lines.append('flowchart TB')
+    by_layer: Dict[int, List[int]] = {}
+    for i, layer in enumerate(layered.layers):
+        by_layer.setdefault(layer, []).append(i)
+    
+    for depth, layer in enumerate(sorted(by_layer, reverse=True), 1):
+        lines.append(f'    subgraph L{layer}["第 {depth} 层"]')
+        for i in sorted(by_layer[layer], key=lambda c: [graph.nodes[m] for m in layered.components[c]]):
+            labels = sorted(graph.nodes[m] for m in layered.components[i])
+            if len(labels) == 1 and layered.components[i][0] in graph.links:
+                lines.append(f'        n{i}>"{labels[0]}"]')
+            elif len(labels) == 1:
+                lines.append(f'        n{i}["{labels[0]}"]')
+            else:
+                label = ' ⇄ '.join(labels[:CYCLE_LABEL_LIMIT])
+                if len(labels) > CYCLE_LABEL_LIMIT:
+                    label += f' +{len(labels) - CYCLE_LABEL_LIMIT}'
+                lines.append(f'        n{i}[["{label}"]]')
+        lines.append('    end')
+    
+    for source in sorted(layered.edges):
+        for target in sorted(layered.edges[source]):
+            lines.append(f'    n{source} --> n{target}')
+    
+    lines.append('```')
+    return '\n'.join(lines)
+
+
+def generate_module_dependency_diagram(module_name: str, dependencies: Dict[str, List[str]],
+                                       max_nodes: int = DEFAULT_MAX_NODES) -> str:
     """
     生成模块依赖关系图
     
+    内部与外部依赖各占一半节点预算，超出时按目录 / 包作用域折叠
+    (如 `utils/ (12)`)，不会静默丢弃依赖。
+    
     Args:
         module_name: 模块名称
         dependencies: 依赖关系 {"internal": [...], "external": [...]}
+        max_nodes: 节点预算
     
     Returns:
         Mermaid 图表代码
@@ -85,26 +202,35 @@ def generate_module_dependency_diagram(module_name: str, dependencies: Dict[str,
     
     safe_name = re.sub(r'[^a-zA-Z0-9]', '', module_name)
     lines.append(f'    {safe_name}["{module_name}"]')
+    budget = max(2, max_nodes // 2)
     
     # 内部依赖
-    internal = dependencies.get('internal', [])
-    for i, dep in enumerate(internal[:8]):
-        dep_name = Path(dep).stem
+    internal = summarize_items(dependencies.get('internal', []), budget)
+    for i, (dep, count) in enumerate(internal):
+        dep_name = _summary_label(Path(dep).stem, dep, count)
         safe_dep = re.sub(r'[^a-zA-Z0-9]', '', dep_name) + str(i)
         lines.append(f'    {safe_name} --> {safe_dep}["{dep_name}"]')
     
     # 外部依赖
-    external = dependencies.get('external', [])
+    external = summarize_items(dependencies.get('external', []), budget)
     if external:
         lines.append(f'    {safe_name} --> ext["外部依赖"]')
-        for i, dep in enumerate(external[:5]):
-            safe_dep = re.sub(r'[^a-zA-Z0-9]', '', dep) + 'ext' + str(i)
-            lines.append(f'    ext --> {safe_dep}["{dep}"]')
+        for i, (dep, count) in enumerate(external):
+            dep_name = _summary_label(dep, dep, count)
+            safe_dep = re.sub(r'[^a-zA-Z0-9]', '', dep_name) + 'ext' + str(i)
+            lines.append(f'    ext --> {safe_dep}["{dep_name}"]')
     
     lines.append('```')
     return '\n'.join(lines)
 
 
+def _summary_label(name: str, key: str, count: int) -> str:
+    """summarize_items 结果的节点标签"""
+    if not key:
+        return f'其余 {count} 个'
+    return name if count == 1 else f'{key}/ ({count})'
+
+
 def generate_file_tree_diagram(structure: Dict[str, Any], max_depth: int = 3) -> str:
     """
     生成目录结构图
@@ -120,24 +246,29 @@ def generate_file_tree_diagram(structure: Dict[str, Any], max_depth: int = 3) ->
     
     lines = ['```mermaid', 'mindmap', '  root((项目))']
     
-    for module in modules[:10]:
+    shown, rest = _take(modules, 10)
+    for module in shown:
         name = module.get('name', 'unnamed')
-        path = module.get('path', '')
         files_count = module.get('files', 0)
         lines.append(f'    {name}')
         lines.append(f'      {files_count} 个文件')
+    if rest:
+        lines.append(f'    其余 {rest} 个模块')
     
     lines.append('```')
     return '\n'.join(lines)
 
 
-def generate_data_flow_diagram(entry_points: List[str], modules: List[Dict]) -> str:
+def generate_data_flow_diagram(entry_points: List[str], modules: List[Dict],
+                               calls: Optional[List[Tuple[Optional[str], Optional[str], str]]] = None) -> str:
     """
     生成数据流序列图
     
     Args:
         entry_points: 入口文件列表
         modules: 模块列表
+        calls: 从入口展开的真实调用 [(调用方参与者, 被调用方参与者, 标签)]，
+            参与者为 None 表示入口 (来自 call_graph.call_flow)；为空时按模块顺序示意
     
     Returns:
         Mermaid 序列图代码
@@ -147,22 +278,45 @@ def generate_data_flow_diagram(entry_points: List[str], modules: List[Dict]) ->
     lines.append('    participant U as 用户')
     lines.append('    participant E as 入口')
     
-    if modules:
-        for i, module in enumerate(modules[:3]):
-            name = module.get('name', f'Module{i}')
-            safe_name = re.sub(r'[^a-zA-Z0-9]', '', name)
-            lines.append(f'    participant {safe_name} as {name}')
+    if calls:
+        ids: Dict[Optional[str], str] = {None: 'E'}
+        for caller, callee, _ in calls:
+            for name in (caller, callee):
+                if name not in ids:
+                    safe_name = re.sub(r'[^a-zA-Z0-9]', '', name) or 'P'
+                    if safe_name in ('U', 'E') or safe_name in ids.values():
+                        safe_name = f'{safe_name}{len(ids)}'
+                    ids[name] = safe_name
+                    lines.append(f'    participant {safe_name} as {name}')
+        lines.append('')
+        lines.append('    U->>E: 请求')
+        for caller, callee, label in calls:
+            lines.append(f'    {ids[caller]}->>{ids[callee]}: {label}')
+        lines.append('    E-->>U: 响应')
+        lines.append('```')
+        return '\n'.join(lines)
+    
+    shown, rest = _take(modules, 3)
+    for i, module in enumerate(shown):
+        name = module.get('name', f'Module{i}')
+        safe_name = re.sub(r'[^a-zA-Z0-9]', '', name)
+        lines.append(f'    participant {safe_name} as {name}')
+    if rest:
+        lines.append(f'    participant Rest as 其余 {rest} 个模块')
     
     lines.append('')
     lines.append('    U->>E: 请求')
     
     if modules:
         prev = 'E'
-        for i, module in enumerate(modules[:3]):
+        for i, module in enumerate(shown):
             name = module.get('name', f'Module{i}')
             safe_name = re.sub(r'[^a-zA-Z0-9]', '', name)
             lines.append(f'    {prev}->>{safe_name}: 调用')
             prev = safe_name
+        if rest:
+            lines.append(f'    {prev}->>Rest: 调用')
+            prev = 'Rest'
         lines.append(f'    {prev}-->>U: 响应')
     else:
         lines.append('    E-->>U: 响应')
@@ -171,59 +325,139 @@ def generate_data_flow_diagram(entry_points: List[str], modules: List[Dict]) ->
     return '\n'.join(lines)
 
 
-def generate_class_diagram(classes: List[Dict[str, Any]]) -> str:
+def _class_member(member: str) -> str:
+    """类成员文本: 保留已有的可见性前缀 (+-#~)，泛型尖括号改写为 Mermaid 的 ~T~"""
+    member = re.sub(r'[{}"]', '', member).replace('<', '~').replace('>', '~')
+    return member if member[:1] in '+-#~' else f'+{member}'
+
+
+def generate_class_diagram(classes: List[Dict[str, Any]], max_classes: int = 10,
+                           max_members: int = 5) -> str:
     """
     生成类图
     
     Args:
-        classes: 类信息列表 [{"name": "ClassName", "methods": [...], "properties": [...]}]
+        classes: 类信息列表 [{"name": "ClassName", "methods": [...], "properties": [...]}]，
+            可选 "kind" ("interface")、"bases" (继承的类名)、"implements" (实现的接口)
+            与 "composes" (组合的类名)
+        max_classes: 最多显示的类数 (超出时以注释标明省略的类数)
+        max_members: 每个类最多显示的字段数与方法数 (超出时最后一行为 "其余 N 个")
     
     Returns:
         Mermaid 类图代码
     """
     lines = ['```mermaid', 'classDiagram']
+    relations = []
     
-    for cls in classes[:10]:
+    shown, rest = _take(classes, max_classes)
+    if rest:
+        lines.append(f'    note "其余 {rest} 个类未显示"')
+    for cls in shown:
         name = cls.get('name', 'Unknown')
         safe_name = re.sub(r'[^a-zA-Z0-9]', '', name)
         lines.append(f'    class {safe_name} {{')
+        if cls.get('kind') == 'interface':
+            lines.append('        <<interface>>')
         
-        for prop in cls.get('properties', [])[:5]:
-            lines.append(f'        +{prop}')
+        properties, rest_properties = _take(cls.get('properties', []), max_members)
+        for prop in properties:
+            lines.append(f'        {_class_member(prop)}')
+        if rest_properties:
+            lines.append(f'        +其余 {rest_properties} 个字段')
         
-        for method in cls.get('methods', [])[:5]:
-            lines.append(f'        +{method}()')
+        methods, rest_methods = _take(cls.get('methods', []), max_members)
+        for method in methods:
+            lines.append(f'        {_class_member(method)}()')
+        if rest_methods:
+            lines.append(f'        +其余 {rest_methods} 个方法()')
         
         lines.append('    }')
-    
+        
+        for base in cls.get('bases', []):
+            safe_base = re.sub(r'[^a-zA-Z0-9]', '', base)
+            if safe_base and safe_base != safe_name:
+                relations.append(f'    {safe_base} <|-- {safe_name}')
+        for interface in cls.get('implements', []):
+            safe_interface = re.sub(r'[^a-zA-Z0-9]', '', interface)
+            if safe_interface and safe_interface != safe_name:
+                relations.append(f'    {safe_interface} <|.. {safe_name}')
+        for part in cls.get('composes', []):
+            safe_part = re.sub(r'[^a-zA-Z0-9]', '', part)
+            if safe_part and safe_part != safe_name:
+                relations.append(f'    {safe_name} *-- {safe_part}')
+    
+    lines.extend(dict.fromkeys(relations))
     lines.append('```')
     return '\n'.join(lines)
 
 
 def load_structure(wiki_dir: str) -> Optional[Dict[str, Any]]:
     """加载项目结构数据"""
-    structure_path = Path(wiki_dir) / "cache" / "structure.json"
-    if structure_path.exists():
-        with open(structure_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+    return cache_store.load_document(wiki_dir, 'structure')
 
 
-if __name__ == '__main__':
-    import sys
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki Mermaid 图表生成")
+    parser.add_argument("wiki_dir", help=".mini-wiki 目录")
+    parser.add_argument("--no-cache", action="store_true", help="不读写图表缓存 (cache/diagrams/)")
+    args = parser.parse_args()
     
-    if len(sys.argv) < 2:
-        print("用法: python generate_diagram.py <.mini-wiki目录>")
-        sys.exit(1)
-    
-    wiki_dir = sys.argv[1]
+    wiki_dir = args.wiki_dir
     structure = load_structure(wiki_dir)
+    if not structure:
+        print("未找到项目结构数据")
+        return 1
+    
+    # 输入指纹未变化的图表直接读取缓存
+    cache = DiagramCache(wiki_dir, DIAGRAM_VERSION, enabled=not args.no_cache)
+    modules = structure.get('modules', [])
     
-    if structure:
-        print("=== 架构图 ===")
-        print(generate_architecture_diagram(structure))
+    # 已建立导入图 (scripts/import_graph.py) 时按真实依赖分层
+    from import_graph import load_module_dependencies
+    dependencies = load_module_dependencies(wiki_dir)
+    
+    print("=== 架构图 ===")
+    print(cache.render('architecture', {'modules': modules, 'project_type': structure.get('project_type', []),
+                                        'dependencies': dependencies},
+                       lambda: generate_architecture_diagram(structure, dependencies)))
+    print()
+    print("=== 目录结构图 ===")
+    print(cache.render('file_tree', modules, lambda: generate_file_tree_diagram(structure)))
+    
+    # 各模块依赖图
+    for name, deps in dependencies.items():
+        if deps['internal'] or deps['external']:
+            print()
+            print(f"=== 模块依赖图: {name} ===")
+            print(cache.render(f'module_deps:{name}', deps,
+                               lambda: generate_module_dependency_diagram(name, deps)))
+    
+    # 已建立调用图 (scripts/call_graph.py) 时按入口的真实调用路径生成数据流图
+    from call_graph import load_call_flow
+    calls = load_call_flow(wiki_dir)
+    if calls:
+        entry_points = structure.get('entry_points', [])
         print()
-        print("=== 目录结构图 ===")
-        print(generate_file_tree_diagram(structure))
-    else:
-        print("未找到项目结构数据")
+        print("=== 数据流图 ===")
+        print(cache.render('data_flow', {'entry_points': entry_points, 'calls': calls},
+                           lambda: generate_data_flow_diagram(entry_points, modules, calls)))
+    
+    # 已建立类索引 (scripts/class_index.py) 时输出各模块类图
+    from class_index import CLASS_DOCUMENT, generate_module_class_diagrams, load_class_index
+    if cache_store.has_document(wiki_dir, CLASS_DOCUMENT):
+        diagrams = generate_module_class_diagrams(load_class_index(wiki_dir), modules, cache=cache)
+        for name, diagram in diagrams.items():
+            print()
+            print(f"=== 类图: {name} ===")
+            print(diagram)
+    
+    # 全部图表已重新生成，清理不再使用的缓存条目
+    cache.prune()
+    stats = cache.stats()
+    print()
+    print(f"📦 图表缓存: 命中 {stats['hits']}, 未命中 {stats['misses']}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+图算法模块
+为依赖图提供强连通分量缩点 (迭代式 Tarjan) 与最长路径分层，
+均为 O(V + E)，不受递归深度限制
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+
+@dataclass
+class LayeredGraph:
+    """
+    缩点并分层后的依赖图
+
+    components[i] 为第 i 个强连通分量的成员 (已排序)；edges[i] 为它依赖的分量；
+    layers[i] 为分量所在层，不依赖其他分量的为 0 层，依赖者总在被依赖者之上。
+    """
+    components: List[List[str]]
+    component_of: Dict[str, int]
+    edges: Dict[int, Set[int]]
+    layers: List[int]
+
+    @property
+    def depth(self) -> int:
+        """层数"""
+        return max(self.layers) + 1 if self.layers else 0
+
+
+def strongly_connected_components(nodes: Iterable[str],
+                                  edges: Dict[str, Iterable[str]]) -> List[List[str]]:
+    """
+    迭代式 Tarjan 强连通分量
+
+    Args:
+        nodes: 节点 (按给定顺序作为搜索起点，结果因此是确定的)
+        edges: {节点: 后继节点}，指向未知节点的边被忽略
+
+    Returns:
+        强连通分量列表，按逆拓扑序排列: 每个分量都排在它能到达的所有分量之后
+    """
+    nodes = list(nodes)
+    node_set = set(nodes)
+    adjacency = {node: [t for t in edges.get(node, ()) if t in node_set] for node in nodes}
+
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[List[str]] = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(adjacency[succ])))
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def layer_graph(nodes: Iterable[str], edges: Dict[str, Iterable[str]]) -> LayeredGraph:
+    """
+    缩点后按最长路径分层
+
+    Tarjan 输出的分量顺序中，被依赖的分量总在依赖者之前，
+    因此一次顺序遍历即可得到 layer = 1 + max(被依赖分量的 layer)。
+
+    Args:
+        nodes: 节点
+        edges: {节点: 依赖的节点}
+    """
+    components = strongly_connected_components(nodes, edges)
+    component_of = {member: i for i, component in enumerate(components) for member in component}
+
+    component_edges: Dict[int, Set[int]] = {i: set() for i in range(len(components))}
+    for node, targets in edges.items():
+        source = component_of.get(node)
+        if source is None:
+            continue
+        for target in targets:
+            target_component = component_of.get(target)
+            if target_component is not None and target_component != source:
+                component_edges[source].add(target_component)
+
+    layers = [0] * len(components)
+    for i in range(len(components)):
+        if component_edges[i]:
+            layers[i] = 1 + max(layers[j] for j in component_edges[i])
+
+    return LayeredGraph(components=components, component_of=component_of,
+                        edges=component_edges, layers=layers)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+导入依赖图脚本
+单次扫描解析 Python 与 JS/TS 文件的 import / require / from ... import 语句，
+按 discover_modules 的模块划分区分内部与外部依赖，结果持久化到缓存，
+并只对哈希变化的文件重新解析
+"""
+
+import argparse
+import ast
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import cache_store
+from file_index import load_file_index, save_file_index, update_file_index
+from js_lexer import tokenize
+
+# 缓存文档名 (cache/import_graph.json 或 SQLite documents 表)
+GRAPH_DOCUMENT = 'import_graph'
+
+# 解析规则变化时递增，旧版本缓存会被整体重建
+GRAPH_VERSION = 1
+
+JS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+PY_EXTENSIONS = ('.py', '.pyi')
+
+# 非相对路径但指向项目 src/ 目录的常见别名
+JS_PATH_ALIASES = ('@/', '~/')
+
+# 以包名 (而非文件路径) 引用的 monorepo 子包所在目录
+PACKAGE_DIRS = ('packages', 'apps')
+
+# 语法错误时退化为按行匹配
+_PY_IMPORT_RE = re.compile(r'^[ \t]*(?:from[ \t]+(\.*[\w.]*)[ \t]+import\b|import[ \t]+([\w.]+))', re.M)
+
+
+def parse_python_imports(content: str) -> List[str]:
+    """
+    解析 Python 导入语句
+
+    `from pkg import name` 记为 `pkg.name`，解析时若不是子模块再回退到 `pkg`；
+    相对导入保留前导点号 (如 `..utils.helper`)。
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return list(dict.fromkeys(m.group(1) or m.group(2) for m in _PY_IMPORT_RE.finditer(content)))
+
+    specs = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            specs.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = '.' * node.level + (node.module or '')
+            separator = '.' if node.module else ''
+            for alias in node.names:
+                specs.append(base if alias.name == '*' else f'{base}{separator}{alias.name}')
+    return list(dict.fromkeys(specs))
+
+
+def parse_js_imports(content: str) -> List[str]:
+    """
+    解析 JS/TS 导入语句
+
+    识别 `import ... from 'x'`、`export ... from 'x'`、`import 'x'`、
+    `import('x')` 与 `require('x')`，字符串与注释中的同名文本不会误判。
+    """
+    tokens = tokenize(content)
+    specs = []
+    for i, token in enumerate(tokens):
+        if token.kind != 'ident' or token.value not in ('import', 'from', 'require'):
+            continue
+        # 排除 obj.require(...) 之类的成员访问
+        if i > 0 and tokens[i - 1].kind == 'punct' and tokens[i - 1].value in ('.', '?.'):
+            continue
+        following = tokens[i + 1:i + 4]
+        if token.value != 'require' and following and following[0].kind == 'string':
+            specs.append(following[0].value[1:-1])
+        elif (token.value != 'from' and len(following) == 3 and following[0].value == '('
+              and following[1].kind == 'string' and following[2].value == ')'):
+            specs.append(following[1].value[1:-1])
+    return list(dict.fromkeys(spec for spec in specs if spec))
+
+
+def parse_imports(file_path: str, content: str) -> List[str]:
+    """按文件类型解析导入语句"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in PY_EXTENSIONS:
+        return parse_python_imports(content)
+    if ext in JS_EXTENSIONS:
+        return parse_js_imports(content)
+    return []
+
+
+def build_module_index(modules: List[Dict[str, Any]]) -> Dict[str, str]:
+    """构建 {模块路径 (POSIX): 模块名} 索引"""
+    return {str(m.get('path', '')).replace(os.sep, '/').rstrip('/'): m.get('name')
+            for m in modules if m.get('path')}
+
+
+def module_of(path: str, module_index: Dict[str, str]) -> Optional[str]:
+    """沿父目录向上查找路径所属的模块 (最长路径前缀)"""
+    while path:
+        if path in module_index:
+            return module_index[path]
+        path = posixpath.dirname(path)
+    return None
+
+
+class ImportResolver:
+    """
+    将导入语句解析为项目内文件 / 模块或外部包
+
+    Python 模块名按导入根计算: 最外层连续包 (含 __init__.py) 目录的父目录，
+    同时登记相对项目根的完整点号路径；JS/TS 按相对路径补全扩展名与 index 文件。
+    """
+
+    def __init__(self, files: Iterable[str], modules: List[Dict[str, Any]]):
+        self.files: Set[str] = set(files)
+        self.module_paths = {m.get('name'): str(m.get('path', '')).replace(os.sep, '/').rstrip('/')
+                             for m in modules if m.get('path')}
+        self.python_modules: Dict[str, str] = {}
+        self.file_modules: Dict[str, str] = {}
+
+        py_files = sorted(f for f in self.files if f.endswith(PY_EXTENSIONS))
+        packages = {posixpath.dirname(f) for f in py_files
+                    if posixpath.basename(f) in ('__init__.py', '__init__.pyi')}
+        for file in py_files:
+            parts = os.path.splitext(file)[0].split('/')
+            dir_parts = parts[:-1]
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            root = len(dir_parts)
+            while root > 0 and '/'.join(dir_parts[:root]) in packages:
+                root -= 1
+            name = '.'.join(parts[root:])
+            self.file_modules[file] = name
+            for dotted in (name, '.'.join(parts)):
+                if dotted:
+                    self.python_modules.setdefault(dotted, file)
+
+    def resolve(self, file: str, spec: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        解析单条导入
+
+        Returns:
+            ('internal', 文件或模块路径) / ('external', 包名) / (None, None)
+            (项目内但无法定位的导入)
+        """
+        if file.endswith(PY_EXTENSIONS):
+            return self._resolve_python(file, spec)
+        return self._resolve_js(file, spec)
+
+    def resolve_all(self, file: str, specs: List[str]) -> Tuple[List[str], List[str]]:
+        """解析文件的全部导入，返回 (内部目标, 外部包)"""
+        internal: Dict[str, None] = {}
+        external: Dict[str, None] = {}
+        for spec in specs:
+            kind, target = self.resolve(file, spec)
+            if kind == 'internal' and target != file:
+                internal[target] = None
+            elif kind == 'external':
+                external[target] = None
+        return list(internal), list(external)
+
+    def _resolve_python(self, file: str, spec: str) -> Tuple[Optional[str], Optional[str]]:
+        level = len(spec) - len(spec.lstrip('.'))
+        if level:
+            package = self.file_modules.get(file, '').split('.')
+            if posixpath.basename(file) not in ('__init__.py', '__init__.pyi'):
+                package = package[:-1]
+            if level - 1 > len(package):
+                return None, None
+            base = package[:len(package) - (level - 1)]
+            parts = base + [p for p in spec[level:].split('.') if p]
+            # 回退到父模块时不越过相对导入的基准包
+            while len(parts) >= len(base) and parts:
+                target = self.python_modules.get('.'.join(parts))
+                if target:
+                    return 'internal', target
+                parts.pop()
+            return None, None
+
+        parts = spec.split('.')
+        while parts:
+            target = self.python_modules.get('.'.join(parts))
+            if target:
+                return 'internal', target
+            parts.pop()
+        top = spec.split('.')[0]
+        if top in self.module_paths:
+            return 'internal', self.module_paths[top]
+        return 'external', top
+
+    def _resolve_js(self, file: str, spec: str) -> Tuple[Optional[str], Optional[str]]:
+        if spec.startswith(('./', '../')) or spec in ('.', '..'):
+            target = self._resolve_js_path(posixpath.join(posixpath.dirname(file), spec))
+            return ('internal', target) if target else (None, None)
+        if spec.startswith('/'):
+            return None, None
+        for alias in JS_PATH_ALIASES:
+            if spec.startswith(alias):
+                target = self._resolve_js_path('src/' + spec[len(alias):])
+                return ('internal', target) if target else (None, None)
+
+        segments = spec.split('/')
+        package = '/'.join(segments[:2]) if spec.startswith('@') and len(segments) > 1 else segments[0]
+        # monorepo 子包以包名引用 (@scope/name 或 name)
+        module_path = self.module_paths.get(package.rsplit('/', 1)[-1])
+        if module_path and module_path.split('/', 1)[0] in PACKAGE_DIRS:
+            return 'internal', module_path
+        return 'external', package
+
+    def _resolve_js_path(self, base: str) -> Optional[str]:
+        base = posixpath.normpath(base)
+        if base.startswith('..'):
+            return None
+        stem, ext = posixpath.splitext(base)
+        candidates = [base]
+        candidates.extend(base + e for e in JS_EXTENSIONS)
+        candidates.append(base + '.d.ts')
+        # TS 中以编译后的 .js 扩展名引用 .ts 源文件
+        if ext in ('.js', '.jsx', '.mjs', '.cjs'):
+            candidates.extend(stem + e for e in ('.ts', '.tsx'))
+        candidates.extend(f'{base}/index{e}' for e in JS_EXTENSIONS)
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+
+def _parse_file(rel_path: str, content: str) -> Dict[str, Any]:
+    return {'imports': parse_imports(rel_path, content)}
+
+
+def load_import_graph(wiki_dir: str) -> Dict[str, Any]:
+    """加载缓存的导入图，不存在或版本不符时返回空图"""
+    return load_file_index(wiki_dir, GRAPH_DOCUMENT, GRAPH_VERSION)
+
+
+def load_modules(project_root: str) -> List[Dict[str, Any]]:
+    """读取 structure 中的模块列表，缺失时重新发现模块"""
+    wiki_dir = str(Path(project_root) / '.mini-wiki')
+    structure = cache_store.load_document(wiki_dir, 'structure') or {}
+    if structure.get('modules'):
+        return structure['modules']
+    from analyze_project import discover_modules
+    return discover_modules(Path(project_root))
+
+
+def update_import_graph(project_root: str, checksums: Optional[Dict[str, str]] = None,
+                        modules: Optional[List[Dict[str, Any]]] = None,
+                        workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    增量更新导入图
+
+    只重新解析哈希与缓存不同的文件；内外部依赖的解析依赖整个文件集合，
+    每次对全部文件重新计算 (只涉及字典查找)。
+
+    Args:
+        project_root: 项目根目录
+        checksums: 当前文件校验和 {相对路径: 哈希}，为空时读取 checksums 缓存
+        modules: 模块列表 (discover_modules 输出)，为空时读取 structure 缓存
+        workers: 解析进程数，默认 CPU 核数
+
+    Returns:
+        {"updated": 重新解析的文件数, "removed": 删除的文件数, "edges": 内部依赖边数}
+    """
+    graph, counts = update_file_index(project_root, GRAPH_DOCUMENT, GRAPH_VERSION,
+                                      JS_EXTENSIONS + PY_EXTENSIONS, _parse_file, checksums, workers)
+    files: Dict[str, Dict[str, Any]] = graph['files']
+
+    resolver = ImportResolver(files, modules if modules is not None else load_modules(project_root))
+    edges = 0
+    for file, record in files.items():
+        record['internal'], record['external'] = resolver.resolve_all(file, record['imports'])
+        edges += len(record['internal'])
+
+    save_file_index(str(Path(project_root) / '.mini-wiki'), GRAPH_DOCUMENT, graph)
+    return {**counts, 'edges': edges}
+
+
+def module_dependencies(graph: Dict[str, Any],
+                        modules: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    将文件级导入图汇总为模块级依赖
+
+    Returns:
+        {模块名: {"internal": [依赖的其他模块], "external": [外部包]}}，
+        可直接传给 generate_module_dependency_diagram
+    """
+    module_index = build_module_index(modules)
+    internal: Dict[str, Set[str]] = {m['name']: set() for m in modules}
+    external: Dict[str, Set[str]] = {m['name']: set() for m in modules}
+    for file, record in graph.get('files', {}).items():
+        source = module_of(file, module_index)
+        if source is None:
+            continue
+        for target in record.get('internal', []):
+            target_module = module_of(target, module_index)
+            if target_module and target_module != source:
+                internal[source].add(target_module)
+        external[source].update(record.get('external', []))
+    return {name: {'internal': sorted(internal[name]), 'external': sorted(external[name])}
+            for name in internal}
+
+
+def load_module_dependencies(wiki_dir: str) -> Dict[str, Dict[str, List[str]]]:
+    """从缓存的导入图与 structure 计算模块级依赖 (未建立导入图时为空)"""
+    if not cache_store.has_document(wiki_dir, GRAPH_DOCUMENT):
+        return {}
+    structure = cache_store.load_document(wiki_dir, 'structure') or {}
+    return module_dependencies(load_import_graph(wiki_dir), structure.get('modules', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 导入依赖图")
+    parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    parser.add_argument("--module", default=None, help="输出指定模块的 Mermaid 依赖图")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出模块级依赖")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数")
+    args = parser.parse_args()
+
+    from detect_changes import detect_changes
+    from generate_diagram import generate_module_dependency_diagram
+
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+    checksums = detect_changes(args.project_path, track_symbols=False)["current_checksums"]
+    modules = load_modules(args.project_path)
+    counts = update_import_graph(args.project_path, checksums, modules, args.workers)
+    dependencies = module_dependencies(load_import_graph(wiki_dir), modules)
+
+    if args.json:
+        print(json.dumps(dependencies, indent=2, ensure_ascii=False))
+        return 0
+    print(f"✅ 导入图: 解析 {counts['updated']} 个文件, 删除 {counts['removed']} 个文件, "
+          f"共 {counts['edges']} 条内部依赖")
+    if args.module:
+        if args.module not in dependencies:
+            print(f"❌ 未找到模块: {args.module}")
+            return 1
+        print(generate_module_dependency_diagram(args.module, dependencies[args.module]))
+    else:
+        for name, deps in dependencies.items():
+            print(f"  {name}: {len(deps['internal'])} 个内部依赖, {len(deps['external'])} 个外部依赖")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
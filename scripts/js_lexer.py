@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+JavaScript/TypeScript 词法分析模块
+单次前向扫描源码，正确跳过字符串、模板字符串、正则字面量与普通注释，
+输出标识符、标点与 JSDoc 注释等记号，供文档与结构提取使用；
+并提供文档提取、类索引与调用图共用的类成员解析
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class Token(NamedTuple):
+    """词法记号"""
+    kind: str  # 'ident', 'punct', 'string', 'template', 'number', 'regex', 'doc'
+    value: str
+    start: int
+    end: int
+
+
+class ClassMember(NamedTuple):
+    """类体成员 (位置均为记号下标，范围为左闭右开)"""
+    name: str
+    kind: str  # 'method' (含值为函数的字段) 或 'field'
+    modifiers: Tuple[str, ...]
+    name_index: int
+    params: int  # 参数列表 `(` 的位置，没有时为 -1
+    type_range: Tuple[int, int]  # 类型注解，方法为返回类型
+    value_range: Tuple[int, int]  # 字段初始值
+    body: int  # 函数体 `{` 的位置，没有时为 -1
+    end: int  # 成员之后的位置
+
+
+# 类成员修饰符 (`get` / `set` 等后面不是名称时按成员名处理)
+MEMBER_MODIFIERS = frozenset({
+    'public', 'private', 'protected', 'static', 'readonly', 'async', 'abstract',
+    'override', 'declare', 'get', 'set', 'accessor',
+})
+
+
+# 代码状态下的记号模式，各分支均为前向匹配，不会跨越整个文件回溯
+_CODE_TOKEN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>/\*[\s\S]*?(?:\*/|\Z)|//[^\n]*)
+  | (?P<ident>[A-Za-z_$\u00a0-\uffff][\w$\u00a0-\uffff]*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<string>'(?:[^'\\\n]|\\[\s\S])*'?|"(?:[^"\\\n]|\\[\s\S])*"?)
+  | (?P<template>`)
+  | (?P<punct>=>|\?\.|\.\.\.|[\s\S])
+''', re.VERBOSE)
+
+# 模板字符串中 `${` 或结束反引号之前的文本
+_TEMPLATE_CHUNK = re.compile(r'(?:[^`\\$]|\\[\s\S]|\$(?!\{))*')
+
+_REGEX_LITERAL = re.compile(r'/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+
+# 这些关键字之后的 `/` 是正则字面量而不是除号
+_KEYWORDS_BEFORE_EXPR = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+})
+
+
+def _regex_allowed(prev: Optional[Token]) -> bool:
+    if prev is None:
+        return True
+    if prev.kind == 'punct':
+        return prev.value not in (')', ']', '}')
+    return prev.kind == 'ident' and prev.value in _KEYWORDS_BEFORE_EXPR
+
+
+def tokenize(content: str) -> List[Token]:
+    """
+    将源码切分为记号
+
+    普通注释被丢弃，`/** ... */` 输出为 'doc' 记号 (value 为注释正文)；
+    模板字符串只输出一个 'template' 记号，其中 `${...}` 内的表达式照常切分。
+    """
+    tokens: List[Token] = []
+    # 花括号栈: 'template' 表示 `${` 打开的插值表达式
+    braces: List[str] = []
+    pos = 0
+    n = len(content)
+    prev: Optional[Token] = None
+    in_template = False
+
+    while pos < n:
+        if in_template:
+            pos = _TEMPLATE_CHUNK.match(content, pos).end()
+            if content.startswith('${', pos):
+                braces.append('template')
+                pos += 2
+                in_template = False
+            else:
+                pos += 1  # 结束反引号 (或文件末尾)
+                in_template = False
+            continue
+
+        if content[pos] == '/' and _regex_allowed(prev):
+            match = _REGEX_LITERAL.match(content, pos)
+            if match:
+                prev = Token('regex', match.group(), pos, match.end())
+                tokens.append(prev)
+                pos = match.end()
+                continue
+
+        match = _CODE_TOKEN.match(content, pos)
+        kind = match.lastgroup
+        start, pos = pos, match.end()
+        if kind == 'ws':
+            continue
+        if kind == 'comment':
+            text = match.group()
+            if text.startswith('/**') and text != '/**/':
+                end = -2 if text.endswith('*/') and len(text) >= 5 else len(text)
+                prev = Token('doc', text[3:end], start, pos)
+                tokens.append(prev)
+            continue
+        if kind == 'template':
+            prev = Token('template', '`', start, pos)
+            tokens.append(prev)
+            in_template = True
+            continue
+
+        value = match.group()
+        if kind == 'punct':
+            if value == '{':
+                braces.append('{')
+            elif value == '}' and braces:
+                if braces.pop() == 'template':
+                    in_template = True
+                    continue
+        prev = Token(kind, value, start, pos)
+        tokens.append(prev)
+
+    return tokens
+
+
+def skip_balanced(tokens: List[Token], index: int) -> int:
+    """index 指向开括号时，返回匹配的闭括号之后的位置"""
+    pairs = {'(': ')', '[': ']', '{': '}', '<': '>'}
+    opener = tokens[index].value
+    closer = pairs[opener]
+    depth = 0
+    for i in range(index, len(tokens)):
+        token = tokens[i]
+        if token.kind != 'punct':
+            continue
+        if token.value == opener:
+            depth += 1
+        elif token.value == closer:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(tokens)
+
+
+def token_is(tokens: List[Token], index: int, *values: str) -> bool:
+    """index 处是否为取值在 values 中的标识符或标点"""
+    return 0 <= index < len(tokens) and tokens[index].kind in ('ident', 'punct') and tokens[index].value in values
+
+
+def skip_decorators(tokens: List[Token], index: int) -> int:
+    """跳过 `@decorator` / `@ns.decorator(...)`"""
+    while token_is(tokens, index, '@'):
+        index += 1
+        while index < len(tokens) and (tokens[index].kind == 'ident' or token_is(tokens, index, '.')):
+            index += 1
+        if token_is(tokens, index, '('):
+            index = skip_balanced(tokens, index)
+    return index
+
+
+def is_function_value(tokens: List[Token], index: int) -> bool:
+    """判断 index 处的表达式是否为函数 (function 表达式或箭头函数)"""
+    if token_is(tokens, index, 'async'):
+        index += 1
+    if token_is(tokens, index, 'function'):
+        return True
+    if index < len(tokens) and tokens[index].kind == 'ident':
+        return token_is(tokens, index + 1, '=>')
+    if token_is(tokens, index, '<'):
+        index = skip_balanced(tokens, index)
+    if token_is(tokens, index, '('):
+        index = skip_balanced(tokens, index)
+        return token_is(tokens, index, '=>', ':')
+    return False
+
+
+def _newline_before(content: str, tokens: List[Token], index: int) -> bool:
+    return index > 0 and '\n' in content[tokens[index - 1].end:tokens[index].start]
+
+
+def skip_value(content: str, tokens: List[Token], index: int, is_type: bool = False) -> int:
+    """跳过字段的类型或初始值，停在 `;`、`,`、`}` 或换行处；类型还停在初始值的 `=` 处"""
+    start = index
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind == 'punct' and token.value in ('(', '[', '{', '<'):
+            if token.value == '<' and not (index > start and tokens[index - 1].kind == 'ident'):
+                index += 1
+                continue
+            index = skip_balanced(tokens, index)
+            continue
+        if token.kind == 'punct' and (token.value in (';', ',', '}', ')') or is_type and token.value == '='):
+            break
+        if index > start and _newline_before(content, tokens, index) and not (
+                token.kind == 'punct' and token.value in ('|', '&', '.', '?', ':', '=>')):
+            break
+        index += 1
+    return index
+
+
+def _skip_return_type(content: str, tokens: List[Token], index: int) -> int:
+    """跳过返回类型注解，停在函数体 `{`、`=>`、`;` 或换行处 (允许对象字面量类型 `(): { a: number } {`)"""
+    start = index
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind == 'punct':
+            if token.value == '{':
+                # 注解开头或 `|` / `&` 之后的 `{` 是对象字面量类型，其他位置是函数体
+                if index > start and not token_is(tokens, index - 1, '|', '&'):
+                    return index
+                index = skip_balanced(tokens, index)
+                continue
+            if token.value in ('(', '[', '<'):
+                index = skip_balanced(tokens, index)
+                continue
+            if token.value in ('=>', ';', ',', '}', '='):
+                return index
+        if index > start and _newline_before(content, tokens, index) and not (
+                token.kind == 'punct' and token.value in ('|', '&', '.', '?', ':')):
+            return index
+        index += 1
+    return index
+
+
+def _function_body(content: str, tokens: List[Token], start: int, end: int) -> int:
+    """函数值 tokens[start:end] 的函数体 `{` 位置，没有时为 -1"""
+    index = start
+    while index < end:
+        if token_is(tokens, index, '(', '[', '<'):
+            index = skip_balanced(tokens, index)
+            if token_is(tokens, index, ':'):
+                index = _skip_return_type(content, tokens, index + 1)
+            continue
+        if token_is(tokens, index, '=>'):
+            return index + 1 if token_is(tokens, index + 1, '{') else -1
+        if token_is(tokens, index, '{'):
+            return index
+        index += 1
+    return -1
+
+
+def parse_class_member(content: str, tokens: List[Token], index: int) -> Optional[ClassMember]:
+    """
+    解析从 index 开始的类体成员 (装饰器、修饰符、名称、参数、类型与初始值)
+
+    方法、以及初始值为函数 (箭头函数或 function 表达式) 的字段视为 'method'；
+    计算属性名、索引签名与静态块返回 None。
+    """
+    index = skip_decorators(tokens, index)
+    modifiers: List[str] = []
+    while (index + 1 < len(tokens) and tokens[index].kind == 'ident'
+           and tokens[index].value in MEMBER_MODIFIERS
+           and not token_is(tokens, index + 1, '(', '<', '=', ':', ';', '?', '!', '}', ',')):
+        modifiers.append(tokens[index].value)
+        index += 1
+    if token_is(tokens, index, '*'):
+        modifiers.append('*')
+        index += 1
+    prefix = ''
+    if token_is(tokens, index, '#'):
+        prefix = '#'
+        index += 1
+    if index >= len(tokens) or tokens[index].kind not in ('ident', 'string'):
+        return None
+    name = prefix + tokens[index].value.strip('\'"')
+    name_index = index
+    index += 1
+    while token_is(tokens, index, '?', '!'):
+        index += 1
+
+    if token_is(tokens, index, '(', '<'):
+        if token_is(tokens, index, '<'):
+            index = skip_balanced(tokens, index)
+        if not token_is(tokens, index, '('):
+            return None
+        params = index
+        index = skip_balanced(tokens, index)
+        type_start = index
+        if token_is(tokens, index, ':'):
+            type_start = index + 1
+            index = _skip_return_type(content, tokens, type_start)
+        type_range = (type_start, index)
+        body = -1
+        if token_is(tokens, index, '{'):
+            body = index
+            index = skip_balanced(tokens, index)
+        return ClassMember(name, 'method', tuple(modifiers), name_index, params, type_range,
+                           (index, index), body, index)
+
+    type_range = (index, index)
+    if token_is(tokens, index, ':'):
+        index = skip_value(content, tokens, index + 1, is_type=True)
+        type_range = (type_range[0] + 1, index)
+    value_range = (index, index)
+    kind, body = 'field', -1
+    if token_is(tokens, index, '='):
+        index = skip_value(content, tokens, index + 1)
+        value_range = (value_range[0] + 1, index)
+        if is_function_value(tokens, value_range[0]):
+            kind = 'method'
+            body = _function_body(content, tokens, value_range[0], index)
+    return ClassMember(name, kind, tuple(modifiers), name_index, -1, type_range, value_range, body, index)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+模块优先级评分脚本
+按渐进式扫描的加权规则 (入口点、被依赖次数、现有文档、代码行数、最近修改)
+为模块打分排序，并将排序结果写入 cache/progress.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import cache_store
+from analyze_project import CODE_EXTENSIONS, analyze_project
+from detect_changes import detect_changes
+from import_graph import (build_module_index, load_import_graph, module_dependencies, module_of,
+                          update_import_graph)
+from wiki_config import DEFAULT_PRIORITY_WEIGHTS, load_priority_settings
+
+# 仅被入口文件直接导入 (而非包含入口文件) 的模块得到的入口分
+ENTRY_IMPORT_FACTOR = 0.5
+
+
+@dataclass
+class ModuleStats:
+    """模块的原始统计数据"""
+    lines: int = 0
+    bytes: int = 0
+    latest_mtime_ns: int = 0
+    has_readme: bool = False
+
+
+@dataclass
+class ModulePriority:
+    """模块优先级"""
+    name: str
+    path: str
+    score: float
+    factors: Dict[str, float] = field(default_factory=dict)
+    lines: int = 0
+    bytes: int = 0
+    dependents: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def count_lines(file_path: str) -> int:
+    """统计文件行数，读取失败时返回 0"""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return 0
+    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
+
+def collect_module_stats(project_root: str, modules: List[Dict[str, Any]], files: Iterable[str],
+                         file_stats: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, ModuleStats]:
+    """
+    统计各模块的代码行数、字节数、最近修改时间与是否有 README
+
+    Args:
+        project_root: 项目根目录
+        modules: 模块列表
+        files: 项目文件相对路径
+        file_stats: {相对路径: {"size": ..., "mtime_ns": ...}} (如 detect_changes 的 current_stats)，
+            缺失的文件按需 stat
+    """
+    file_stats = file_stats or {}
+    module_index = build_module_index(modules)
+    stats = {m['name']: ModuleStats() for m in modules}
+    for file in files:
+        if os.path.splitext(file)[1].lower() not in CODE_EXTENSIONS:
+            continue
+        name = module_of(file.replace(os.sep, '/'), module_index)
+        if name is None:
+            continue
+        full_path = os.path.join(project_root, file)
+        module_stats = stats[name]
+        module_stats.lines += count_lines(full_path)
+        file_stat = file_stats.get(file, {})
+        size, mtime_ns = file_stat.get('size'), file_stat.get('mtime_ns')
+        if size is None or mtime_ns is None:
+            try:
+                st = os.stat(full_path)
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+            except OSError:
+                size, mtime_ns = 0, 0
+        module_stats.bytes += size
+        module_stats.latest_mtime_ns = max(module_stats.latest_mtime_ns, mtime_ns)
+
+    for module in modules:
+        module_dir = Path(project_root) / module['path']
+        stats[module['name']].has_readme = any(module_dir.glob('[Rr][Ee][Aa][Dd][Mm][Ee]*'))
+    return stats
+
+
+def score_modules(modules: List[Dict[str, Any]], entry_points: List[str], docs: List[str],
+                  graph: Dict[str, Any], stats: Dict[str, ModuleStats],
+                  weights: Optional[Dict[str, float]] = None) -> List[ModulePriority]:
+    """
+    计算模块优先级并按分数降序排序
+
+    各维度先归一化到 [0, 1] 再乘以权重:
+    - entry_point: 包含入口文件为 1，被入口文件直接导入为 0.5
+    - dependency_count: 依赖该模块的其他模块数 / 最大值
+    - has_docs: 模块目录下有 README 或 find_documentation 找到的文档
+    - code_lines: log(行数) / log(最大行数)，避免单个巨型模块压倒其余维度
+    - recent_modified: 最近修改时间在所有模块中的相对位置
+
+    Args:
+        modules: 模块列表 (discover_modules 输出)
+        entry_points: 入口文件 (find_entry_points 输出)
+        docs: 现有文档 (find_documentation 输出)
+        graph: 导入图 (import_graph.load_import_graph 输出)
+        stats: collect_module_stats 的统计结果
+        weights: 维度权重，默认 DEFAULT_PRIORITY_WEIGHTS
+    """
+    weights = weights or DEFAULT_PRIORITY_WEIGHTS
+    module_index = build_module_index(modules)
+
+    dependents = {m['name']: 0 for m in modules}
+    for deps in module_dependencies(graph, modules).values():
+        for target in deps['internal']:
+            dependents[target] += 1
+
+    entry_scores: Dict[str, float] = {}
+    for entry in entry_points:
+        entry = entry.replace(os.sep, '/')
+        owner = module_of(entry, module_index)
+        if owner:
+            entry_scores[owner] = 1.0
+        for target in graph.get('files', {}).get(entry, {}).get('internal', []):
+            imported = module_of(target, module_index)
+            if imported:
+                entry_scores.setdefault(imported, ENTRY_IMPORT_FACTOR)
+
+    documented = {module_of(doc.replace(os.sep, '/'), module_index) for doc in docs}
+
+    max_dependents = max(dependents.values(), default=0)
+    max_lines = max((s.lines for s in stats.values()), default=0)
+    mtimes = [s.latest_mtime_ns for s in stats.values() if s.latest_mtime_ns]
+    oldest, newest = (min(mtimes), max(mtimes)) if mtimes else (0, 0)
+
+    ranking = []
+    for module in modules:
+        name = module['name']
+        module_stats = stats.get(name, ModuleStats())
+        factors = {
+            'entry_point': entry_scores.get(name, 0.0),
+            'dependency_count': dependents[name] / max_dependents if max_dependents else 0.0,
+            'has_docs': 1.0 if module_stats.has_readme or name in documented else 0.0,
+            'code_lines': (math.log1p(module_stats.lines) / math.log1p(max_lines)) if max_lines else 0.0,
+            'recent_modified': ((module_stats.latest_mtime_ns - oldest) / (newest - oldest)
+                                if newest > oldest and module_stats.latest_mtime_ns else 0.0),
+        }
+        score = sum(weights.get(key, 0) * value for key, value in factors.items())
+        ranking.append(ModulePriority(
+            name=name,
+            path=str(module['path']).replace(os.sep, '/'),
+            score=round(score, 3),
+            factors={key: round(value, 3) for key, value in factors.items()},
+            lines=module_stats.lines,
+            bytes=module_stats.bytes,
+            dependents=dependents[name],
+        ))
+
+    ranking.sort(key=lambda p: (-p.score, p.name))
+    return ranking
+
+
+def rank_project_modules(project_root: str, workers: Optional[int] = None) -> List[ModulePriority]:
+    """
+    分析项目并为模块排序
+
+    复用 analyze_project (模块、入口与文档)、detect_changes (文件列表与 stat)
+    与增量导入图，config.yaml 中 domain_hierarchy.skip_modules 列出的模块不参与排序。
+    """
+    settings = load_priority_settings(project_root)
+    structure = analyze_project(project_root)
+    modules = [m for m in structure['modules'] if m['name'] not in settings.skip_modules]
+
+    changes = detect_changes(project_root, track_symbols=False)
+    update_import_graph(project_root, changes['current_checksums'], structure['modules'], workers)
+    graph = load_import_graph(str(Path(project_root) / '.mini-wiki'))
+
+    stats = collect_module_stats(project_root, modules, changes['current_checksums'],
+                                 changes['current_stats'])
+    return score_modules(modules, structure['entry_points'], structure['docs_found'],
+                         graph, stats, settings.weights)
+
+
+def save_priority(wiki_dir: str, ranking: List[ModulePriority]) -> Dict[str, Any]:
+    """
+    将排序结果写入 progress
+
+    保留已完成模块，pending_modules 按优先级重新排列。
+    """
+    progress = cache_store.load_document(wiki_dir, 'progress') or {}
+    names = {p.name for p in ranking}
+    completed = [name for name in progress.get('completed_modules', []) if name in names]
+    progress.update({
+        'total_modules': len(ranking),
+        'completed_modules': completed,
+        'pending_modules': [p.name for p in ranking if p.name not in completed],
+        'module_priority': [p.to_dict() for p in ranking],
+        'last_updated': datetime.now(timezone.utc).isoformat(),
+    })
+    progress.setdefault('version', '2.0.0')
+    progress.setdefault('current_batch', 0)
+    cache_store.save_document(wiki_dir, 'progress', progress)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 模块优先级排序")
+    parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    parser.add_argument("--top", type=int, default=None, help="只显示前 N 个模块")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出排序结果")
+    parser.add_argument("--dry-run", action="store_true", help="只输出结果，不写入 progress")
+    parser.add_argument("--workers", type=int, default=None, help="导入解析进程数")
+    args = parser.parse_args()
+
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+    if not Path(wiki_dir).exists():
+        print("❌ 未找到 .mini-wiki 目录，请先运行: python scripts/init_wiki.py", file=sys.stderr)
+        return 1
+
+    ranking = rank_project_modules(args.project_path, args.workers)
+    if not args.dry_run:
+        save_priority(wiki_dir, ranking)
+
+    shown = ranking[:args.top] if args.top else ranking
+    if args.json:
+        print(json.dumps([p.to_dict() for p in shown], indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"📊 模块优先级 ({len(ranking)} 个模块):")
+    for i, p in enumerate(shown, 1):
+        print(f"  {i:>3}. {p.name:<24} {p.score:>6.2f}  ({p.lines} 行, 被 {p.dependents} 个模块依赖)")
+    if not args.dry_run:
+        print("\n✅ 已写入 progress (pending_modules 按优先级排列)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+路径匹配模块
+将排除规则编译为目录名集合与后缀索引，并解析 .gitignore / .mini-wikiignore，
+供遍历时在目录级别快速判断
+"""
+
+import fnmatch
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+# 项目级忽略文件 (gitignore 语法)，优先级高于 .gitignore
+MINI_WIKI_IGNORE_FILE = '.mini-wikiignore'
+
+
+class ExcludeMatcher:
+    """
+    编译后的排除规则
+
+    - 普通名称 (如 node_modules): 匹配任意层级的目录名或文件名
+    - 后缀模式 (如 *.min.js): 按最后一段扩展名建立索引，只比较同扩展名的后缀
+    - 其他通配模式 (如 test_*): 编译为一个正则匹配名称
+
+    支持 `name in matcher` 判断目录是否排除，可直接传给 walk_project。
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted(set(patterns))
+        self.names = set()
+        suffixes = []
+        globs = []
+        for pattern in self.patterns:
+            pattern = pattern.strip().rstrip('/')
+            if not pattern:
+                continue
+            if not any(c in pattern for c in '*?['):
+                self.names.add(pattern)
+            elif pattern.startswith('*') and not any(c in pattern[1:] for c in '*?['):
+                suffixes.append(pattern[1:])
+            else:
+                globs.append(fnmatch.translate(pattern))
+        self.suffixes = tuple(suffixes)
+        # 后缀索引: 最后一段扩展名 -> 以其结尾的后缀 ('' 收录不含 '.' 的后缀)
+        self._suffix_index: Dict[str, Tuple[str, ...]] = {}
+        for suffix in suffixes:
+            key = os.path.splitext('x' + suffix)[1]
+            self._suffix_index[key] = (*self._suffix_index.get(key, ()), suffix)
+        self._glob = re.compile('|'.join(globs)) if globs else None
+
+    def excludes_name(self, name: str) -> bool:
+        """名称 (目录名或文件名) 是否被排除"""
+        if name in self.names:
+            return True
+        if self._suffix_index:
+            candidates = self._suffix_index.get(os.path.splitext(name)[1])
+            if candidates and name.endswith(candidates):
+                return True
+            candidates = self._suffix_index.get('')
+            if candidates and name.endswith(candidates):
+                return True
+        return bool(self._glob and self._glob.match(name))
+
+    def excludes_dir(self, name: str) -> bool:
+        """目录是否被排除 (排除后不再进入)"""
+        return self.excludes_name(name)
+
+    def excludes_file(self, name: str) -> bool:
+        """文件是否被排除"""
+        return self.excludes_name(name)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.excludes_dir(name)
+
+
+@dataclass
+class IgnoreRule:
+    """单条 gitignore 规则"""
+    pattern: str
+    regex: Pattern[str]
+    negated: bool = False
+    dir_only: bool = False
+    # 不含 '/' 的模式只匹配名称，可出现在任意层级
+    basename_only: bool = True
+
+
+def translate_gitignore_glob(pattern: str) -> str:
+    """将 gitignore 通配模式转换为正则 (不含首尾锚点)"""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 2] == '**':
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = i + 2 == n or pattern[i + 2] == '/'
+                if at_start and at_end:
+                    if i + 2 == n:
+                        out.append('.*')          # 末尾 /**: 匹配其下所有内容
+                        i += 2
+                    else:
+                        out.append('(?:.*/)?')    # **/ : 匹配零或多级目录
+                        i += 3
+                    continue
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append(f'[{body}]')
+            i = end + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+
+def parse_ignore_lines(lines: Iterable[str]) -> List[IgnoreRule]:
+    """解析 gitignore 语法的规则行"""
+    rules = []
+    for raw in lines:
+        line = raw.rstrip('\n').rstrip('\r')
+        # 未转义的行尾空格会被忽略
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        if not line or line.startswith('#'):
+            continue
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        basename_only = '/' not in line
+        if line.startswith('/'):
+            line = line[1:]
+        regex = re.compile(f'^{translate_gitignore_glob(line)}$')
+        rules.append(IgnoreRule(line, regex, negated, dir_only, basename_only))
+    return rules
+
+
+class IgnoreFile:
+    """一个 .gitignore 文件中的规则集合，路径相对于其所在目录"""
+
+    def __init__(self, rules: List[IgnoreRule]):
+        self.rules = rules
+        # 合并正则用于快速排除完全不相关的路径
+        self._any = re.compile('|'.join(
+            f'(?:{r.regex.pattern[1:-1]})' for r in rules
+        )) if rules else None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional['IgnoreFile']:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                rules = parse_ignore_lines(f)
+        except OSError:
+            return None
+        return cls(rules) if rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        按 gitignore 语义匹配 (最后命中的规则生效)
+
+        Returns:
+            True 表示忽略，False 表示被否定规则重新包含，None 表示未命中
+        """
+        name = rel_path.rsplit('/', 1)[-1]
+        if self._any is not None and not (self._any.fullmatch(name) or self._any.fullmatch(rel_path)):
+            return None
+        result = None
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            target = name if rule.basename_only else rel_path
+            if rule.regex.match(target):
+                result = not rule.negated
+        return result
+
+
+class PathMatcher:
+    """
+    项目级路径匹配器
+
+    组合 ExcludeMatcher (配置与内置排除规则) 与各级 .gitignore、
+    项目根目录的 .mini-wikiignore。遍历时对目录调用 is_ignored 即可在
+    进入前剪枝；.gitignore 在首次访问对应目录时加载并缓存。
+    """
+
+    def __init__(self, project_root: Union[str, Path], excludes: ExcludeMatcher,
+                 use_gitignore: bool = True):
+        self.root = Path(project_root)
+        self.excludes = excludes
+        self.use_gitignore = use_gitignore
+        self._ignore_files: Dict[str, Optional[IgnoreFile]] = {}
+        self._project_rules = IgnoreFile.load(self.root / MINI_WIKI_IGNORE_FILE)
+
+    def _ignore_file(self, rel_dir: str) -> Optional[IgnoreFile]:
+        if rel_dir not in self._ignore_files:
+            self._ignore_files[rel_dir] = IgnoreFile.load(self.root / rel_dir / '.gitignore')
+        return self._ignore_files[rel_dir]
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        判断路径本身是否被忽略 (不检查祖先目录，遍历时祖先已被剪枝)
+
+        Args:
+            rel_path: 相对项目根目录的路径 (本地分隔符)
+            is_dir: 是否为目录
+        """
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        parts = rel_path.split('/')
+        if self.excludes.excludes_name(parts[-1]):
+            return True
+
+        result = None
+        if self.use_gitignore:
+            # 由浅到深应用各级 .gitignore，深层规则覆盖浅层规则
+            for depth in range(len(parts)):
+                ignore_file = self._ignore_file('/'.join(parts[:depth]))
+                if ignore_file is not None:
+                    matched = ignore_file.match('/'.join(parts[depth:]), is_dir)
+                    if matched is not None:
+                        result = matched
+        if self._project_rules is not None:
+            matched = self._project_rules.match(rel_path, is_dir)
+            if matched is not None:
+                result = matched
+        return bool(result)
+
+    def is_path_ignored(self, rel_path: str) -> bool:
+        """判断文件路径是否被忽略，包括任一祖先目录被忽略的情况"""
+        parts = rel_path.split(os.sep)
+        for depth in range(1, len(parts)):
+            if self.is_ignored(os.sep.join(parts[:depth]), True):
+                return True
+        return self.is_ignored(rel_path, False)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.excludes.excludes_dir(name)
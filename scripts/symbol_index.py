@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+符号索引脚本
+基于 DocEntry 记录构建持久化的跨文件符号索引 (.mini-wiki/cache/symbols.db)，
+回答 "符号 X 定义在哪里、由哪个 Wiki 页面记录"，支持精确与前缀查询
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cache_store
+
+# 提取与扫描相关的模块只在构建/更新索引时导入，保证 find 查询启动足够快
+
+# 符号索引文件名 (位于 .mini-wiki/cache 下)
+SYMBOLS_DB_NAME = 'symbols.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS symbols (
+    name TEXT NOT NULL,
+    short_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    file TEXT NOT NULL,
+    line INTEGER,
+    end_line INTEGER,
+    module TEXT,
+    page TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_short_name ON symbols(short_name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file);
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+'''
+
+_SELECT_SYMBOLS = 'SELECT name, kind, file, line, end_line, module, page, description FROM symbols'
+_INSERT_SYMBOL = '''
+INSERT INTO symbols (name, short_name, kind, file, line, end_line, module, page, description)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+@dataclass
+class SymbolLocation:
+    """符号位置"""
+    name: str
+    kind: str
+    file: str
+    line: int
+    end_line: int
+    module: Optional[str]
+    page: Optional[str]
+    description: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def get_index_path(wiki_dir: str) -> Path:
+    """获取符号索引文件路径"""
+    return cache_store.get_cache_dir(wiki_dir) / SYMBOLS_DB_NAME
+
+
+def connect(wiki_dir: str) -> sqlite3.Connection:
+    """打开符号索引 (不存在时创建)"""
+    index_path = get_index_path(wiki_dir)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(index_path), timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class PageResolver:
+    """
+    确定记录某个文件的 Wiki 页面
+
+    优先使用 checksums 中的文档映射，其次按模块名匹配 wiki/ 下的页面
+    (api/ 下的页面优先)。
+    """
+
+    def __init__(self, wiki_dir: str, doc_mapping: Dict[str, str]):
+        self.doc_mapping = doc_mapping
+        self.pages_by_stem: Dict[str, str] = {}
+        wiki_root = Path(wiki_dir) / 'wiki'
+        pages = sorted(wiki_root.rglob('*.md')) if wiki_root.exists() else []
+        for page in pages:
+            rel_page = page.relative_to(wiki_root).as_posix()
+            current = self.pages_by_stem.get(page.stem)
+            if current is None or (rel_page.startswith('api/') and not current.startswith('api/')):
+                self.pages_by_stem[page.stem] = rel_page
+
+    def resolve(self, file_path: str, module: Optional[str]) -> Optional[str]:
+        page = self.doc_mapping.get(file_path)
+        if page:
+            return page
+        return self.pages_by_stem.get(module) if module else None
+
+
+def _extract_task(task: Tuple[str, str, str, str]) -> List[Dict[str, Any]]:
+    from extract_docs import extract_file_records
+    project_root, rel_path, file_hash, wiki_dir = task
+    return extract_file_records(project_root, rel_path, file_hash, wiki_dir)
+
+
+def sync_index(project_root: str, checksums: Optional[Dict[str, str]] = None,
+               workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    按文件哈希增量同步符号索引
+
+    只重新提取哈希与索引记录不同的文件 (提取结果本身按内容哈希缓存)，
+    并删除已不存在的文件的符号。
+
+    Args:
+        project_root: 项目根目录
+        checksums: 当前文件校验和 {相对路径: 哈希} (如 detect_changes 的
+            current_checksums)，为空时读取 checksums 缓存
+        workers: 提取进程数，默认 CPU 核数
+
+    Returns:
+        {"updated": 重新索引的文件数, "removed": 删除的文件数, "symbols": 符号总数}
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from extract_docs import PARALLEL_MIN_FILES, SOURCE_EXTENSIONS
+    from import_graph import build_module_index, module_of
+
+    wiki_dir = str(Path(project_root) / '.mini-wiki')
+    cached = cache_store.load_checksums(wiki_dir)
+    if checksums is None:
+        checksums = {path: record.get('hash', '') for path, record in cached.items()}
+    # 索引中统一使用 POSIX 路径
+    current = {path.replace(os.sep, '/'): (path, file_hash)
+               for path, file_hash in checksums.items()
+               if os.path.splitext(path)[1].lower() in SOURCE_EXTENSIONS}
+
+    try:
+        structure = cache_store.load_document(wiki_dir, 'structure') or {}
+    except (OSError, ValueError):
+        structure = {}
+    module_index = build_module_index(structure.get('modules', []))
+    doc_mapping = {path.replace(os.sep, '/'): record.get('doc', '')
+                   for path, record in cached.items() if record.get('doc')}
+    pages = PageResolver(wiki_dir, doc_mapping)
+
+    with closing(connect(wiki_dir)) as conn:
+        indexed = dict(conn.execute('SELECT file, hash FROM files'))
+        to_update = [file for file, (_, file_hash) in sorted(current.items())
+                     if not file_hash or indexed.get(file) != file_hash]
+        to_remove = [file for file in indexed if file not in current]
+
+        tasks = [(project_root, current[file][0], current[file][1], wiki_dir) for file in to_update]
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+            results = [_extract_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_extract_task, tasks,
+                                            chunksize=max(1, len(tasks) // (workers * 8))))
+
+        rows = []
+        for file, records in zip(to_update, results):
+            module = module_of(file, module_index)
+            page = pages.resolve(file, module)
+            for record in records:
+                name = record['name']
+                rows.append((
+                    name, name.rsplit('.', 1)[-1], record['type'], file,
+                    record['line_number'], record.get('end_line') or record['line_number'],
+                    module, page, record.get('description', ''),
+                ))
+
+        with conn:
+            conn.executemany('DELETE FROM symbols WHERE file = ?', ((f,) for f in to_update + to_remove))
+            conn.executemany('DELETE FROM files WHERE file = ?', ((f,) for f in to_remove))
+            conn.executemany(_INSERT_SYMBOL, rows)
+            conn.executemany(
+                'INSERT INTO files (file, hash) VALUES (?, ?) '
+                'ON CONFLICT(file) DO UPDATE SET hash = excluded.hash',
+                ((file, current[file][1]) for file in to_update),
+            )
+        total = conn.execute('SELECT COUNT(*) FROM symbols').fetchone()[0]
+
+    return {'updated': len(to_update), 'removed': len(to_remove), 'symbols': total}
+
+
+def build_index(project_root: str, checksums: Optional[Dict[str, str]] = None,
+                workers: Optional[int] = None) -> Dict[str, int]:
+    """清空并重新构建符号索引 (模块或 Wiki 页面结构变化后使用)"""
+    index_path = get_index_path(str(Path(project_root) / '.mini-wiki'))
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'{index_path}{suffix}').unlink(missing_ok=True)
+    return sync_index(project_root, checksums, workers)
+
+
+def find_symbols(wiki_dir: str, query: str, prefix: bool = False,
+                 limit: Optional[int] = 50) -> List[SymbolLocation]:
+    """
+    查询符号
+
+    同时匹配限定名 (如 `Store.get`) 与最后一段名称 (如 `get`)。
+
+    Args:
+        wiki_dir: Wiki 目录
+        query: 符号名
+        prefix: 为 True 时按前缀匹配
+        limit: 最多返回的条数，None 表示不限制
+    """
+    if not get_index_path(wiki_dir).exists():
+        return []
+    if prefix:
+        # 范围查询可以走 B-tree 索引 (LIKE 默认不区分大小写，无法使用索引)
+        upper = query + '\U0010ffff'
+        where = '(name >= ? AND name < ?) OR (short_name >= ? AND short_name < ?)'
+        params: List[Any] = [query, upper, query, upper]
+    else:
+        where = 'name = ? OR short_name = ?'
+        params = [query, query]
+    sql = f'{_SELECT_SYMBOLS} WHERE {where} ORDER BY name, file, line'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+    with closing(sqlite3.connect(str(get_index_path(wiki_dir)), timeout=30)) as conn:
+        return [SymbolLocation(*row) for row in conn.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-Wiki 符号索引")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="重新构建符号索引")
+    build_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    build_parser.add_argument("--workers", type=int, default=None, help="提取进程数")
+
+    update_parser = subparsers.add_parser("update", help="按当前文件校验和增量更新符号索引")
+    update_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    update_parser.add_argument("--workers", type=int, default=None, help="提取进程数")
+
+    find_parser = subparsers.add_parser("find", help="查询符号")
+    find_parser.add_argument("query", help="符号名，如 Store.get 或 get")
+    find_parser.add_argument("project_path", nargs="?", default=os.getcwd(), help="项目根目录")
+    find_parser.add_argument("--prefix", action="store_true", help="按前缀匹配")
+    find_parser.add_argument("--limit", type=int, default=50, help="最多返回的条数")
+    find_parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+
+    args = parser.parse_args()
+    wiki_dir = str(Path(args.project_path) / ".mini-wiki")
+
+    if args.command == "find":
+        if not get_index_path(wiki_dir).exists():
+            print("❌ 未找到符号索引，请先运行: python scripts/symbol_index.py build", file=sys.stderr)
+            return 1
+        results = find_symbols(wiki_dir, args.query, prefix=args.prefix, limit=args.limit)
+        if args.json:
+            print(json.dumps([r.to_dict() for r in results], indent=2, ensure_ascii=False))
+            return 0 if results else 1
+        for r in results:
+            page = f" → {r.page}" if r.page else ""
+            module = f" [{r.module}]" if r.module else ""
+            print(f"{r.name} ({r.kind}) {r.file}:{r.line}{module}{page}")
+        if not results:
+            print(f"未找到符号: {args.query}", file=sys.stderr)
+        return 0 if results else 1
+
+    from detect_changes import detect_changes
+    checksums = detect_changes(args.project_path, track_symbols=False)["current_checksums"]
+    if args.command == "build":
+        counts = build_index(args.project_path, checksums, args.workers)
+    else:
+        counts = sync_index(args.project_path, checksums, args.workers)
+    print(f"✅ 符号索引: 更新 {counts['updated']} 个文件, 删除 {counts['removed']} 个文件, "
+          f"共 {counts['symbols']} 个符号 ({get_index_path(wiki_dir)})")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
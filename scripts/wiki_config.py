@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+配置加载模块
+读取 .mini-wiki/config.yaml，为扫描脚本提供排除规则、文件大小限制、
+模块优先级权重与批次规划参数
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import yaml
+
+from path_matcher import ExcludeMatcher
+
+# 渐进式扫描的模块优先级权重 (对应 config.yaml 中 domain_hierarchy.priority_weights)
+DEFAULT_PRIORITY_WEIGHTS = {
+    'entry_point': 5,
+    'dependency_count': 4,
+    'has_docs': 3,
+    'code_lines': 2,
+    'recent_modified': 1,
+}
+
+# 批次规划默认值 (对应 config.yaml 中 progressive.token_budget / max_batch_modules)
+DEFAULT_TOKEN_BUDGET = 80000
+DEFAULT_MAX_BATCH_MODULES = 8
+
+
+@dataclass
+class ScanSettings:
+    """扫描配置"""
+    matcher: ExcludeMatcher
+    max_file_size: Optional[int] = None
+
+
+@dataclass
+class PrioritySettings:
+    """模块优先级配置"""
+    weights: Dict[str, float]
+    skip_modules: List[str]
+
+
+@dataclass
+class BatchSettings:
+    """批次规划配置"""
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+    max_batch_modules: int = DEFAULT_MAX_BATCH_MODULES
+
+
+def get_config_path(project_root: str) -> Path:
+    """获取配置文件路径"""
+    return Path(project_root) / ".mini-wiki" / "config.yaml"
+
+
+def load_config(project_root: str) -> Dict[str, Any]:
+    """加载项目配置，文件不存在或格式错误时返回空字典"""
+    config_path = get_config_path(project_root)
+    if not config_path.exists():
+        return {}
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def load_scan_settings(project_root: str, default_excludes: Iterable[str],
+                       config: Optional[Dict[str, Any]] = None) -> ScanSettings:
+    """
+    读取扫描相关配置
+
+    Args:
+        project_root: 项目根目录
+        default_excludes: 脚本内置的排除规则，与配置中的 exclude 合并
+        config: 已加载的配置，为空时从 config.yaml 读取
+
+    Returns:
+        ScanSettings
+    """
+    if config is None:
+        config = load_config(project_root)
+
+    patterns = set(default_excludes)
+    exclude = config.get('exclude') or []
+    if isinstance(exclude, list):
+        patterns.update(str(p) for p in exclude if p)
+
+    max_file_size = None
+    generation = config.get('generation') or {}
+    if isinstance(generation, dict):
+        value = generation.get('max_file_size')
+        if isinstance(value, int) and value > 0:
+            max_file_size = value
+
+    return ScanSettings(matcher=ExcludeMatcher(patterns), max_file_size=max_file_size)
+
+
+def load_priority_settings(project_root: str,
+                           config: Optional[Dict[str, Any]] = None) -> PrioritySettings:
+    """
+    读取模块优先级配置
+
+    domain_hierarchy.priority_weights 中的数值覆盖默认权重，未知或非数值项被忽略。
+
+    Args:
+        project_root: 项目根目录
+        config: 已加载的配置，为空时从 config.yaml 读取
+    """
+    if config is None:
+        config = load_config(project_root)
+
+    weights: Dict[str, float] = dict(DEFAULT_PRIORITY_WEIGHTS)
+    skip_modules: List[str] = []
+    hierarchy = config.get('domain_hierarchy') or {}
+    if isinstance(hierarchy, dict):
+        overrides = hierarchy.get('priority_weights') or {}
+        if isinstance(overrides, dict):
+            for key, value in overrides.items():
+                if key in weights and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    weights[key] = value
+        skip = hierarchy.get('skip_modules') or []
+        if isinstance(skip, list):
+            skip_modules = [str(name) for name in skip if name]
+
+    return PrioritySettings(weights=weights, skip_modules=skip_modules)
+
+
+def load_batch_settings(project_root: str,
+                        config: Optional[Dict[str, Any]] = None) -> BatchSettings:
+    """
+    读取批次规划配置 (progressive.token_budget / progressive.max_batch_modules)
+
+    Args:
+        project_root: 项目根目录
+        config: 已加载的配置，为空时从 config.yaml 读取
+    """
+    if config is None:
+        config = load_config(project_root)
+
+    settings = BatchSettings()
+    progressive = config.get('progressive') or {}
+    if isinstance(progressive, dict):
+        budget = progressive.get('token_budget')
+        if isinstance(budget, int) and budget > 0:
+            settings.token_budget = budget
+        max_modules = progressive.get('max_batch_modules')
+        if isinstance(max_modules, int) and max_modules > 0:
+            settings.max_batch_modules = max_modules
+    return settings
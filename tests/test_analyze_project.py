@@ -272,3 +272,20 @@ def test_analyze_project_empty(tmp_path):
     result = analyze_project(str(tmp_path), save_to_cache=False)
     assert result["stats"]["total_files"] == 0
     assert result["modules"] == []
+
+
+def test_analyze_project_honours_config(tmp_path):
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "api.py").write_text("x = 1")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("pass")
+    (tmp_path / "src" / "huge.py").write_text("x = 1\n" * 100)
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / ".mini-wiki" / "config.yaml").write_text(
+        "generation:\n  max_file_size: 100\nexclude:\n  - generated\n"
+    )
+
+    result = analyze_project(str(tmp_path), save_to_cache=False)
+
+    assert result["stats"]["total_files"] == 1
+    assert [m["name"] for m in result["modules"]] == ["src"]
@@ -0,0 +1,98 @@
+"""Tests for scripts/batch_planner.py."""
+
+import cache_store
+from batch_planner import (
+    ModuleCost,
+    complete_batch,
+    estimate_tokens,
+    next_batch,
+    plan_batches,
+    plan_project,
+    save_plan,
+)
+from wiki_config import load_batch_settings
+
+
+def _cost(name, tokens):
+    return ModuleCost(name=name, bytes=0, lines=0, symbols=0, tokens=tokens)
+
+
+def test_estimate_tokens():
+    # 小模块按最少 100 行文档估算
+    assert estimate_tokens(400, 50, 0) == 100 + 100 * 12
+    assert estimate_tokens(40000, 2000, 10) == 10000 + 600 * 12 + 10 * 80
+
+
+def test_plan_batches_fills_earlier_batches_in_priority_order():
+    costs = [_cost("a", 60), _cost("b", 50), _cost("c", 30), _cost("d", 40), _cost("e", 10)]
+
+    batches = plan_batches(costs, token_budget=100, max_batch_modules=8)
+
+    assert [b.modules for b in batches] == [["a", "c", "e"], ["b", "d"]]
+    assert [b.estimated_tokens for b in batches] == [100, 90]
+
+
+def test_plan_batches_oversized_and_module_limit():
+    costs = [_cost("huge", 500), _cost("a", 10), _cost("b", 10), _cost("c", 10)]
+
+    batches = plan_batches(costs, token_budget=100, max_batch_modules=2)
+
+    assert [b.modules for b in batches] == [["huge"], ["a", "b"], ["c"]]
+    assert batches[0].oversized
+    assert not batches[1].oversized
+
+
+def test_load_batch_settings(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / ".mini-wiki" / "config.yaml").write_text(
+        "progressive:\n  token_budget: 20000\n  max_batch_modules: 0\n", encoding="utf-8")
+
+    settings = load_batch_settings(str(tmp_path))
+
+    assert settings.token_budget == 20000
+    assert settings.max_batch_modules == 8
+
+
+def test_complete_batch_advances_cursor(tmp_path):
+    wiki_dir = str(tmp_path)
+    cache_store.save_document(wiki_dir, "progress", {"completed_modules": [],
+                                                     "pending_modules": ["a", "b", "c"]})
+    batches = plan_batches([_cost("a", 60), _cost("b", 60), _cost("c", 30)], token_budget=100)
+    save_plan(wiki_dir, batches, [], 100)
+
+    assert complete_batch(wiki_dir)["modules"] == ["a", "c"]
+    progress = cache_store.load_document(wiki_dir, "progress")
+    assert progress["current_batch"] == 1
+    assert progress["completed_modules"] == ["a", "c"]
+    assert progress["pending_modules"] == ["b"]
+    assert next_batch(progress)["modules"] == ["b"]
+
+    complete_batch(wiki_dir)
+    assert complete_batch(wiki_dir) is None
+    assert next_batch(cache_store.load_document(wiki_dir, "progress")) is None
+
+
+def test_plan_project(tmp_path):
+    files = {
+        "src/core/store.py": '"""Store."""\n\n\ndef get():\n    """Get."""\n' + "x = 1\n" * 400,
+        "src/ui/button.ts": "/** Render. */\nexport function render() {}\n",
+        "src/utils/text.py": "def slug(s):\n    return s\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    wiki_dir = tmp_path / ".mini-wiki"
+    wiki_dir.mkdir()
+    cache_store.save_document(str(wiki_dir), "progress", {"completed_modules": ["utils"]})
+
+    progress = plan_project(str(tmp_path), token_budget=3000, workers=1)
+
+    plan = progress["batch_plan"]
+    assert progress["current_batch"] == 0
+    assert plan["token_budget"] == 3000
+    assert set(plan["module_costs"]) == {"core", "ui"}
+    assert plan["module_costs"]["core"]["symbols"] == 1
+    assert plan["module_costs"]["core"]["lines"] == 405
+    assert [b["modules"] for b in plan["batches"]] == [["core"], ["ui"]]
+    assert cache_store.load_document(str(wiki_dir), "progress") == progress
@@ -0,0 +1,59 @@
+"""Tests for benchmarks/ (synthetic repository generator and harness)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from run_benchmarks import BENCHMARKS, compare_results, run_benchmarks
+from synthetic_repo import generate_repo
+
+
+def test_generate_repo_is_deterministic(tmp_path):
+    info_a = generate_repo(tmp_path / "a", 40, seed=1)
+    info_b = generate_repo(tmp_path / "b", 40, seed=1)
+
+    files_a = sorted(p.relative_to(tmp_path / "a") for p in (tmp_path / "a").rglob("*") if p.is_file())
+    files_b = sorted(p.relative_to(tmp_path / "b") for p in (tmp_path / "b").rglob("*") if p.is_file())
+
+    assert info_a == info_b
+    assert files_a == files_b
+    assert info_a["files"] == 40
+    assert (tmp_path / "a" / ".mini-wiki" / "wiki" / "index.md").exists()
+
+
+def test_run_benchmarks_in_process(tmp_path):
+    root = tmp_path / "repo"
+    generate_repo(root, 30)
+
+    data = run_benchmarks(root, isolate=False, log=lambda _: None)
+
+    assert set(data["results"]) == set(BENCHMARKS)
+    assert data["results"]["analyze_project"]["files"] == 30
+    assert data["results"]["extract_docs"]["files"] == 30
+    assert all(r["wall_seconds"] >= 0 for r in data["results"].values())
+
+
+def test_run_benchmarks_restores_existing_cache(tmp_path):
+    root = tmp_path / "repo"
+    generate_repo(root, 10)
+    cache_dir = root / ".mini-wiki" / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / "checksums.json").write_text('{"keep": "me"}', encoding="utf-8")
+    before = sorted(p.relative_to(root) for p in (root / ".mini-wiki").rglob("*"))
+
+    run_benchmarks(root, ["detect_changes_warm"], isolate=False, log=lambda _: None)
+
+    assert sorted(p.relative_to(root) for p in (root / ".mini-wiki").rglob("*")) == before
+    assert (cache_dir / "checksums.json").read_text(encoding="utf-8") == '{"keep": "me"}'
+
+
+def test_compare_results_flags_regression():
+    baseline = {"results": {"a": {"wall_seconds": 1.0}, "b": {"wall_seconds": 1.0}}}
+    current = {"results": {"a": {"wall_seconds": 1.1}, "b": {"wall_seconds": 1.5}, "c": {"wall_seconds": 9.0}}}
+
+    rows = {row["name"]: row for row in compare_results(current, baseline, threshold=0.2)}
+
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
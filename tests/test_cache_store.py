@@ -0,0 +1,194 @@
+"""Tests for scripts/cache_store.py."""
+
+import json
+
+import pytest
+
+import cache_store
+from cache_store import (
+    evict_cached_docs,
+    find_paths_by_hash,
+    get_checksums,
+    load_cached_docs,
+    load_checksums,
+    load_document,
+    migrate_json_cache,
+    save_cached_docs,
+    save_checksums,
+    save_document,
+    upsert_checksums,
+    uses_sqlite,
+)
+from detect_changes import detect_changes, update_checksums_cache
+
+RECORDS = {
+    "src/a.py": {"hash": "aaaa", "doc": "wiki/a.md", "updated_at": "t1", "size": 10,
+                 "mtime_ns": 123, "inode": 7},
+    "src/b.py": {"hash": "bbbb", "doc": "", "updated_at": "t1", "blob": "deadbeef"},
+}
+
+
+@pytest.fixture
+def wiki_dir(tmp_path):
+    wiki = tmp_path / ".mini-wiki"
+    (wiki / "cache").mkdir(parents=True)
+    return str(wiki)
+
+
+@pytest.fixture
+def sqlite_wiki(wiki_dir):
+    migrate_json_cache(wiki_dir)
+    return wiki_dir
+
+
+def test_json_backend_is_default(wiki_dir):
+    save_checksums(wiki_dir, RECORDS)
+
+    assert uses_sqlite(wiki_dir) is False
+    assert load_checksums(wiki_dir) == RECORDS
+
+
+def test_migrate_imports_json_files(wiki_dir, tmp_path):
+    cache_dir = tmp_path / ".mini-wiki" / "cache"
+    (cache_dir / "checksums.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+    (cache_dir / "structure.json").write_text(json.dumps({"modules": []}), encoding="utf-8")
+
+    counts = migrate_json_cache(wiki_dir)
+
+    assert counts == {"checksums": 2, "documents": 1}
+    assert uses_sqlite(wiki_dir) is True
+    assert not (cache_dir / "checksums.json").exists()
+    assert (cache_dir / "checksums.json.migrated").exists()
+    assert load_checksums(wiki_dir) == RECORDS
+    assert load_document(wiki_dir, "structure") == {"modules": []}
+
+
+def test_sqlite_uses_wal(sqlite_wiki):
+    conn = cache_store.connect(sqlite_wiki)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_sqlite_schema_is_set_up_once(sqlite_wiki):
+    conn = cache_store.connect(sqlite_wiki)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == cache_store.SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+def test_sqlite_save_replaces_records(sqlite_wiki):
+    save_checksums(sqlite_wiki, RECORDS)
+    save_checksums(sqlite_wiki, {"src/c.py": {"hash": "cccc", "doc": ""}})
+
+    assert load_checksums(sqlite_wiki) == {"src/c.py": {"hash": "cccc", "doc": ""}}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_indexed_lookups(wiki_dir, backend):
+    if backend == "sqlite":
+        migrate_json_cache(wiki_dir)
+    save_checksums(wiki_dir, RECORDS)
+
+    assert get_checksums(wiki_dir, ["src/b.py", "missing.py"]) == {"src/b.py": RECORDS["src/b.py"]}
+    assert find_paths_by_hash(wiki_dir, "aaaa") == ["src/a.py"]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_upsert_checksums(wiki_dir, backend):
+    if backend == "sqlite":
+        migrate_json_cache(wiki_dir)
+    save_checksums(wiki_dir, RECORDS)
+
+    upsert_checksums(wiki_dir, {"src/a.py": {"hash": "a2a2", "doc": "wiki/a.md"}})
+
+    records = load_checksums(wiki_dir)
+    assert records["src/a.py"] == {"hash": "a2a2", "doc": "wiki/a.md"}
+    assert records["src/b.py"] == RECORDS["src/b.py"]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_documents_roundtrip(wiki_dir, backend):
+    if backend == "sqlite":
+        migrate_json_cache(wiki_dir)
+
+    assert load_document(wiki_dir, "progress") is None
+    save_document(wiki_dir, "progress", {"current_batch": 2})
+    assert load_document(wiki_dir, "progress") == {"current_batch": 2}
+
+
+def test_detect_changes_with_sqlite_backend(tmp_path, sqlite_wiki):
+    (tmp_path / "app.py").write_text("a = 1\n", encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"])
+
+    (tmp_path / "app.py").write_text("a = 2\n", encoding="utf-8")
+    second = detect_changes(str(tmp_path))
+
+    assert second["modified"] == ["app.py"]
+    assert not (tmp_path / ".mini-wiki" / "cache" / "checksums.json").exists()
+
+
+def test_update_checksums_skips_unchanged_rows(tmp_path, sqlite_wiki):
+    (tmp_path / "app.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "util.py").write_text("b = 1\n", encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"], file_stats=first["current_stats"])
+    before = load_checksums(sqlite_wiki)
+
+    conn = cache_store.connect(sqlite_wiki)
+    try:
+        # 记录被重写的行
+        conn.executescript(
+            "CREATE TABLE writes (path TEXT);"
+            "CREATE TRIGGER log_writes AFTER UPDATE ON checksums BEGIN INSERT INTO writes VALUES (new.path); END;"
+        )
+    finally:
+        conn.close()
+    (tmp_path / "util.py").write_text("b = 2\n", encoding="utf-8")
+    second = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), second["current_checksums"], file_stats=second["current_stats"])
+
+    conn = cache_store.connect(sqlite_wiki)
+    try:
+        assert [row[0] for row in conn.execute("SELECT path FROM writes")] == ["util.py"]
+    finally:
+        conn.close()
+    assert load_checksums(sqlite_wiki)["app.py"]["updated_at"] == before["app.py"]["updated_at"]
+
+
+def test_cached_docs_roundtrip(wiki_dir):
+    records = [{"name": "add", "type": "function"}]
+
+    assert load_cached_docs(wiki_dir, 1, "abcd-py") is None
+    save_cached_docs(wiki_dir, 1, "abcd-py", records)
+
+    assert load_cached_docs(wiki_dir, 1, "abcd-py") == records
+    assert load_cached_docs(wiki_dir, 2, "abcd-py") is None
+
+
+def test_evict_cached_docs(wiki_dir):
+    save_cached_docs(wiki_dir, 1, "live-py", [])
+    save_cached_docs(wiki_dir, 1, "dead-js", [])
+    save_cached_docs(wiki_dir, 0, "live-py", [])
+
+    assert evict_cached_docs(wiki_dir, {"live"}, keep_version=1) == 2
+
+    assert load_cached_docs(wiki_dir, 1, "live-py") == []
+    assert load_cached_docs(wiki_dir, 1, "dead-js") is None
+    assert load_cached_docs(wiki_dir, 0, "live-py") is None
+
+
+def test_update_checksums_evicts_stale_docs(tmp_path, wiki_dir):
+    (tmp_path / "app.py").write_text("a = 1\n", encoding="utf-8")
+    changes = detect_changes(str(tmp_path))
+    live_hash = changes["current_checksums"]["app.py"]
+    save_cached_docs(wiki_dir, 1, f"{live_hash}-py", [])
+    save_cached_docs(wiki_dir, 1, "0123456789abcdef-py", [])
+
+    update_checksums_cache(str(tmp_path), changes["current_checksums"])
+
+    assert load_cached_docs(wiki_dir, 1, f"{live_hash}-py") == []
+    assert load_cached_docs(wiki_dir, 1, "0123456789abcdef-py") is None
@@ -0,0 +1,270 @@
+"""Tests for scripts/call_graph.py."""
+
+import pytest
+
+from call_graph import (
+    MODULE_SCOPE,
+    call_flow,
+    extract_js_calls,
+    extract_python_calls,
+    load_call_graph,
+    load_call_flow,
+    trace_calls,
+    update_call_graph,
+)
+import cache_store
+
+MODULES = [
+    {"name": "core", "path": "src/core"},
+    {"name": "ui", "path": "src/ui"},
+]
+
+
+# --- extraction ---
+
+
+def test_extract_python_calls():
+    content = (
+        "from .store import Store\n"
+        "import core.utils as u\n"
+        "def main():\n"
+        "    s = Store()\n"
+        "    u.fmt(1)\n"
+        "    def inner():\n"
+        "        helper()\n"
+        "class Store:\n"
+        "    def __init__(self):\n"
+        "        self.load()\n"
+        "if __name__ == '__main__':\n"
+        "    main()\n"
+    )
+
+    result = extract_python_calls(content)
+
+    assert [d[0] for d in result["defs"]] == ["main", "Store", "Store.__init__"]
+    assert result["imports"] == {"Store": ".store.Store", "u": "core.utils"}
+    assert [c[:2] for c in result["calls"]] == [
+        ["main", "Store"],
+        ["main", "u.fmt"],
+        ["main", "helper"],
+        ["Store.__init__", "self.load"],
+        [MODULE_SCOPE, "main"],
+    ]
+
+
+def test_extract_js_calls():
+    content = (
+        "import Store from './store';\n"
+        "import * as api from './api';\n"
+        "import { format as fmt } from './util';\n"
+        "export function main(a: number): void {\n"
+        "  const s = new Store<T>(a);\n"
+        "  if (a) { api.fetch(fmt(a)); }\n"
+        "}\n"
+        "const helper = async (x) => {\n"
+        "  return x;\n"
+        "};\n"
+        "export class Service {\n"
+        "  handler = (e) => { this.run(e) }\n"
+        "  async run(e: Event): Promise<void> { helper(e); }\n"
+        "}\n"
+        "const obj = { method(a) { inner(a) } };\n"
+        "main(1);\n"
+    )
+
+    result = extract_js_calls(content)
+
+    assert [d[0] for d in result["defs"]] == ["main", "helper", "Service", "Service.handler", "Service.run", "obj.method"]
+    assert result["imports"] == {"Store": "./store#default", "api": "./api", "fmt": "./util#format"}
+    assert [c[:2] for c in result["calls"]] == [
+        ["main", "Store"],
+        ["main", "api.fetch"],
+        ["main", "fmt"],
+        ["Service.handler", "this.run"],
+        ["Service.run", "helper"],
+        ["obj.method", "inner"],
+        [MODULE_SCOPE, "main"],
+    ]
+
+
+def test_extract_js_calls_object_literal_methods():
+    content = (
+        "const obj = { m() { this.n() }, n() {} };\n"
+        "register({ m() { go() } });\n"
+        "function run() { return { m() {} } }\n"
+    )
+
+    result = extract_js_calls(content)
+
+    # 只有顶层变量的对象字面量方法登记为定义，且以变量名限定
+    assert [d[0] for d in result["defs"]] == ["obj.m", "obj.n", "run"]
+    assert [c[:2] for c in result["calls"]] == [
+        ["obj.m", "this.n"],
+        [MODULE_SCOPE, "register"],
+        [MODULE_SCOPE, "go"],
+    ]
+
+
+# --- resolution and tracing ---
+
+
+@pytest.fixture
+def project(tmp_path):
+    files = {
+        "main.py": (
+            "from core.service import Service\n"
+            "from core import utils\n"
+            "def main():\n"
+            "    Service().run()\n"
+            "    utils.log('done')\n"
+            "main()\n"
+        ),
+        "src/core/__init__.py": "",
+        "src/core/service.py": (
+            "from .utils import log\n"
+            "class Service:\n"
+            "    def __init__(self):\n"
+            "        self.ready = False\n"
+            "    def run(self):\n"
+            "        log('run')\n"
+            "        self.stop()\n"
+            "    def stop(self):\n"
+            "        print('stop')\n"
+        ),
+        "src/core/utils.py": "def log(msg):\n    print(msg)\n",
+        "src/ui/app.ts": (
+            "import { render } from './view';\n"
+            "export function start() { render(); }\n"
+        ),
+        "src/ui/view.ts": "export function render() { paint(); }\nfunction paint() {}\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    (tmp_path / ".mini-wiki").mkdir()
+    return tmp_path
+
+
+def _checksums(root, **overrides):
+    checksums = {
+        p.relative_to(root).as_posix(): "h0"
+        for p in root.rglob("*") if p.is_file() and ".mini-wiki" not in p.parts
+    }
+    checksums.update(overrides)
+    return checksums
+
+
+def test_update_call_graph_resolves_edges(project):
+    counts = update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+    files = load_call_graph(str(project / ".mini-wiki"))["files"]
+
+    assert counts["updated"] == 6
+    assert files["main.py"]["edges"] == [
+        ["main", "src/core/service.py", "Service.__init__"],
+        ["main", "src/core/service.py", "Service.run"],
+        ["main", "src/core/utils.py", "log"],
+        [MODULE_SCOPE, "main.py", "main"],
+    ]
+    assert files["src/core/service.py"]["edges"] == [
+        ["Service.run", "src/core/utils.py", "log"],
+        ["Service.run", "src/core/service.py", "Service.stop"],
+    ]
+    assert files["src/ui/app.ts"]["edges"] == [["start", "src/ui/view.ts", "render"]]
+    assert files["src/ui/view.ts"]["edges"] == [["render", "src/ui/view.ts", "paint"]]
+
+
+def test_update_call_graph_skips_external_and_builtin_receivers(project):
+    (project / "src/core/store.py").write_text(
+        "class Store:\n"
+        "    def join(self, other):\n        pass\n"
+        "    def append(self, item):\n        pass\n"
+        "    def flush(self):\n        pass\n",
+        encoding="utf-8",
+    )
+    (project / "tool.py").write_text(
+        "import os\n"
+        "def run(items, store):\n"
+        "    os.path.join('a', 'b')\n"
+        "    items.append(1)\n"
+        "    store.flush()\n",
+        encoding="utf-8",
+    )
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+
+    edges = load_call_graph(str(project / ".mini-wiki"))["files"]["tool.py"]["edges"]
+    assert edges == [["run", "src/core/store.py", "Store.flush"]]
+
+
+def test_update_call_graph_does_not_resolve_bare_calls_to_object_methods(project):
+    (project / "src/ui/handlers.ts").write_text(
+        "export const handlers = { paint() {} };\n"
+        "register({ clear() {} });\n",
+        encoding="utf-8",
+    )
+    (project / "src/ui/main.ts").write_text(
+        "import { handlers } from './handlers';\n"
+        "export function boot() { paint(); clear(); handlers.paint(); }\n",
+        encoding="utf-8",
+    )
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+
+    edges = load_call_graph(str(project / ".mini-wiki"))["files"]["src/ui/main.ts"]["edges"]
+    assert edges == [["boot", "src/ui/handlers.ts", "handlers.paint"]]
+
+
+def test_update_call_graph_is_incremental(project):
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+    assert update_call_graph(str(project), _checksums(project), MODULES, workers=1)["updated"] == 0
+
+    # 被调用方改名后，未修改的调用方的边也随之更新
+    (project / "src/ui/view.ts").write_text("export function draw() {}\n", encoding="utf-8")
+    counts = update_call_graph(str(project), _checksums(project, **{"src/ui/view.ts": "h1"}), MODULES, workers=1)
+
+    files = load_call_graph(str(project / ".mini-wiki"))["files"]
+    assert counts["updated"] == 1
+    assert files["src/ui/app.ts"]["edges"] == []
+
+
+def test_trace_calls_respects_budget(project):
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+    graph = load_call_graph(str(project / ".mini-wiki"))
+
+    steps = trace_calls(graph, ["main.py"])
+    assert [(s.caller, s.callee, s.depth) for s in steps] == [
+        (MODULE_SCOPE, "main", 1),
+        ("main", "Service.__init__", 2),
+        ("main", "Service.run", 2),
+        ("Service.run", "log", 3),
+        ("Service.run", "Service.stop", 3),
+        ("main", "log", 2),
+    ]
+
+    assert len(trace_calls(graph, ["main.py"], max_depth=1)) == 1
+    assert [s.callee for s in trace_calls(graph, ["main.py"], max_breadth=1)] == ["main", "Service.__init__"]
+    assert len(trace_calls(graph, ["main.py"], max_calls=3)) == 3
+
+
+def test_trace_calls_starts_from_definitions_without_module_calls(project):
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+    steps = trace_calls(load_call_graph(str(project / ".mini-wiki")), ["src/ui/app.ts"])
+
+    assert [(s.caller, s.callee) for s in steps] == [("start", "render"), ("render", "paint")]
+
+
+def test_call_flow_and_load_call_flow(project):
+    wiki_dir = str(project / ".mini-wiki")
+    cache_store.save_document(wiki_dir, "structure", {"modules": MODULES, "entry_points": ["main.py"]})
+    assert load_call_flow(wiki_dir) == []
+
+    update_call_graph(str(project), _checksums(project), MODULES, workers=1)
+    flow = load_call_flow(wiki_dir, max_depth=2)
+
+    assert flow == [
+        (None, None, "main()"),
+        (None, "core", "Service.__init__()"),
+        (None, "core", "Service.run()"),
+        (None, "core", "log()"),
+    ]
+    steps = trace_calls(load_call_graph(wiki_dir), ["src/ui/app.ts"])
+    assert call_flow(steps, ["src/ui/app.ts"], MODULES)[1] == ("ui", "ui", "paint()")
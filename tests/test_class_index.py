@@ -0,0 +1,208 @@
+"""Tests for scripts/class_index.py."""
+
+import pytest
+
+from class_index import (
+    extract_python_classes,
+    extract_ts_classes,
+    generate_module_class_diagrams,
+    load_class_index,
+    module_classes,
+    update_class_index,
+)
+from diagram_cache import DiagramCache
+
+MODULES = [
+    {"name": "core", "path": "src/core"},
+    {"name": "ui", "path": "src/ui"},
+]
+
+
+def _by_name(classes):
+    return {c["name"]: c for c in classes}
+
+
+# --- Python ---
+
+
+def test_extract_python_classes_fields_methods_and_bases():
+    content = (
+        "class Store(base.Base, Generic[T]):\n"
+        "    name: str = 'x'\n"
+        "    LIMIT = 3\n"
+        "    def __init__(self, db: 'Db'):\n"
+        "        self.db = db\n"
+        "        self._cache = Cache()\n"
+        "    @property\n"
+        "    def size(self) -> int:\n"
+        "        return 1\n"
+        "    def _load(self):\n"
+        "        pass\n"
+        "    def __repr__(self):\n"
+        "        return ''\n"
+        "    class Inner:\n"
+        "        def run(self):\n"
+        "            pass\n"
+    )
+
+    classes = _by_name(extract_python_classes(content))
+    store = classes["Store"]
+
+    assert store["bases"] == ["Base"]
+    assert {f["name"]: (f["type"], f["visibility"]) for f in store["fields"]} == {
+        "name": ("str", "+"),
+        "db": ("Db", "+"),
+        "_cache": ("Cache", "-"),
+        "size": ("int", "+"),
+    }
+    assert [m["name"] for m in store["methods"]] == ["__init__", "_load"]
+    assert classes["Store.Inner"]["methods"] == [{"name": "run", "visibility": "+"}]
+
+
+def test_extract_python_classes_syntax_error():
+    assert extract_python_classes("class Broken(:\n") == []
+
+
+# --- TS ---
+
+
+def test_extract_ts_class_members():
+    content = (
+        "export abstract class Service<T> extends core.Base<T> implements IFoo {\n"
+        "  private readonly repo: Repository<User>;\n"
+        "  private readonly cache: Store = new Store();\n"
+        "  protected count = 0\n"
+        "  static logger = new Logger()\n"
+        "  handler = (e: Event) => { this.run() }\n"
+        "  constructor(private store: Store, plain: number) { super(); }\n"
+        "  async load(id: string): Promise<User[]> { return [] }\n"
+        "}\n"
+    )
+
+    service = extract_ts_classes(content)[0]
+
+    assert service["name"] == "Service"
+    assert service["bases"] == ["Base"]
+    assert service["implements"] == ["IFoo"]
+    assert {f["name"]: (f["type"], f["visibility"]) for f in service["fields"]} == {
+        "repo": ("Repository<User>", "-"),
+        "cache": ("Store", "-"),
+        "count": ("", "#"),
+        "logger": ("Logger", "+"),
+        "store": ("Store", "-"),
+    }
+    assert [m["name"] for m in service["methods"]] == ["handler", "load"]
+
+
+def test_extract_ts_anonymous_default_class():
+    content = (
+        "export default class extends React.Component {\n"
+        "  render() { return null }\n"
+        "}\n"
+        "const Mixin = class {}\n"
+    )
+
+    classes = extract_ts_classes(content)
+
+    assert [c["name"] for c in classes] == ["default"]
+    assert classes[0]["bases"] == ["Component"]
+    assert [m["name"] for m in classes[0]["methods"]] == ["render"]
+
+
+def test_extract_ts_interface_and_ignores_member_access():
+    content = (
+        "interface Shape extends A, B {\n"
+        "  area(): number;\n"
+        "  readonly sides: number\n"
+        "}\n"
+        "const kind = obj.class;\n"
+    )
+
+    classes = extract_ts_classes(content)
+
+    assert len(classes) == 1
+    assert classes[0]["kind"] == "interface"
+    assert classes[0]["bases"] == ["A", "B"]
+    assert classes[0]["line"] == 1
+    assert [f["name"] for f in classes[0]["fields"]] == ["sides"]
+
+
+# --- index ---
+
+
+@pytest.fixture
+def project(tmp_path):
+    files = {
+        "src/core/store.py": "class Cache:\n    pass\n\nclass Store(Cache):\n    def __init__(self):\n        self.cache = Cache()\n",
+        "src/ui/view.ts": "export class View extends Widget {\n  store: Store;\n  render() {}\n}\n",
+        "src/ui/util.ts": "export const x = 1;\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    (tmp_path / ".mini-wiki").mkdir()
+    return tmp_path
+
+
+def _checksums(**overrides):
+    checksums = {"src/core/store.py": "h0", "src/ui/view.ts": "h0", "src/ui/util.ts": "h0"}
+    checksums.update(overrides)
+    return checksums
+
+
+def test_update_class_index_is_incremental(project):
+    assert update_class_index(str(project), _checksums(), workers=1) == {"updated": 3, "removed": 0, "classes": 3}
+    assert update_class_index(str(project), _checksums(), workers=1)["updated"] == 0
+
+    (project / "src/ui/view.ts").write_text("export class View {}\nexport class Panel {}\n", encoding="utf-8")
+    checksums = _checksums(**{"src/ui/view.ts": "h1"})
+    del checksums["src/ui/util.ts"]
+
+    assert update_class_index(str(project), checksums, workers=1) == {"updated": 1, "removed": 1, "classes": 4}
+    index = load_class_index(str(project / ".mini-wiki"))
+    assert sorted(index["files"]) == ["src/core/store.py", "src/ui/view.ts"]
+
+
+def test_module_classes_resolves_composition(project):
+    update_class_index(str(project), _checksums(), workers=1)
+    classes = module_classes(load_class_index(str(project / ".mini-wiki")), MODULES)
+
+    core = _by_name(classes["core"])
+    view = _by_name(classes["ui"])["View"]
+    assert core["Store"]["bases"] == ["Cache"]
+    assert core["Store"]["composes"] == ["Cache"]
+    assert view["composes"] == ["Store"]
+    assert view["properties"] == ["+store: Store"]
+    assert view["methods"] == ["+render"]
+
+
+def test_generate_module_class_diagrams(project):
+    update_class_index(str(project), _checksums(), workers=1)
+    diagrams = generate_module_class_diagrams(load_class_index(str(project / ".mini-wiki")), MODULES,
+                                              max_classes=1)
+
+    assert set(diagrams) == {"core", "ui"}
+    assert diagrams["core"].count("```mermaid") == 2
+    assert "Cache <|-- Store" in diagrams["core"]
+    assert "Widget <|-- View" in diagrams["ui"]
+    assert "View *-- Store" in diagrams["ui"]
+
+
+def test_generate_module_class_diagrams_uses_cache(project):
+    wiki_dir = str(project / ".mini-wiki")
+    update_class_index(str(project), _checksums(), workers=1)
+    index = load_class_index(wiki_dir)
+    first = DiagramCache(wiki_dir, version=1)
+    expected = generate_module_class_diagrams(index, MODULES, cache=first)
+
+    # 只修改 ui 模块: core 的类图命中缓存
+    (project / "src/ui/view.ts").write_text("export class View {}\n", encoding="utf-8")
+    update_class_index(str(project), _checksums(**{"src/ui/view.ts": "h1"}), workers=1)
+    second = DiagramCache(wiki_dir, version=1)
+    diagrams = generate_module_class_diagrams(load_class_index(wiki_dir), MODULES, cache=second)
+
+    assert first.stats() == {"hits": 0, "misses": 2}
+    assert second.stats() == {"hits": 1, "misses": 1}
+    assert diagrams["core"] == expected["core"]
+    assert "Widget" not in diagrams["ui"]
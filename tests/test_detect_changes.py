@@ -1,13 +1,30 @@
 """Tests for scripts/detect_changes.py."""
 
 import json
+import os
+import shutil
+import subprocess
 from pathlib import Path
 
+import pytest
+
+import detect_changes as detect_changes_module
 from detect_changes import (
+    HashStats,
+    build_dir_hashes,
+    diff_dir_hashes,
+    is_dir_changed,
     calculate_file_hash,
+    get_head_commit,
+    hash_files,
+    load_last_commit,
     should_include_file,
     scan_project_files,
+    scan_project_records,
     detect_changes,
+    detect_renames,
+    diff_symbols,
+    update_checksums_cache,
     DEFAULT_EXCLUDES,
     CODE_EXTENSIONS,
     DOC_EXTENSIONS,
@@ -236,3 +253,521 @@ def test_detect_changes_deleted_file(tmp_project):
     assert second["has_changes"] is True
     assert "src/utils/helpers.js" in second["deleted"]
     assert "删除" in second["summary"]
+
+
+# --- stat fast path ---
+
+
+OLD_MTIME_NS = 1_600_000_000 * 10**9
+
+
+def _write_old(path: Path, content: str) -> None:
+    """Write a file and backdate its mtime outside the racy window."""
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def test_scan_records_include_stat(tmp_path):
+    f = tmp_path / "app.py"
+    _write_old(f, "pass\n")
+
+    record = scan_project_records(str(tmp_path))["app.py"]
+
+    assert record["hash"] == calculate_file_hash(str(f))
+    assert record["size"] == f.stat().st_size
+    assert record["mtime_ns"] == OLD_MTIME_NS
+    assert record["inode"] == f.stat().st_ino
+
+
+def test_scan_records_skip_stat_for_recent_files(tmp_path):
+    (tmp_path / "app.py").write_text("pass\n", encoding="utf-8")
+
+    record = scan_project_records(str(tmp_path))["app.py"]
+
+    assert "mtime_ns" not in record
+
+
+def test_scan_records_reuse_hash_when_stat_unchanged(tmp_path):
+    f = tmp_path / "app.py"
+    _write_old(f, "pass\n")
+    cached = {"app.py": {"hash": "cachedcachedcach", "size": f.stat().st_size,
+                         "mtime_ns": OLD_MTIME_NS, "inode": f.stat().st_ino}}
+
+    records = scan_project_records(str(tmp_path), cached=cached)
+
+    assert records["app.py"]["hash"] == "cachedcachedcach"
+
+
+def test_scan_records_rehash_when_stat_changed(tmp_path):
+    f = tmp_path / "app.py"
+    _write_old(f, "pass\n")
+    cached = {"app.py": {"hash": "cachedcachedcach", "size": 999,
+                         "mtime_ns": OLD_MTIME_NS, "inode": f.stat().st_ino}}
+
+    records = scan_project_records(str(tmp_path), cached=cached)
+
+    assert records["app.py"]["hash"] == calculate_file_hash(str(f))
+
+
+def test_scan_records_paranoid_rehashes(tmp_path):
+    f = tmp_path / "app.py"
+    _write_old(f, "pass\n")
+    cached = {"app.py": {"hash": "cachedcachedcach", "size": f.stat().st_size,
+                         "mtime_ns": OLD_MTIME_NS, "inode": f.stat().st_ino}}
+
+    records = scan_project_records(str(tmp_path), cached=cached, paranoid=True)
+
+    assert records["app.py"]["hash"] == calculate_file_hash(str(f))
+
+
+def test_update_checksums_cache_roundtrip_uses_fast_path(tmp_path):
+    _write_old(tmp_path / "app.py", "pass\n")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"],
+                           doc_mapping={"app.py": "wiki/app.md"},
+                           file_stats=first["current_stats"])
+
+    cache = json.loads((tmp_path / ".mini-wiki" / "cache" / "checksums.json").read_text())
+    assert cache["app.py"]["mtime_ns"] == OLD_MTIME_NS
+    assert cache["app.py"]["doc"] == "wiki/app.md"
+
+    second = detect_changes(str(tmp_path))
+    assert second["has_changes"] is False
+
+
+def test_update_checksums_cache_preserves_doc_mapping(tmp_path):
+    _write_old(tmp_path / "app.py", "pass\n")
+    checksums = scan_project_files(str(tmp_path))
+    update_checksums_cache(str(tmp_path), checksums, doc_mapping={"app.py": "wiki/app.md"})
+    update_checksums_cache(str(tmp_path), checksums)
+
+    cache = json.loads((tmp_path / ".mini-wiki" / "cache" / "checksums.json").read_text())
+    assert cache["app.py"]["doc"] == "wiki/app.md"
+
+
+# --- parallel hashing ---
+
+
+def test_calculate_file_hash_mmap_matches_buffered(tmp_path, monkeypatch):
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"x" * 50_000)
+    buffered = calculate_file_hash(str(f))
+
+    monkeypatch.setattr(detect_changes_module, "MMAP_THRESHOLD", 1024)
+
+    assert calculate_file_hash(str(f)) == buffered
+
+
+def test_hash_files_preserves_input_order(tmp_path):
+    paths = []
+    for i in range(20):
+        f = tmp_path / f"f{i}.py"
+        f.write_text(f"value = {i}\n", encoding="utf-8")
+        paths.append(str(f))
+
+    parallel = hash_files(paths, workers=4)
+
+    assert parallel == [calculate_file_hash(p) for p in paths]
+    assert hash_files(paths, workers=1) == parallel
+
+
+def test_scan_records_report_hash_stats(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("b = 2\n", encoding="utf-8")
+    stats = HashStats()
+
+    scan_project_records(str(tmp_path), workers=2, stats=stats)
+
+    assert stats.files == 2
+    assert stats.total_bytes == 12
+    assert stats.workers == 2
+    assert stats.seconds >= 0
+
+
+def test_detect_changes_includes_scan_stats(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+
+    changes = detect_changes(str(tmp_path), workers=1)
+
+    assert changes["scan_stats"]["files"] == 1
+    assert set(changes["scan_stats"]) >= {"files_per_sec", "mb_per_sec", "workers"}
+
+
+# --- git mode ---
+
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=root, check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def git_project(tmp_path):
+    """A committed git project with an up-to-date checksum cache."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "src" / "util.py").write_text("b = 2\n", encoding="utf-8")
+    (tmp_path / "README.md").write_text("# Demo\n", encoding="utf-8")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"],
+                           file_stats=first["current_stats"])
+    return tmp_path
+
+
+@needs_git
+def test_update_checksums_cache_records_head_commit(git_project):
+    wiki_dir = git_project / ".mini-wiki"
+    assert load_last_commit(str(wiki_dir)) == get_head_commit(str(git_project))
+
+
+@needs_git
+def test_detect_changes_since_matches_scan(git_project):
+    since = load_last_commit(str(git_project / ".mini-wiki"))
+    (git_project / "src" / "app.py").write_text("a = 100\n", encoding="utf-8")
+    (git_project / "src" / "util.py").unlink()
+    (git_project / "src" / "new.py").write_text("c = 3\n", encoding="utf-8")
+
+    via_git = detect_changes(str(git_project), since=since)
+    via_scan = detect_changes(str(git_project))
+
+    assert via_git["mode"] == "git"
+    assert via_scan["mode"] == "scan"
+    for bucket in ("added", "modified", "deleted", "unchanged"):
+        assert via_git[bucket] == via_scan[bucket]
+    assert via_git["current_checksums"] == via_scan["current_checksums"]
+
+
+@needs_git
+def test_detect_changes_since_only_hashes_changed_files(git_project):
+    since = load_last_commit(str(git_project / ".mini-wiki"))
+    (git_project / "src" / "app.py").write_text("a = 100\n", encoding="utf-8")
+
+    changes = detect_changes(str(git_project), since=since)
+
+    assert changes["modified"] == [os.path.join("src", "app.py")]
+    assert changes["scan_stats"]["files"] == 1
+
+
+@needs_git
+def test_detect_changes_since_rehashes_files_dirty_at_last_update(git_project):
+    app = git_project / "src" / "app.py"
+    app.write_text("a = 100\n", encoding="utf-8")
+    dirty = detect_changes(str(git_project))
+    update_checksums_cache(str(git_project), dirty["current_checksums"], file_stats=dirty["current_stats"])
+    since = load_last_commit(str(git_project / ".mini-wiki"))
+
+    # 改回与提交一致: git 不再报告该文件，但缓存中是修改后的哈希
+    app.write_text("a = 1\n", encoding="utf-8")
+    changes = detect_changes(str(git_project), since=since)
+
+    assert changes["mode"] == "git"
+    assert changes["modified"] == [os.path.join("src", "app.py")]
+    assert changes["current_checksums"] == detect_changes(str(git_project))["current_checksums"]
+
+
+@needs_git
+def test_detect_changes_since_invalid_ref_falls_back(git_project):
+    changes = detect_changes(str(git_project), since="no-such-ref")
+
+    assert changes["mode"] == "scan"
+    assert changes["has_changes"] is False
+
+
+def test_detect_changes_since_outside_git_falls_back(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+
+    changes = detect_changes(str(tmp_path), since="HEAD")
+
+    assert changes["mode"] == "scan"
+    assert changes["added"] == ["a.py"]
+
+
+# --- rename detection ---
+
+
+def test_detect_renames_matches_by_hash():
+    renamed = detect_renames(
+        added=["new/a.py", "new/b.py"],
+        deleted=["old/a.py"],
+        current_checksums={"new/a.py": "h1", "new/b.py": "h2"},
+        cached_checksums={"old/a.py": "h1"},
+    )
+
+    assert renamed == [{"from": "old/a.py", "to": "new/a.py", "similarity": 100}]
+
+
+def test_detect_renames_prefers_same_basename():
+    renamed = detect_renames(
+        added=["pkg2/__init__.py", "pkg2/empty.py"],
+        deleted=["pkg1/empty.py", "pkg1/__init__.py"],
+        current_checksums={"pkg2/__init__.py": "e", "pkg2/empty.py": "e"},
+        cached_checksums={"pkg1/empty.py": "e", "pkg1/__init__.py": "e"},
+    )
+
+    pairs = {(r["from"], r["to"]) for r in renamed}
+    assert pairs == {("pkg1/__init__.py", "pkg2/__init__.py"), ("pkg1/empty.py", "pkg2/empty.py")}
+
+
+def test_detect_changes_reports_moved_directory(tmp_path):
+    (tmp_path / "old").mkdir()
+    (tmp_path / "old" / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "old" / "b.py").write_text("b = 2\n", encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"],
+                           doc_mapping={os.path.join("old", "a.py"): "wiki/a.md"})
+
+    (tmp_path / "old").rename(tmp_path / "new")
+    changes = detect_changes(str(tmp_path))
+
+    assert changes["added"] == []
+    assert changes["deleted"] == []
+    assert [r["to"] for r in changes["renamed"]] == [os.path.join("new", "a.py"), os.path.join("new", "b.py")]
+    assert changes["has_changes"] is True
+    assert "重命名" in changes["summary"]
+
+    update_checksums_cache(str(tmp_path), changes["current_checksums"], renamed=changes["renamed"])
+    cache = json.loads((tmp_path / ".mini-wiki" / "cache" / "checksums.json").read_text())
+    assert cache[os.path.join("new", "a.py")]["doc"] == "wiki/a.md"
+    assert os.path.join("old", "a.py") not in cache
+
+
+@needs_git
+def test_detect_changes_since_detects_similar_rename(git_project):
+    body = "".join(f"line_{i} = {i}\n" for i in range(20))
+    (git_project / "src" / "app.py").write_text(body, encoding="utf-8")
+    _git(git_project, "add", ".")
+    _git(git_project, "commit", "-q", "-m", "grow")
+    first = detect_changes(str(git_project))
+    update_checksums_cache(str(git_project), first["current_checksums"],
+                           doc_mapping={os.path.join("src", "app.py"): "wiki/app.md"})
+    since = load_last_commit(str(git_project / ".mini-wiki"))
+
+    _git(git_project, "mv", "src/app.py", "src/main.py")
+    (git_project / "src" / "main.py").write_text(body + "extra = 1\n", encoding="utf-8")
+    changes = detect_changes(str(git_project), since=since, rename_similarity=50)
+
+    main_py = os.path.join("src", "main.py")
+    assert changes["renamed"][0]["from"] == os.path.join("src", "app.py")
+    assert changes["renamed"][0]["to"] == main_py
+    assert changes["renamed"][0]["similarity"] < 100
+    assert main_py in changes["modified"]
+    assert changes["added"] == [] and changes["deleted"] == []
+
+
+# --- directory hash tree ---
+
+
+def _p(*parts):
+    return os.path.join(*parts)
+
+
+def test_build_dir_hashes_covers_all_ancestors():
+    tree = build_dir_hashes({_p("a", "b", "c.py"): "h1", "top.py": "h2"})
+
+    assert set(tree) == {"", "a", _p("a", "b")}
+    assert tree[""]["dirs"] == ["a"]
+    assert tree["a"]["dirs"] == ["b"]
+
+
+def test_build_dir_hashes_change_propagates_to_ancestors_only():
+    base = {_p("pkg1", "x.py"): "h1", _p("pkg2", "y.py"): "h2"}
+    changed = {_p("pkg1", "x.py"): "h1", _p("pkg2", "y.py"): "h3"}
+
+    old_tree = build_dir_hashes(base)
+    new_tree = build_dir_hashes(changed)
+
+    assert old_tree["pkg1"]["hash"] == new_tree["pkg1"]["hash"]
+    assert old_tree["pkg2"]["hash"] != new_tree["pkg2"]["hash"]
+    assert old_tree[""]["hash"] != new_tree[""]["hash"]
+
+
+def test_build_dir_hashes_is_order_independent():
+    files = {_p("a", "1.py"): "h1", _p("a", "2.py"): "h2", _p("b", "3.py"): "h3"}
+    reordered = dict(reversed(list(files.items())))
+
+    assert build_dir_hashes(files) == build_dir_hashes(reordered)
+
+
+def test_diff_dir_hashes_skips_unchanged_subtrees():
+    old_tree = build_dir_hashes({_p("pkg1", "deep", "x.py"): "h1", _p("pkg2", "y.py"): "h2"})
+    new_tree = build_dir_hashes({_p("pkg1", "deep", "x.py"): "h1", _p("pkg2", "y.py"): "h9",
+                                 _p("pkg3", "z.py"): "h4"})
+
+    assert diff_dir_hashes(old_tree, new_tree) == ["", "pkg2", "pkg3"]
+
+
+def test_is_dir_changed():
+    old_tree = build_dir_hashes({_p("src", "core", "a.py"): "h1", _p("src", "ui", "b.py"): "h2"})
+    new_tree = build_dir_hashes({_p("src", "core", "a.py"): "h1", _p("src", "ui", "b.py"): "h3"})
+
+    assert is_dir_changed(old_tree, new_tree, "src/core") is False
+    assert is_dir_changed(old_tree, new_tree, "src/ui") is True
+    assert is_dir_changed(old_tree, new_tree, "src/missing") is False
+
+
+def test_detect_changes_reports_changed_modules(tmp_path):
+    for module in ("core", "ui"):
+        (tmp_path / "src" / module).mkdir(parents=True)
+        (tmp_path / "src" / module / "index.ts").write_text(f"export const {module} = 1\n")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"])
+    structure = {"modules": [{"name": "core", "path": "src/core"}, {"name": "ui", "path": "src/ui"}]}
+    (tmp_path / ".mini-wiki" / "cache" / "structure.json").write_text(json.dumps(structure))
+
+    (tmp_path / "src" / "ui" / "index.ts").write_text("export const ui = 2\n")
+    changes = detect_changes(str(tmp_path))
+
+    assert changes["changed_modules"] == ["ui"]
+    assert _p("src", "ui") in changes["changed_dirs"]
+    assert _p("src", "core") not in changes["changed_dirs"]
+
+
+# --- config.yaml ---
+
+
+def test_detect_changes_honours_config_excludes(tmp_path):
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "api.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "app.py").write_text("y = 1\n", encoding="utf-8")
+    (tmp_path / "app.test.ts").write_text("z\n", encoding="utf-8")
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / ".mini-wiki" / "config.yaml").write_text(
+        "exclude:\n  - generated\n  - '*.test.ts'\n", encoding="utf-8")
+
+    changes = detect_changes(str(tmp_path))
+
+    assert changes["added"] == ["app.py"]
+
+
+def test_detect_changes_skips_files_over_max_file_size(tmp_path):
+    (tmp_path / "big.py").write_text("x = 1\n" * 100, encoding="utf-8")
+    (tmp_path / "small.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / ".mini-wiki" / "config.yaml").write_text(
+        "generation:\n  max_file_size: 100\n", encoding="utf-8")
+
+    changes = detect_changes(str(tmp_path))
+
+    assert changes["added"] == ["small.py"]
+    assert changes["scan_stats"]["files"] == 1
+
+
+def test_detect_changes_honours_gitignore(tmp_path):
+    (tmp_path / ".gitignore").write_text("out/\n*.pb.py\n!keep.pb.py\n", encoding="utf-8")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "bundle.js").write_text("x\n", encoding="utf-8")
+    (tmp_path / "api.pb.py").write_text("x\n", encoding="utf-8")
+    (tmp_path / "keep.pb.py").write_text("x\n", encoding="utf-8")
+    (tmp_path / "app.py").write_text("x\n", encoding="utf-8")
+
+    assert detect_changes(str(tmp_path))["added"] == ["app.py", "keep.pb.py"]
+    assert len(detect_changes(str(tmp_path), use_gitignore=False)["added"]) == 4
+
+
+# --- symbol-level changes ---
+
+SYMBOL_SOURCE = '''class Store:
+    """Store."""
+
+    def get(self, key):
+        """Get."""
+        return key
+
+    def put(self, key):
+        """Put."""
+        return None
+
+
+def helper():
+    """Helper."""
+'''
+
+
+def test_diff_symbols():
+    diff = diff_symbols({"a": "1", "b": "2", "c": "3"}, {"a": "1", "b": "9", "d": "4"})
+
+    assert diff == {"symbols_added": ["d"], "symbols_changed": ["b"], "symbols_removed": ["c"]}
+
+
+def test_detect_changes_reports_symbol_changes(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    source = tmp_path / "store.py"
+    source.write_text(SYMBOL_SOURCE, encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    assert set(first["current_symbols"]["store.py"]) == {"Store", "Store.get", "Store.put", "helper"}
+    update_checksums_cache(str(tmp_path), first["current_checksums"], symbols=first["current_symbols"])
+
+    source.write_text(
+        SYMBOL_SOURCE.replace("return key", "return key * 2").replace("def helper", "def extra"),
+        encoding="utf-8",
+    )
+    second = detect_changes(str(tmp_path))
+
+    assert second["modified"] == ["store.py"]
+    assert second["symbol_changes"]["store.py"] == {
+        "symbols_added": ["extra"],
+        "symbols_changed": ["Store.get"],
+        "symbols_removed": ["helper"],
+    }
+
+
+def test_detect_changes_line_shift_is_not_a_symbol_change(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    source = tmp_path / "store.py"
+    source.write_text(SYMBOL_SOURCE, encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"], symbols=first["current_symbols"])
+
+    source.write_text("import os\n\n\n" + SYMBOL_SOURCE, encoding="utf-8")
+    second = detect_changes(str(tmp_path))
+
+    assert second["symbol_changes"]["store.py"] == {
+        "symbols_added": [], "symbols_changed": [], "symbols_removed": [],
+    }
+
+
+def test_detect_changes_reports_undocumented_signature_change(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    source = tmp_path / "util.ts"
+    source.write_text("export function parse(text) {\n  return text;\n}\n", encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"], symbols=first["current_symbols"])
+
+    source.write_text("export function parse(text, strict) {\n  return text;\n}\n", encoding="utf-8")
+    second = detect_changes(str(tmp_path))
+
+    assert second["symbol_changes"]["util.ts"] == {
+        "symbols_added": [], "symbols_changed": ["parse"], "symbols_removed": [],
+    }
+
+
+def test_update_checksums_cache_keeps_symbols_of_unchanged_files(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / "store.py").write_text(SYMBOL_SOURCE, encoding="utf-8")
+    first = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), first["current_checksums"], symbols=first["current_symbols"])
+
+    second = detect_changes(str(tmp_path))
+    update_checksums_cache(str(tmp_path), second["current_checksums"], symbols=second["current_symbols"])
+
+    assert second["current_symbols"] == {}
+    cached = json.loads((tmp_path / ".mini-wiki" / "cache" / "checksums.json").read_text(encoding="utf-8"))
+    assert set(cached["store.py"]["symbols"]) == {"Store", "Store.get", "Store.put", "helper"}
+
+
+def test_detect_changes_without_wiki_dir_skips_symbols(tmp_path):
+    (tmp_path / "store.py").write_text(SYMBOL_SOURCE, encoding="utf-8")
+
+    changes = detect_changes(str(tmp_path))
+
+    assert changes["current_symbols"] == {}
+    assert changes["symbol_changes"] == {}
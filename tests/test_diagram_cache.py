@@ -0,0 +1,61 @@
+"""Tests for scripts/diagram_cache.py."""
+
+import cache_store
+from diagram_cache import DiagramCache, diagram_cache_key
+
+
+def test_diagram_cache_key_is_stable_and_sensitive():
+    key = diagram_cache_key("module_deps:core", {"internal": ["ui"], "external": []}, 1)
+
+    assert key == diagram_cache_key("module_deps:core", {"external": [], "internal": ["ui"]}, 1)
+    assert key != diagram_cache_key("module_deps:core", {"internal": ["ui", "db"], "external": []}, 1)
+    assert key != diagram_cache_key("module_deps:ui", {"internal": ["ui"], "external": []}, 1)
+    assert key != diagram_cache_key("module_deps:core", {"internal": ["ui"], "external": []}, 2)
+
+
+def test_render_hits_and_misses(tmp_path):
+    wiki_dir = str(tmp_path / ".mini-wiki")
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "```mermaid\nflowchart TB\n```"
+
+    first = DiagramCache(wiki_dir, version=1)
+    assert first.render("architecture", {"modules": ["a"]}, generate) == generate()
+    assert first.stats() == {"hits": 0, "misses": 1}
+
+    second = DiagramCache(wiki_dir, version=1)
+    assert second.render("architecture", {"modules": ["a"]}, generate) == "```mermaid\nflowchart TB\n```"
+    second.render("architecture", {"modules": ["a", "b"]}, generate)
+    assert second.stats() == {"hits": 1, "misses": 1}
+    assert len(calls) == 3
+
+    # 生成器版本变化后重新渲染
+    third = DiagramCache(wiki_dir, version=2)
+    third.render("architecture", {"modules": ["a"]}, generate)
+    assert third.stats() == {"hits": 0, "misses": 1}
+
+
+def test_disabled_cache_always_renders(tmp_path):
+    wiki_dir = str(tmp_path / ".mini-wiki")
+    cache = DiagramCache(wiki_dir, version=1, enabled=False)
+
+    cache.render("file_tree", [], lambda: "a")
+    cache.render("file_tree", [], lambda: "a")
+
+    assert cache.stats() == {"hits": 0, "misses": 2}
+    assert not (cache_store.get_cache_dir(wiki_dir) / cache_store.DIAGRAMS_CACHE_DIR).exists()
+
+
+def test_prune_removes_unused_entries(tmp_path):
+    wiki_dir = str(tmp_path / ".mini-wiki")
+    old = DiagramCache(wiki_dir, version=1)
+    old.render("module_deps:a", ["x"], lambda: "a")
+    old.render("module_deps:b", ["y"], lambda: "b")
+
+    cache = DiagramCache(wiki_dir, version=1)
+    cache.render("module_deps:a", ["x"], lambda: "a")
+
+    assert cache.prune() == 1
+    assert DiagramCache(wiki_dir, version=1).render("module_deps:a", ["x"], lambda: "changed") == "a"
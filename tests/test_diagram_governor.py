@@ -0,0 +1,95 @@
+"""Tests for scripts/diagram_governor.py."""
+
+from diagram_governor import (
+    DiagramGraph,
+    choose_collapse_depth,
+    collapse_graph,
+    govern_graph,
+    split_graph,
+    summarize_items,
+    transitive_reduction,
+)
+
+
+def _graph(edges, nodes=None):
+    nodes = nodes or sorted({n for edge in edges for n in edge})
+    return DiagramGraph(nodes={n: n.rsplit("/", 1)[-1] for n in nodes}, edges=list(edges), title="图")
+
+
+def test_transitive_reduction_removes_implied_edges():
+    graph = _graph([("a", "b"), ("b", "c"), ("a", "c"), ("c", "d"), ("a", "d")])
+
+    reduced = transitive_reduction(graph)
+
+    assert reduced.edges == [("a", "b"), ("b", "c"), ("c", "d")]
+    assert reduced.nodes == graph.nodes
+
+
+def test_transitive_reduction_keeps_cycle_edges():
+    graph = _graph([("a", "b"), ("b", "a"), ("b", "c"), ("a", "c")])
+
+    reduced = transitive_reduction(graph)
+
+    # 缩点后只有一条 {a, b} → c 的边，两条原始边都对应它
+    assert set(reduced.edges) == {("a", "b"), ("b", "a"), ("b", "c"), ("a", "c")}
+
+
+def test_choose_collapse_depth():
+    ids = [f"src/{pkg}/{i}" for pkg in ("core", "ui", "api") for i in range(10)]
+
+    assert choose_collapse_depth(ids, 5) == 2
+    assert choose_collapse_depth(ids, 2) == 2
+    assert choose_collapse_depth(["a", "b"], 1) is None
+
+
+def test_collapse_graph_merges_directories():
+    graph = _graph([("src/core/a", "src/util/x"), ("src/core/b", "src/util/y"),
+                    ("src/core/a", "src/core/b"), ("src/ui/v", "src/core/a")])
+
+    collapsed = collapse_graph(graph, 2)
+
+    assert collapsed.nodes == {"src/core": "src/core/ (2)", "src/ui": "v", "src/util": "src/util/ (2)"}
+    assert collapsed.edges == [("src/core", "src/util"), ("src/ui", "src/core")]
+
+
+def test_split_graph_links_sub_diagrams():
+    graph = _graph([("a", "b"), ("b", "c"), ("c", "d"), ("a", "d")])
+
+    parts = split_graph(graph, 2)
+
+    assert [sorted(p.nodes) for p in parts] == [["@part2", "a", "b"], ["c", "d"]]
+    assert parts[0].edges == [("a", "b"), ("b", "@part2"), ("a", "@part2")]
+    assert parts[0].links == {"@part2": 1}
+    assert parts[0].title == "图 (1/2)"
+
+
+def test_govern_graph_within_budget_is_unchanged():
+    graph = _graph([("a", "b")])
+
+    assert govern_graph(graph, 10, 10) == [graph]
+
+
+def test_govern_graph_collapses_then_splits():
+    edges = [(f"pkg{p}/m{i}", f"pkg{(p + 1) % 30}/m{i}") for p in range(30) for i in range(5)]
+    graph = _graph(edges)
+
+    collapsed = govern_graph(graph, max_nodes=40, max_edges=100)
+    assert len(collapsed) == 1
+    assert len(collapsed[0].nodes) == 30
+
+    parts = govern_graph(graph, max_nodes=10, max_edges=100)
+    assert len(parts) == 3
+    assert sum(len([n for n in p.nodes if not n.startswith("@")]) for p in parts) == 30
+    assert all(len(p.edges) <= 100 for p in parts)
+
+
+def test_summarize_items():
+    assert summarize_items(["a", "b"], 5) == [("a", 1), ("b", 1)]
+
+    items = [f"./utils/f{i}.ts" for i in range(6)] + ["./models/user.ts"]
+    assert summarize_items(items, 3) == [("utils", 6), ("./models/user.ts", 1)]
+
+    flat = [f"pkg{i}" for i in range(10)]
+    summary = summarize_items(flat, 4)
+    assert summary[:3] == [("pkg0", 1), ("pkg1", 1), ("pkg2", 1)]
+    assert summary[3] == ("", 7)
@@ -2,15 +2,24 @@
 测试 extract_docs.py 模块
 """
 
+import json
+
 import pytest
 from pathlib import Path
 from scripts.extract_docs import (
     DocEntry,
+    LineIndex,
     extract_jsdoc,
     extract_python_docstring,
     extract_docs_from_file,
+    extract_files_symbols,
+    extract_project_docs,
+    extract_symbol_hashes,
+    find_source_files,
+    save_docs_cache,
     docs_to_markdown
 )
+import scripts.extract_docs as extract_docs_module
 
 
 class TestDocEntryDataclass:
@@ -223,6 +232,123 @@ type Status = 'active' | 'inactive';
         assert entry.type == "type"
 
 
+    def test_extract_class_methods(self, tmp_path):
+        """测试类方法使用限定名"""
+        # Arrange
+        ts_content = """
+/** Service. */
+@Injectable()
+export class Service {
+    /** Create the service. */
+    constructor(private readonly http: Http) {}
+
+    /**
+     * Load an item
+     * @param {string} id - Item id
+     * @returns {Item} The item
+     */
+    async load(id: string): Promise<Item> {
+        return this.http.get(`/items/${id}`);
+    }
+
+    /** Click handler. */
+    private onClick = (event) => {};
+
+    /** Not a method. */
+    count = 0;
+}
+"""
+        file_path = str(tmp_path / "service.ts")
+
+        # Act
+        entries = extract_jsdoc(ts_content, file_path)
+
+        # Assert
+        assert [(e.name, e.type) for e in entries] == [
+            ("Service", "class"),
+            ("Service.constructor", "method"),
+            ("Service.load", "method"),
+            ("Service.onClick", "method"),
+        ]
+        assert entries[2].params[0]["name"] == "id"
+        assert entries[2].returns == "Item: The item"
+        assert entries[2].line_number == 8
+
+    def test_extract_class_methods_with_generic_constraint(self, tmp_path):
+        """测试泛型约束中的花括号不被当作类体"""
+        # Arrange
+        ts_content = """
+/** Foo. */
+class Foo<T extends { a: number }> extends mixin({ b: 1 }) {
+    /** Bar. */
+    bar() {}
+}
+"""
+        file_path = str(tmp_path / "foo.ts")
+
+        # Act
+        entries = extract_jsdoc(ts_content, file_path)
+
+        # Assert
+        assert [(e.name, e.type) for e in entries] == [("Foo", "class"), ("Foo.bar", "method")]
+
+    def test_extract_arrow_and_default_exports(self, tmp_path):
+        """测试箭头函数导出与 export default"""
+        # Arrange
+        ts_content = """
+/** Format a value. */
+export const format = (value: number): string => String(value);
+
+/** Main entry. */
+export default async function () {}
+"""
+        file_path = str(tmp_path / "index.ts")
+
+        # Act
+        entries = extract_jsdoc(ts_content, file_path)
+
+        # Assert
+        assert [(e.name, e.type) for e in entries] == [
+            ("format", "function"),
+            ("default", "function"),
+        ]
+
+    def test_ignores_doc_markers_in_strings(self, tmp_path):
+        """测试字符串、模板字符串与正则中的 /** 不被当作注释"""
+        # Arrange
+        js_content = """
+const a = "/** fake */ function one() {}";
+const b = `/** fake ${"}"} */ function two() {}`;
+const c = /\\/** fake/;
+/** Real. */
+function three() {}
+"""
+        file_path = str(tmp_path / "test.js")
+
+        # Act
+        entries = extract_jsdoc(js_content, file_path)
+
+        # Assert
+        assert [e.name for e in entries] == ["three"]
+
+    def test_doc_not_followed_by_declaration(self, tmp_path):
+        """测试 JSDoc 不会跨越语句关联到后面的声明"""
+        # Arrange
+        js_content = """
+/** Dangling. */
+doSomething();
+
+function undocumented() {}
+"""
+        file_path = str(tmp_path / "test.js")
+
+        # Act
+        entries = extract_jsdoc(js_content, file_path)
+
+        # Assert
+        assert entries == []
+
+
 class TestExtractPythonDocstring:
     """测试 Python docstring 提取功能"""
 
@@ -378,6 +504,184 @@ async def fetch_data(url):
         assert entry.type == "function"
 
 
+    def test_extract_methods_with_qualified_names(self, tmp_path):
+        """测试类方法与嵌套类使用限定名"""
+        # Arrange
+        py_content = '''
+class Repo:
+    """Repository."""
+
+    @staticmethod
+    def open(path):
+        """Open a repository.
+
+        Args:
+            path (str): Repository path
+        """
+
+    class Config:
+        """Repository config."""
+
+        async def load(self):
+            """Load config."""
+'''
+        file_path = str(tmp_path / "test.py")
+
+        # Act
+        entries = extract_python_docstring(py_content, file_path)
+
+        # Assert
+        assert [(e.name, e.type, e.line_number) for e in entries] == [
+            ("Repo", "class", 2),
+            ("Repo.open", "method", 6),
+            ("Repo.Config", "class", 13),
+            ("Repo.Config.load", "method", 16),
+        ]
+        assert entries[1].params[0]["name"] == "path"
+
+    def test_extract_skips_local_definitions(self, tmp_path):
+        """测试函数体内的局部定义不被提取"""
+        # Arrange
+        py_content = '''
+def outer():
+    """Outer."""
+    def inner():
+        """Inner."""
+'''
+
+        # Act
+        entries = extract_python_docstring(py_content, str(tmp_path / "test.py"))
+
+        # Assert
+        assert [e.name for e in entries] == ["outer"]
+
+    def test_extract_pathological_signature(self, tmp_path):
+        """测试超长签名与未闭合字符串不会导致回溯"""
+        # Arrange
+        py_content = "def f(" + ", ".join(f"a{i}" for i in range(5000)) + "):\n    \'\'\'Doc\n"
+
+        # Act
+        entries = extract_python_docstring(py_content + "x" * 50000, str(tmp_path / "bad.py"))
+
+        # Assert
+        assert entries == []
+
+    def test_extract_falls_back_on_syntax_error(self, tmp_path):
+        """测试无法解析的文件回退到正则提取"""
+        # Arrange
+        py_content = '''
+def ok():
+    """Still documented."""
+
+def broken(:
+'''
+
+        # Act
+        entries = extract_python_docstring(py_content, str(tmp_path / "test.py"))
+
+        # Assert
+        assert [e.name for e in entries] == ["ok"]
+
+
+class TestSymbolHashes:
+    """测试符号哈希"""
+
+    def test_python_symbol_hash_ignores_line_shift(self):
+        """测试行号变化不影响符号哈希"""
+        source = 'def add(a, b):\n    """Add."""\n    return a + b\n'
+
+        before = extract_python_docstring(source, "m.py")[0]
+        after = extract_python_docstring("\n\n" + source, "m.py")[0]
+
+        assert before.symbol_hash == after.symbol_hash
+        assert (before.line_number, before.end_line) == (1, 3)
+        assert (after.line_number, after.end_line) == (3, 5)
+
+    def test_class_hash_excludes_documented_methods(self):
+        """测试修改方法时类本身的哈希不变"""
+        source = '''
+class A:
+    """A."""
+    x = 1
+
+    def m(self):
+        """M."""
+        return 1
+'''
+        base = {e.name: e.symbol_hash for e in extract_python_docstring(source, "a.py")}
+        body = {e.name: e.symbol_hash for e in extract_python_docstring(source.replace("return 1", "return 2"), "a.py")}
+        attr = {e.name: e.symbol_hash for e in extract_python_docstring(source.replace("x = 1", "x = 2"), "a.py")}
+
+        assert body["A"] == base["A"] and body["A.m"] != base["A.m"]
+        assert attr["A"] != base["A"] and attr["A.m"] == base["A.m"]
+
+    def test_jsdoc_symbol_hash_covers_body(self):
+        """测试 JS 符号哈希包含实现与注释"""
+        source = "/** Add. */\nexport function add(a, b) {\n  return a + b;\n}\n/** Sub. */\nfunction sub() {}\n"
+
+        base = extract_jsdoc(source, "m.ts")
+        changed = extract_jsdoc(source.replace("a + b", "b + a"), "m.ts")
+        redoc = extract_jsdoc(source.replace("Add.", "Adds."), "m.ts")
+
+        assert base[0].end_line == 4
+        assert changed[0].symbol_hash != base[0].symbol_hash
+        assert redoc[0].symbol_hash != base[0].symbol_hash
+        assert changed[1].symbol_hash == base[1].symbol_hash
+
+    def test_symbol_hashes_include_undocumented_python(self):
+        """测试无 DocString 的函数、类与方法也有符号哈希"""
+        source = (
+            "class A:\n"
+            "    def m(self, x):\n"
+            "        return x\n"
+            "\n"
+            "def f(a):\n"
+            "    return a\n"
+        )
+
+        base = extract_symbol_hashes(source, "a.py")
+        changed = extract_symbol_hashes(source.replace("def f(a)", "def f(a, b=None)"), "a.py")
+
+        assert set(base) == {"A", "A.m", "f"}
+        assert changed["f"] != base["f"]
+        assert changed["A"] == base["A"] and changed["A.m"] == base["A.m"]
+
+    def test_symbol_hashes_include_undocumented_js(self):
+        """测试无 JSDoc 的 JS/TS 声明与类方法也有符号哈希，局部声明不计入"""
+        source = (
+            "export function add(a, b) {\n"
+            "  const inner = () => a;\n"
+            "  return a + b;\n"
+            "}\n"
+            "export class Store {\n"
+            "  @cached\n"
+            "  get(key: string) { return key; }\n"
+            "}\n"
+            "/** Doc. */\n"
+            "export const VERSION = 1;\n"
+        )
+
+        base = extract_symbol_hashes(source, "m.ts")
+        changed = extract_symbol_hashes(source.replace("get(key: string)", "get(key: number)"), "m.ts")
+
+        assert set(base) == {"add", "Store", "Store.get", "VERSION"}
+        assert changed["Store.get"] != base["Store.get"]
+        assert changed["Store"] == base["Store"] and changed["add"] == base["add"]
+        assert base["VERSION"] == {e.name: e.symbol_hash for e in extract_jsdoc(source, "m.ts")}["VERSION"]
+
+
+    def test_generic_constrained_class_hash_covers_body(self):
+        """测试泛型约束中的花括号不截断类的符号范围"""
+        source = "class Foo<T extends {a: number}> extends Bar {\n  x = 1;\n  run() {}\n}\n"
+
+        base = extract_symbol_hashes(source, "foo.ts")
+        changed = extract_symbol_hashes(source.replace("x = 1;", "x = 1;\n  extra = 5;"), "foo.ts")
+
+        assert set(base) == {"Foo", "Foo.run"}
+        assert changed["Foo"] != base["Foo"]
+        assert changed["Foo.run"] == base["Foo.run"]
+
+
 class TestExtractWithExamples:
     """测试示例代码提取"""
 
@@ -507,6 +811,159 @@ def test():
         assert len(entries) == 0
 
 
+class TestLineNumbers:
+    """测试行号计算"""
+
+    def test_line_index_matches_prefix_count(self):
+        """LineIndex 与逐前缀统计换行的结果一致"""
+        content = "a\nbb\n\nccc\n"
+        index = LineIndex(content)
+
+        for offset in range(len(content) + 1):
+            assert index.line_of(offset) == content[:offset].count('\n') + 1
+
+    def test_jsdoc_line_numbers_for_many_blocks(self):
+        """多个 JSDoc 块的行号正确"""
+        content = ''.join(
+            f"/** Doc {i} */\nexport function fn{i}() {{}}\n\n" for i in range(200)
+        )
+
+        entries = extract_jsdoc(content, "gen.ts")
+
+        assert len(entries) == 200
+        assert [e.line_number for e in entries] == [1 + 3 * i for i in range(200)]
+
+
+class TestExtractProjectDocs:
+    """测试项目模式提取"""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / "src" / "utils").mkdir(parents=True)
+        (tmp_path / "src" / "utils" / "math.ts").write_text(
+            "/** Add numbers. */\nexport function add() {}\n"
+        )
+        (tmp_path / "src" / "app.py").write_text(
+            'def run():\n    """Run the app."""\n'
+        )
+        (tmp_path / "src" / "generated").mkdir()
+        (tmp_path / "src" / "generated" / "api.ts").write_text("/** Gen. */\nfunction gen() {}\n")
+        (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+        (tmp_path / "node_modules" / "lib" / "index.js").write_text("/** Lib. */\nfunction lib() {}\n")
+        (tmp_path / ".gitignore").write_text("generated/\n")
+        return tmp_path
+
+    def test_find_source_files_uses_scan_exclusions(self, project):
+        """测试复用扫描排除规则"""
+        files = [p.replace("\\", "/") for p in find_source_files(str(project))]
+
+        assert files == ["src/app.py", "src/utils/math.ts"]
+
+    def test_extract_project_docs_records(self, project):
+        """测试记录使用相对路径并按文件顺序输出"""
+        records = list(extract_project_docs(str(project), workers=1))
+
+        assert [(r["file_path"], r["name"]) for r in records] == [
+            ("src/app.py", "run"),
+            ("src/utils/math.ts", "add"),
+        ]
+        assert records[1]["description"] == "Add numbers."
+
+    def test_extract_project_docs_parallel_matches_serial(self, project, monkeypatch):
+        """测试进程池输出与单进程一致"""
+        serial = list(extract_project_docs(str(project), workers=1))
+        monkeypatch.setattr(extract_docs_module, "PARALLEL_MIN_FILES", 0)
+
+        parallel = list(extract_project_docs(str(project), workers=2))
+
+        assert parallel == serial
+
+    def test_save_docs_cache(self, project):
+        """测试写入 cache/docs.jsonl"""
+        cache_path, count = save_docs_cache(str(project), extract_project_docs(str(project), workers=1))
+
+        lines = cache_path.read_text(encoding="utf-8").splitlines()
+        assert cache_path == project / ".mini-wiki" / "cache" / "docs.jsonl"
+        assert count == len(lines) == 2
+        assert json.loads(lines[0])["name"] == "run"
+
+
+class TestExtractionCache:
+    """测试按内容哈希缓存提取结果"""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / ".mini-wiki").mkdir()
+        (tmp_path / "a.py").write_text('def a():\n    """A."""\n')
+        (tmp_path / "b.ts").write_text("/** B. */\nfunction b() {}\n")
+        return tmp_path
+
+    def test_unchanged_files_hit_cache(self, project):
+        """测试未变化的文件直接读取缓存"""
+        first_stats, second_stats = {}, {}
+        first = list(extract_project_docs(str(project), workers=1, stats=first_stats))
+        second = list(extract_project_docs(str(project), workers=1, stats=second_stats))
+
+        assert first == second
+        assert first_stats == {"hits": 0, "misses": 2}
+        assert second_stats == {"hits": 2, "misses": 0}
+
+    def test_changed_file_is_reparsed(self, project):
+        """测试内容变化的文件重新解析"""
+        list(extract_project_docs(str(project), workers=1))
+        (project / "a.py").write_text('def renamed():\n    """Renamed."""\n')
+
+        stats = {}
+        records = list(extract_project_docs(str(project), workers=1, stats=stats))
+
+        assert stats == {"hits": 1, "misses": 1}
+        assert [r["name"] for r in records] == ["renamed", "b"]
+
+    def test_same_content_at_new_path(self, project):
+        """测试相同内容的文件共享缓存，file_path 使用各自路径"""
+        list(extract_project_docs(str(project), workers=1))
+        (project / "c.py").write_text((project / "a.py").read_text())
+
+        stats = {}
+        records = list(extract_project_docs(str(project), workers=1, stats=stats))
+
+        assert stats == {"hits": 3, "misses": 0}
+        assert [(r["file_path"], r["name"]) for r in records] == [("a.py", "a"), ("b.ts", "b"), ("c.py", "a")]
+
+    def test_version_bump_invalidates_cache(self, project, monkeypatch):
+        """测试提取器版本变化后缓存失效"""
+        list(extract_project_docs(str(project), workers=1))
+        monkeypatch.setattr(extract_docs_module, "EXTRACTOR_VERSION", extract_docs_module.EXTRACTOR_VERSION + 1)
+
+        stats = {}
+        list(extract_project_docs(str(project), workers=1, stats=stats))
+
+        assert stats == {"hits": 0, "misses": 2}
+
+    def test_no_cache_without_wiki_dir(self, tmp_path):
+        """测试没有 .mini-wiki 目录时不写缓存"""
+        (tmp_path / "a.py").write_text('def a():\n    """A."""\n')
+
+        list(extract_project_docs(str(tmp_path), workers=1))
+
+        assert not (tmp_path / ".mini-wiki").exists()
+
+    def test_files_symbols_parallel_and_cached(self, project, monkeypatch):
+        """测试符号哈希的进程池结果与单进程一致，并按内容哈希缓存"""
+        wiki_dir = str(project / ".mini-wiki")
+        checksums = {"a.py": "h1", "b.ts": "h2"}
+        serial = extract_files_symbols(str(project), ["a.py", "b.ts"], {}, workers=1)
+        monkeypatch.setattr(extract_docs_module, "PARALLEL_MIN_FILES", 0)
+
+        parallel = extract_files_symbols(str(project), ["a.py", "b.ts"], checksums, wiki_dir, workers=2)
+        # 内容哈希未变时直接读取缓存
+        (project / "a.py").write_text("def other():\n    pass\n")
+        cached = extract_files_symbols(str(project), ["a.py", "b.ts"], checksums, wiki_dir, workers=2)
+
+        assert parallel == serial == cached
+        assert set(serial["a.py"]) == {"a"} and set(serial["b.ts"]) == {"b"}
+
+
 class TestDocsToMarkdown:
     """测试文档转 Markdown"""
 
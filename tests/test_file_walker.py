@@ -0,0 +1,68 @@
+"""Tests for scripts/file_walker.py."""
+
+import os
+
+from file_walker import WalkEntry, walk_project
+
+
+def _rel(*parts):
+    return os.sep.join(parts)
+
+
+def test_walk_project_lists_nested_files(tmp_path):
+    (tmp_path / "src" / "core").mkdir(parents=True)
+    (tmp_path / "src" / "core" / "app.py").write_text("pass")
+    (tmp_path / "README.md").write_text("# Hi")
+
+    rel_paths = [e.rel_path for e in walk_project(tmp_path, set())]
+
+    assert rel_paths == ["README.md", _rel("src", "core", "app.py")]
+
+
+def test_walk_project_prunes_ignored_dirs(tmp_path):
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "index.js").write_text("x")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.ts").write_text("x")
+
+    rel_paths = [e.rel_path for e in walk_project(tmp_path, {"node_modules"})]
+
+    assert rel_paths == [_rel("src", "main.ts")]
+
+
+def test_walk_project_prunes_nested_ignored_dirs(tmp_path):
+    (tmp_path / "src" / "__pycache__").mkdir(parents=True)
+    (tmp_path / "src" / "__pycache__" / "app.cpython-311.pyc").write_bytes(b"\0")
+    (tmp_path / "src" / "app.py").write_text("pass")
+
+    rel_paths = [e.rel_path for e in walk_project(tmp_path, {"__pycache__"})]
+
+    assert rel_paths == [_rel("src", "app.py")]
+
+
+def test_walk_project_is_sorted(tmp_path):
+    for name in ["b.py", "a.py", "c.py"]:
+        (tmp_path / name).write_text("")
+
+    rel_paths = [e.rel_path for e in walk_project(tmp_path, set())]
+
+    assert rel_paths == sorted(rel_paths)
+
+
+def test_walk_project_missing_root(tmp_path):
+    assert walk_project(tmp_path / "missing", set()) == []
+
+
+def test_walk_entry_metadata(tmp_path):
+    f = tmp_path / "data.py"
+    f.write_text("12345")
+
+    entry = walk_project(tmp_path, set())[0]
+
+    assert isinstance(entry, WalkEntry)
+    assert entry.name == "data.py"
+    assert entry.suffix == ".py"
+    assert entry.size == 5
+    assert entry.mtime_ns == f.stat().st_mtime_ns
+    assert entry.inode == f.stat().st_ino
+    assert entry.path == str(f)
@@ -11,6 +11,7 @@ from generate_diagram import (
     generate_data_flow_diagram,
     generate_file_tree_diagram,
     generate_class_diagram,
+    generate_layered_architecture_diagram,
     load_structure,
 )
 
@@ -71,6 +72,22 @@ def test_generate_architecture_diagram_python_project():
     assert "subgraph Utils" in result
 
 
+def test_generate_architecture_diagram_marks_omitted_modules():
+    """Should add a summary node instead of silently dropping modules."""
+    # Arrange
+    structure = {
+        "project_type": ["python"],
+        "modules": [{"name": f"core{i}", "path": f"src/core{i}"} for i in range(8)],
+    }
+
+    # Act
+    result = generate_architecture_diagram(structure)
+
+    # Assert
+    assert 'CoreRest["其余 4 个"]' in result
+    assert "core3" in result and "core4" not in result
+
+
 def test_generate_architecture_diagram_empty_modules():
     """Should handle empty module list gracefully."""
     # Arrange
@@ -108,6 +125,98 @@ def test_generate_architecture_diagram_fullstack_project():
     assert "Core --> Utils" in result
 
 
+def test_generate_architecture_diagram_uses_dependencies(sample_structure):
+    """Should layer modules by the import graph when dependencies are given."""
+    # Arrange
+    dependencies = {
+        "app": {"internal": ["core"], "external": []},
+        "core": {"internal": ["utils"], "external": ["yaml"]},
+        "utils": {"internal": [], "external": []},
+    }
+
+    # Act
+    result = generate_architecture_diagram(sample_structure, dependencies)
+
+    # Assert
+    assert "subgraph Core" not in result
+    assert result == generate_layered_architecture_diagram(dependencies)
+
+
+# --- generate_layered_architecture_diagram ---
+
+
+def test_generate_layered_architecture_diagram_layers():
+    """Should put dependents above their dependencies."""
+    # Arrange
+    dependencies = {
+        "app": {"internal": ["core", "utils"]},
+        "core": {"internal": ["utils"]},
+        "utils": {"internal": []},
+    }
+
+    # Act
+    result = generate_layered_architecture_diagram(dependencies)
+    lines = result.splitlines()
+
+    # Assert
+    assert lines[:2] == ["```mermaid", "flowchart TB"]
+    top = lines.index('    subgraph L2["第 1 层"]')
+    middle = lines.index('    subgraph L1["第 2 层"]')
+    bottom = lines.index('    subgraph L0["第 3 层"]')
+    assert lines[top + 1].endswith('["app"]')
+    assert lines[middle + 1].endswith('["core"]')
+    assert lines[bottom + 1].endswith('["utils"]')
+    assert sum(1 for line in lines if "-->" in line) == 3
+
+
+def test_generate_layered_architecture_diagram_collapses_cycles():
+    """Should render a dependency cycle as a single node."""
+    # Arrange
+    dependencies = {
+        "a": {"internal": ["b"]},
+        "b": {"internal": ["a", "c"]},
+        "c": {"internal": []},
+    }
+
+    # Act
+    result = generate_layered_architecture_diagram(dependencies)
+
+    # Assert
+    assert '[["a ⇄ b"]]' in result
+    assert '["a"]' not in result
+    assert sum(1 for line in result.splitlines() if "-->" in line) == 1
+
+
+def test_generate_layered_architecture_diagram_collapses_large_graphs():
+    """Should collapse modules to directories when over the node budget."""
+    # Arrange
+    dependencies = {f"m{i}": {"internal": [f"m{i + 1}"] if i < 29 else []} for i in range(30)}
+    module_paths = {f"m{i}": f"packages/p{i // 10}/m{i}" for i in range(30)}
+
+    # Act
+    result = generate_layered_architecture_diagram(dependencies, module_paths, max_nodes=5)
+
+    # Assert
+    assert result.count("```mermaid") == 1
+    assert '"packages/p0/ (10)"' in result
+    assert sum(1 for line in result.splitlines() if "-->" in line) == 2
+
+
+def test_generate_layered_architecture_diagram_splits_into_linked_parts():
+    """Should split into titled, linked diagrams when collapsing is not enough."""
+    # Arrange
+    dependencies = {f"m{i:02d}": {"internal": [f"m{i + 1:02d}"] if i < 19 else []} for i in range(20)}
+
+    # Act
+    result = generate_layered_architecture_diagram(dependencies, max_nodes=10)
+
+    # Assert
+    assert result.count("```mermaid") == 2
+    assert "title: 架构图 (1/2)" in result
+    assert '>"↗ 第 2 部分"]' in result
+    assert '"m19"' in result
+
+
 # --- generate_module_dependency_diagram ---
 
 
@@ -176,6 +285,24 @@ def test_generate_module_dependency_diagram_mixed():
     assert "joi" in result
 
 
+def test_generate_module_dependency_diagram_collapses_long_lists():
+    """Should fold long dependency lists instead of dropping them."""
+    # Arrange
+    dependencies = {
+        "internal": [f"src/utils/f{i}.ts" for i in range(20)] + ["src/models/User.ts"],
+        "external": [f"@types/p{i}" for i in range(20)] + ["react"],
+    }
+
+    # Act
+    result = generate_module_dependency_diagram("app", dependencies, max_nodes=10)
+
+    # Assert
+    assert '"src/utils/ (20)"' in result
+    assert '"User"' in result
+    assert '"@types/ (20)"' in result
+    assert '"react"' in result
+
+
 def test_generate_module_dependency_diagram_empty_dependencies():
     """Should handle empty dependencies gracefully."""
     # Arrange
@@ -236,6 +363,21 @@ def test_generate_data_flow_diagram_basic():
     assert "Service" in result
 
 
+def test_generate_data_flow_diagram_marks_omitted_modules():
+    """Should show omitted modules as a summary participant."""
+    # Arrange
+    modules = [{"name": f"M{i}", "path": f"src/m{i}.ts"} for i in range(5)]
+
+    # Act
+    result = generate_data_flow_diagram(["main.ts"], modules)
+
+    # Assert
+    assert "participant Rest as 其余 3 个模块" in result
+    assert "M1->>Rest: 调用" in result
+    assert "Rest-->>U: 响应" in result
+    assert "M2" not in result
+
+
 def test_generate_data_flow_diagram_empty_modules():
     """Should handle empty module list gracefully."""
     # Arrange
@@ -268,6 +410,23 @@ def test_generate_data_flow_diagram_single_module():
     assert "E->>Handler: 调用" in result
 
 
+def test_generate_data_flow_diagram_from_calls():
+    """Should draw real call steps between entry and module participants."""
+    # Arrange
+    calls = [(None, None, "main()"), (None, "core", "run()"), ("core", "E", "log()")]
+
+    # Act
+    result = generate_data_flow_diagram(["main.py"], [], calls)
+
+    # Assert
+    assert "participant core as core" in result
+    assert "participant E2 as E" in result
+    assert "E->>E: main()" in result
+    assert "E->>core: run()" in result
+    assert "core->>E2: log()" in result
+    assert "E-->>U: 响应" in result
+
+
 # --- generate_file_tree_diagram ---
 
 
@@ -317,6 +476,7 @@ def test_generate_file_tree_diagram_max_depth():
     assert "mindmap" in result
     # Should limit to 10 modules
     assert result.count("module") <= 12  # 10 modules + possible text
+    assert "其余 11 个模块" in result
 
 
 # --- generate_class_diagram ---
@@ -350,6 +510,21 @@ def test_generate_class_diagram_basic():
     assert "+login()" in result
 
 
+def test_generate_class_diagram_marks_omitted_classes_and_members():
+    """Should note omitted classes and members."""
+    # Arrange
+    classes = [{"name": f"C{i}", "methods": [f"m{j}" for j in range(4)]} for i in range(4)]
+
+    # Act
+    result = generate_class_diagram(classes, max_classes=3, max_members=3)
+
+    # Assert
+    assert 'note "其余 2 个类未显示"' in result
+    assert "class C1" in result and "class C2" not in result
+    assert "+其余 2 个方法()" in result
+    assert "m2()" not in result
+
+
 def test_generate_class_diagram_empty_classes():
     """Should handle empty class list gracefully."""
     # Arrange
@@ -383,6 +558,33 @@ def test_generate_class_diagram_special_chars():
     assert "class UserModelv2" in result or "class User" in result
 
 
+def test_generate_class_diagram_relations_and_visibility():
+    """Should draw inheritance, realization and composition edges."""
+    # Arrange
+    classes = [
+        {
+            "name": "Store",
+            "bases": ["Base"],
+            "implements": ["Repo"],
+            "composes": ["Cache"],
+            "properties": ["-cache: Map<str, int>"],
+            "methods": ["#load"],
+        },
+        {"name": "Repo", "kind": "interface"},
+    ]
+
+    # Act
+    result = generate_class_diagram(classes)
+
+    # Assert
+    assert "Base <|-- Store" in result
+    assert "Repo <|.. Store" in result
+    assert "Store *-- Cache" in result
+    assert "<<interface>>" in result
+    assert "-cache: Map~str, int~" in result
+    assert "#load()" in result
+
+
 # --- load_structure ---
 
 
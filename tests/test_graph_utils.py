@@ -0,0 +1,65 @@
+"""Tests for scripts/graph_utils.py."""
+
+import random
+import time
+
+from graph_utils import layer_graph, strongly_connected_components
+
+
+def test_scc_reverse_topological_order():
+    edges = {"a": ["b"], "b": ["c"], "c": ["b", "d"], "d": []}
+
+    components = strongly_connected_components(["a", "b", "c", "d"], edges)
+
+    assert components == [["d"], ["b", "c"], ["a"]]
+
+
+def test_scc_ignores_unknown_targets_and_self_loops():
+    components = strongly_connected_components(["a", "b"], {"a": ["a", "x", "b"]})
+
+    assert components == [["b"], ["a"]]
+
+
+def test_layer_graph_longest_path():
+    # app -> api -> db, app -> db: db 在 0 层，api 在 1 层，app 在 2 层 (最长路径)
+    edges = {"app": ["api", "db"], "api": ["db"], "db": [], "cli": ["db"]}
+
+    layered = layer_graph(["api", "app", "cli", "db"], edges)
+
+    layer_of = {name: layered.layers[layered.component_of[name]] for name in edges}
+    assert layer_of == {"db": 0, "api": 1, "cli": 1, "app": 2}
+    assert layered.depth == 3
+
+
+def test_layer_graph_condenses_cycles():
+    edges = {"a": ["b"], "b": ["a", "c"], "c": []}
+
+    layered = layer_graph(["a", "b", "c"], edges)
+
+    cycle = layered.component_of["a"]
+    assert layered.component_of["b"] == cycle
+    assert layered.components[cycle] == ["a", "b"]
+    assert layered.edges[cycle] == {layered.component_of["c"]}
+    assert layered.layers[cycle] == 1
+
+
+def test_layer_graph_deep_chain_is_not_recursive():
+    nodes = [f"m{i}" for i in range(20000)]
+    edges = {nodes[i]: [nodes[i + 1]] for i in range(len(nodes) - 1)}
+
+    layered = layer_graph(nodes, edges)
+
+    assert layered.depth == 20000
+
+
+def test_layer_graph_scales_to_large_graphs():
+    rng = random.Random(0)
+    nodes = [f"m{i}" for i in range(5000)]
+    edges = {node: rng.sample(nodes, 10) for node in nodes}
+
+    start = time.perf_counter()
+    layered = layer_graph(nodes, edges)
+    elapsed = time.perf_counter() - start
+
+    assert sum(len(c) for c in layered.components) == 5000
+    assert elapsed < 2.0
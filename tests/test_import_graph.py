@@ -0,0 +1,194 @@
+"""Tests for scripts/import_graph.py."""
+
+import pytest
+
+import cache_store
+from import_graph import (
+    ImportResolver,
+    build_module_index,
+    load_import_graph,
+    load_module_dependencies,
+    module_dependencies,
+    module_of,
+    parse_js_imports,
+    parse_python_imports,
+    update_import_graph,
+)
+
+MODULES = [
+    {"name": "core", "path": "src/core"},
+    {"name": "ui", "path": "src/ui"},
+    {"name": "shared", "path": "packages/shared"},
+]
+
+
+def test_module_of_uses_longest_prefix():
+    module_index = build_module_index([{"name": "src", "path": "src"}, {"name": "core", "path": "src/core"}])
+    assert module_of("src/core/app.py", module_index) == "core"
+    assert module_of("src/main.py", module_index) == "src"
+    assert module_of("tests/x.py", module_index) is None
+
+
+# --- parsing ---
+
+
+def test_parse_python_imports():
+    content = (
+        "import os.path, json\n"
+        "from typing import List\n"
+        "from . import helpers\n"
+        "from ..core.store import Store\n"
+        "def f():\n"
+        "    import yaml\n"
+    )
+
+    specs = parse_python_imports(content)
+
+    assert set(specs) == {"os.path", "json", "typing.List", ".helpers", "..core.store.Store", "yaml"}
+
+
+def test_parse_python_imports_falls_back_on_syntax_error():
+    specs = parse_python_imports("import os\nfrom .store import (\ndef broken(:\n")
+
+    assert specs == ["os", ".store"]
+
+
+def test_parse_js_imports():
+    content = (
+        "import React from 'react';\n"
+        "import { a } from './a';\n"
+        "import './styles.css';\n"
+        "export * from \"../b\";\n"
+        "const c = require('./c');\n"
+        "const d = await import('@scope/pkg/sub');\n"
+        "// import x from 'commented';\n"
+        "const s = \"require('in-string')\";\n"
+        "obj.require('member');\n"
+        "Array.from('abc');\n"
+    )
+
+    specs = parse_js_imports(content)
+
+    assert specs == ["react", "./a", "./styles.css", "../b", "./c", "@scope/pkg/sub"]
+
+
+# --- resolution ---
+
+
+@pytest.fixture
+def resolver():
+    files = [
+        "src/core/__init__.py",
+        "src/core/store.py",
+        "src/core/utils/__init__.py",
+        "src/core/utils/text.py",
+        "scripts/tool.py",
+        "scripts/helpers.py",
+        "src/ui/button.ts",
+        "src/ui/index.ts",
+        "src/ui/theme/index.tsx",
+    ]
+    return ImportResolver(files, MODULES)
+
+
+def test_resolve_python_absolute(resolver):
+    assert resolver.resolve("src/core/store.py", "core.utils.text") == ("internal", "src/core/utils/text.py")
+    # from core.store import Store 回退到 core.store
+    assert resolver.resolve("scripts/tool.py", "core.store.Store") == ("internal", "src/core/store.py")
+    # 非包目录中的脚本以文件名互相导入
+    assert resolver.resolve("scripts/tool.py", "helpers") == ("internal", "scripts/helpers.py")
+    assert resolver.resolve("scripts/tool.py", "os.path") == ("external", "os")
+
+
+def test_resolve_python_relative(resolver):
+    assert resolver.resolve("src/core/utils/text.py", "..store.Store") == ("internal", "src/core/store.py")
+    assert resolver.resolve("src/core/store.py", ".utils") == ("internal", "src/core/utils/__init__.py")
+    assert resolver.resolve("src/core/utils/__init__.py", ".text") == ("internal", "src/core/utils/text.py")
+    assert resolver.resolve("src/core/store.py", "....missing") == (None, None)
+
+
+def test_resolve_js(resolver):
+    assert resolver.resolve("src/ui/index.ts", "./button") == ("internal", "src/ui/button.ts")
+    assert resolver.resolve("src/ui/index.ts", "./button.js") == ("internal", "src/ui/button.ts")
+    assert resolver.resolve("src/ui/button.ts", "./theme") == ("internal", "src/ui/theme/index.tsx")
+    assert resolver.resolve("src/core/x.ts", "@/ui") == ("internal", "src/ui/index.ts")
+    assert resolver.resolve("src/ui/index.ts", "./missing") == (None, None)
+    assert resolver.resolve("src/ui/index.ts", "@scope/pkg/sub") == ("external", "@scope/pkg")
+    assert resolver.resolve("src/ui/index.ts", "lodash/fp") == ("external", "lodash")
+    # monorepo 子包按包名解析到 discover_modules 的模块
+    assert resolver.resolve("src/ui/index.ts", "@acme/shared") == ("internal", "packages/shared")
+
+
+# --- graph ---
+
+
+@pytest.fixture
+def project(tmp_path):
+    files = {
+        "src/core/__init__.py": "",
+        "src/core/store.py": "import json\nfrom core.cache import Cache\n",
+        "src/core/cache.py": "import os\n",
+        "src/ui/index.ts": "import { Store } from '../core/api';\nimport React from 'react';\n",
+        "src/core/api.ts": "export const api = 1;\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    (tmp_path / ".mini-wiki").mkdir()
+    return tmp_path
+
+
+def _checksums(root, **overrides):
+    checksums = {
+        p.relative_to(root).as_posix(): "h0"
+        for p in root.rglob("*") if p.is_file() and ".mini-wiki" not in p.parts
+    }
+    checksums.update(overrides)
+    return checksums
+
+
+def test_update_import_graph_builds_and_persists(project):
+    counts = update_import_graph(str(project), _checksums(project), MODULES, workers=1)
+    graph = load_import_graph(str(project / ".mini-wiki"))
+
+    assert counts == {"updated": 5, "removed": 0, "edges": 2}
+    assert graph["files"]["src/core/store.py"]["internal"] == ["src/core/cache.py"]
+    assert graph["files"]["src/core/store.py"]["external"] == ["json"]
+    assert graph["files"]["src/ui/index.ts"]["internal"] == ["src/core/api.ts"]
+
+
+def test_update_import_graph_is_incremental(project):
+    wiki_dir = str(project / ".mini-wiki")
+    update_import_graph(str(project), _checksums(project), MODULES, workers=1)
+    assert update_import_graph(str(project), _checksums(project), MODULES, workers=1)["updated"] == 0
+
+    (project / "src/core/cache.py").unlink()
+    (project / "src/core/store.py").write_text("import yaml\n", encoding="utf-8")
+    checksums = _checksums(project, **{"src/core/store.py": "h1"})
+    counts = update_import_graph(str(project), checksums, MODULES, workers=1)
+
+    graph = load_import_graph(wiki_dir)
+    assert counts == {"updated": 1, "removed": 1, "edges": 1}
+    assert "src/core/cache.py" not in graph["files"]
+    assert graph["files"]["src/core/store.py"]["external"] == ["yaml"]
+
+
+def test_module_dependencies(project):
+    wiki_dir = str(project / ".mini-wiki")
+    cache_store.save_document(wiki_dir, "structure", {"modules": MODULES})
+    assert load_module_dependencies(wiki_dir) == {}
+
+    update_import_graph(str(project), _checksums(project), workers=1)
+    deps = load_module_dependencies(wiki_dir)
+
+    assert deps["ui"] == {"internal": ["core"], "external": ["react"]}
+    # 模块内部的依赖不计入
+    assert deps["core"] == {"internal": [], "external": ["json", "os"]}
+    assert deps["shared"] == {"internal": [], "external": []}
+
+
+def test_module_dependencies_ignores_files_outside_modules():
+    graph = {"files": {"tools/x.py": {"internal": ["src/core/a.py"], "external": ["os"]}}}
+
+    assert module_dependencies(graph, MODULES)["core"] == {"internal": [], "external": []}
@@ -0,0 +1,88 @@
+"""Tests for scripts/js_lexer.py."""
+
+from js_lexer import parse_class_member, skip_balanced, tokenize
+
+
+def _values(content):
+    return [(t.kind, t.value) for t in tokenize(content)]
+
+
+def test_tokenize_skips_plain_comments_and_keeps_docs():
+    tokens = _values("// line\n/* block */\n/** Doc */ x")
+
+    assert tokens == [("doc", " Doc "), ("ident", "x")]
+
+
+def test_tokenize_strings_are_single_tokens():
+    tokens = _values("f('a /* b', \"c // d\")")
+
+    assert tokens == [
+        ("ident", "f"), ("punct", "("), ("string", "'a /* b'"),
+        ("punct", ","), ("string", '"c // d"'), ("punct", ")"),
+    ]
+
+
+def test_tokenize_template_interpolation():
+    tokens = _values("`a ${ {b: 1}.b } /** c */` + d")
+
+    assert tokens == [
+        ("template", "`"), ("punct", "{"), ("ident", "b"), ("punct", ":"),
+        ("number", "1"), ("punct", "}"), ("punct", "."), ("ident", "b"),
+        ("punct", "+"), ("ident", "d"),
+    ]
+
+
+def test_tokenize_regex_vs_division():
+    assert _values("x = /a\\/b/g")[-1] == ("regex", "/a\\/b/g")
+    assert [v for _, v in _values("a / b / c")] == ["a", "/", "b", "/", "c"]
+
+
+def test_tokenize_unterminated_input():
+    assert _values("/** open")[0] == ("doc", " open")
+    assert _values("'open")[0] == ("string", "'open")
+
+
+def test_skip_balanced():
+    tokens = tokenize("(a, (b), c) => d")
+
+    assert tokens[skip_balanced(tokens, 0)].value == "=>"
+
+
+def _members(content):
+    tokens = tokenize(content)
+    members, i = [], 0
+    while i < len(tokens):
+        member = parse_class_member(content, tokens, i)
+        if member is None:
+            i += 1
+            continue
+        members.append(member)
+        i = member.end
+    return tokens, members
+
+
+def test_parse_class_member_methods_and_fields():
+    content = (
+        "@Dec() private async load<T>(id: string): { a: T } { return null }\n"
+        "handler = (e: Event): void => { this.run() }\n"
+        "readonly store: Store = new Store()\n"
+        "get size(): number { return 1 }\n"
+        "area(): number\n"
+    )
+
+    tokens, members = _members(content)
+
+    assert [(m.name, m.kind, m.modifiers) for m in members] == [
+        ("load", "method", ("private", "async")),
+        ("handler", "method", ()),
+        ("store", "field", ("readonly",)),
+        ("size", "method", ("get",)),
+        ("area", "method", ()),
+    ]
+    load, handler, store, _, area = members
+    assert [t.value for t in tokens[slice(*load.type_range)]] == ["{", "a", ":", "T", "}"]
+    assert tokens[load.body + 1].value == "return"
+    assert tokens[handler.body + 1].value == "this"
+    assert [t.value for t in tokens[slice(*store.type_range)]] == ["Store"]
+    assert [t.value for t in tokens[slice(*store.value_range)]] == ["new", "Store", "(", ")"]
+    assert area.body == -1
@@ -0,0 +1,159 @@
+"""Tests for scripts/module_priority.py."""
+
+import math
+import os
+
+import pytest
+
+import cache_store
+from module_priority import (
+    ModuleStats,
+    collect_module_stats,
+    count_lines,
+    rank_project_modules,
+    save_priority,
+    score_modules,
+)
+from wiki_config import load_priority_settings
+
+MODULES = [
+    {"name": "core", "path": "src/core"},
+    {"name": "ui", "path": "src/ui"},
+    {"name": "utils", "path": "src/utils"},
+]
+
+
+def _graph(edges):
+    files = {}
+    for source, target in edges:
+        files.setdefault(source, {"internal": [], "external": []})["internal"].append(target)
+    return {"files": files}
+
+
+def test_count_lines(tmp_path):
+    (tmp_path / "a.py").write_text("a\nb\nc", encoding="utf-8")
+    (tmp_path / "b.py").write_text("", encoding="utf-8")
+
+    assert count_lines(str(tmp_path / "a.py")) == 3
+    assert count_lines(str(tmp_path / "b.py")) == 0
+    assert count_lines(str(tmp_path / "missing.py")) == 0
+
+
+def test_score_modules_ranks_by_dependents():
+    graph = _graph([("src/core/a.py", "src/utils/u.py"), ("src/ui/b.ts", "src/utils/u.ts"),
+                    ("src/ui/b.ts", "src/core/a.ts")])
+    stats = {name: ModuleStats(lines=100, latest_mtime_ns=1) for name in ("core", "ui", "utils")}
+
+    ranking = score_modules(MODULES, [], [], graph, stats)
+
+    assert [p.name for p in ranking] == ["utils", "core", "ui"]
+    assert ranking[0].dependents == 2
+    assert ranking[0].factors["dependency_count"] == 1.0
+    assert ranking[1].factors["dependency_count"] == 0.5
+
+
+def test_score_modules_factors():
+    graph = _graph([("src/main.py", "src/ui/app.py")])
+    stats = {
+        "core": ModuleStats(lines=1000, latest_mtime_ns=100, has_readme=True),
+        "ui": ModuleStats(lines=10, latest_mtime_ns=300),
+        "utils": ModuleStats(lines=0, latest_mtime_ns=200),
+    }
+
+    ranking = {p.name: p for p in score_modules(MODULES, ["src/main.py", "src/utils/cli.py"],
+                                                ["src/ui/README.md"], graph, stats)}
+
+    assert ranking["utils"].factors["entry_point"] == 1.0
+    # 只被入口文件导入
+    assert ranking["ui"].factors["entry_point"] == 0.5
+    assert ranking["core"].factors["has_docs"] == 1.0
+    assert ranking["ui"].factors["has_docs"] == 1.0
+    assert ranking["core"].factors["code_lines"] == 1.0
+    assert ranking["utils"].factors["code_lines"] == 0.0
+    assert ranking["ui"].factors["recent_modified"] == 1.0
+    assert ranking["utils"].factors["recent_modified"] == 0.5
+    assert ranking["core"].score == 3 + 2
+    assert ranking["ui"].score == pytest.approx(0.5 * 5 + 3 + 2 * math.log1p(10) / math.log1p(1000) + 1,
+                                                abs=1e-3)
+
+
+def test_score_modules_custom_weights():
+    stats = {"core": ModuleStats(lines=10), "ui": ModuleStats(lines=100, has_readme=True),
+             "utils": ModuleStats()}
+    weights = {"entry_point": 5, "dependency_count": 4, "has_docs": 0, "code_lines": 0,
+               "recent_modified": 1}
+
+    ranking = score_modules(MODULES, ["src/core/index.ts"], [], {"files": {}}, stats, weights)
+
+    assert ranking[0].name == "core"
+    assert ranking[1].score == 0
+
+
+def test_load_priority_settings_overrides(tmp_path):
+    (tmp_path / ".mini-wiki").mkdir()
+    (tmp_path / ".mini-wiki" / "config.yaml").write_text(
+        "domain_hierarchy:\n"
+        "  priority_weights:\n"
+        "    code_lines: 6\n"
+        "    unknown: 3\n"
+        "    has_docs: high\n"
+        "  skip_modules: [examples]\n",
+        encoding="utf-8",
+    )
+
+    settings = load_priority_settings(str(tmp_path))
+
+    assert settings.weights["code_lines"] == 6
+    assert settings.weights["has_docs"] == 3
+    assert "unknown" not in settings.weights
+    assert settings.skip_modules == ["examples"]
+
+
+def test_collect_module_stats(tmp_path):
+    (tmp_path / "src" / "core").mkdir(parents=True)
+    (tmp_path / "src" / "core" / "a.py").write_text("x = 1\ny = 2\n", encoding="utf-8")
+    (tmp_path / "src" / "core" / "notes.txt").write_text("ignored\n", encoding="utf-8")
+    (tmp_path / "src" / "core" / "README.md").write_text("# core\n", encoding="utf-8")
+    (tmp_path / "src" / "ui").mkdir()
+    files = [os.path.join("src", "core", "a.py"), os.path.join("src", "core", "notes.txt")]
+
+    stats = collect_module_stats(str(tmp_path), MODULES[:2], files,
+                                 {os.path.join("src", "core", "a.py"): {"size": 12, "mtime_ns": 42}})
+
+    assert stats["core"] == ModuleStats(lines=2, bytes=12, latest_mtime_ns=42, has_readme=True)
+    assert stats["ui"] == ModuleStats()
+
+
+def test_rank_project_modules_and_save_priority(tmp_path):
+    files = {
+        "src/main.py": "from core.store import Store\n",
+        "src/core/__init__.py": "",
+        "src/core/store.py": "from utils.text import slug\n\n\nclass Store:\n    pass\n",
+        "src/utils/__init__.py": "",
+        "src/utils/text.py": "def slug(s):\n    return s\n",
+        "src/examples/__init__.py": "",
+        "src/examples/demo.py": "import core\n",
+    }
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    wiki_dir = tmp_path / ".mini-wiki"
+    wiki_dir.mkdir()
+    (wiki_dir / "config.yaml").write_text("domain_hierarchy:\n  skip_modules: [examples]\n",
+                                          encoding="utf-8")
+    cache_store.save_document(str(wiki_dir), "progress", {"completed_modules": ["utils", "gone"]})
+
+    ranking = rank_project_modules(str(tmp_path), workers=1)
+    progress = save_priority(str(wiki_dir), ranking)
+
+    assert [p.name for p in ranking] == ["utils", "core"]
+    # utils 被 core 依赖，core 被入口文件 src/main.py 导入
+    assert ranking[0].dependents == 1
+    assert ranking[1].factors["entry_point"] == 0.5
+    saved = cache_store.load_document(str(wiki_dir), "progress")
+    assert saved == progress
+    assert saved["total_modules"] == 2
+    assert saved["completed_modules"] == ["utils"]
+    assert saved["pending_modules"] == ["core"]
+    assert [m["name"] for m in saved["module_priority"]] == ["utils", "core"]
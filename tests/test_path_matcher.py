@@ -0,0 +1,142 @@
+"""Tests for scripts/path_matcher.py."""
+
+import os
+
+from file_walker import walk_project
+from path_matcher import ExcludeMatcher, IgnoreFile, PathMatcher, parse_ignore_lines
+
+
+def test_exclude_matcher_names():
+    matcher = ExcludeMatcher({"node_modules", "dist/"})
+
+    assert matcher.excludes_dir("node_modules")
+    assert matcher.excludes_dir("dist")
+    assert not matcher.excludes_dir("src")
+
+
+def test_exclude_matcher_suffixes():
+    matcher = ExcludeMatcher({"*.min.js", "*.test.ts"})
+
+    assert matcher.excludes_file("bundle.min.js")
+    assert matcher.excludes_file("app.test.ts")
+    assert not matcher.excludes_file("app.ts")
+
+
+def test_exclude_matcher_globs():
+    matcher = ExcludeMatcher({"test_*", "*.gen.*"})
+
+    assert matcher.excludes_file("test_app.py")
+    assert matcher.excludes_file("api.gen.ts")
+    assert not matcher.excludes_file("app_test.py")
+
+
+def test_exclude_matcher_contains_for_walker():
+    matcher = ExcludeMatcher({".git"})
+
+    assert ".git" in matcher
+    assert "src" not in matcher
+
+
+# --- gitignore rules ---
+
+
+def _ignore(text):
+    return IgnoreFile(parse_ignore_lines(text.splitlines()))
+
+
+def test_parse_ignore_lines_skips_comments_and_blanks():
+    rules = parse_ignore_lines(["# comment", "", "build/", "!keep.log", "\\#literal"])
+
+    assert [r.pattern for r in rules] == ["build", "keep.log", "#literal"]
+    assert rules[0].dir_only is True
+    assert rules[1].negated is True
+
+
+def test_ignore_basename_pattern_matches_any_depth():
+    rules = _ignore("*.log\n")
+
+    assert rules.match("a.log", False) is True
+    assert rules.match("deep/nested/a.log", False) is True
+    assert rules.match("a.py", False) is None
+
+
+def test_ignore_anchored_pattern():
+    rules = _ignore("/out\ndocs/gen\n")
+
+    assert rules.match("out", True) is True
+    assert rules.match("src/out", True) is None
+    assert rules.match("docs/gen", True) is True
+    assert rules.match("x/docs/gen", True) is None
+
+
+def test_ignore_dir_only_pattern():
+    rules = _ignore("cache/\n")
+
+    assert rules.match("cache", True) is True
+    assert rules.match("cache", False) is None
+
+
+def test_ignore_negation_last_match_wins():
+    rules = _ignore("*.ts\n!keep.ts\n")
+
+    assert rules.match("a.ts", False) is True
+    assert rules.match("keep.ts", False) is False
+
+
+def test_ignore_double_star():
+    rules = _ignore("**/generated\nproto/**\nsrc/**/*.pb.ts\n")
+
+    assert rules.match("generated", True) is True
+    assert rules.match("a/b/generated", True) is True
+    assert rules.match("proto/a/b.proto", False) is True
+    assert rules.match("src/api.pb.ts", False) is True
+    assert rules.match("src/a/b/api.pb.ts", False) is True
+
+
+def test_path_matcher_nested_gitignore(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.gen.py\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("!keep.gen.py\nlocal/\n")
+    matcher = PathMatcher(tmp_path, ExcludeMatcher(set()))
+
+    assert matcher.is_ignored("a.gen.py", False) is True
+    assert matcher.is_ignored(os.path.join("pkg", "x.gen.py"), False) is True
+    assert matcher.is_ignored(os.path.join("pkg", "keep.gen.py"), False) is False
+    assert matcher.is_ignored(os.path.join("pkg", "local"), True) is True
+    assert matcher.is_ignored("local", True) is False
+
+
+def test_path_matcher_mini_wiki_ignore_overrides(tmp_path):
+    (tmp_path / ".gitignore").write_text("vendor/\n")
+    (tmp_path / ".mini-wikiignore").write_text("!vendor/\nfixtures/\n")
+    matcher = PathMatcher(tmp_path, ExcludeMatcher(set()))
+
+    assert matcher.is_ignored("vendor", True) is False
+    assert matcher.is_ignored(os.path.join("tests", "fixtures"), True) is True
+
+
+def test_path_matcher_is_path_ignored_checks_ancestors(tmp_path):
+    (tmp_path / ".gitignore").write_text("build/\n")
+    matcher = PathMatcher(tmp_path, ExcludeMatcher(set()))
+
+    assert matcher.is_path_ignored(os.path.join("build", "x", "a.py")) is True
+    assert matcher.is_path_ignored(os.path.join("src", "a.py")) is False
+
+
+def test_walk_never_enters_ignored_dirs(tmp_path):
+    (tmp_path / ".gitignore").write_text("out/\n")
+    (tmp_path / "out" / "deep").mkdir(parents=True)
+    (tmp_path / "out" / "deep" / "a.py").write_text("")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "b.py").write_text("")
+    matcher = PathMatcher(tmp_path, ExcludeMatcher(set()))
+    seen = []
+
+    def path_filter(rel_path, is_dir):
+        seen.append(rel_path)
+        return matcher.is_ignored(rel_path, is_dir)
+
+    rel_paths = [e.rel_path for e in walk_project(tmp_path, set(), path_filter)]
+
+    assert rel_paths == [".gitignore", os.path.join("src", "b.py")]
+    assert not any(p.startswith("out" + os.sep) for p in seen)
@@ -0,0 +1,94 @@
+"""Tests for scripts/symbol_index.py."""
+
+import pytest
+
+import cache_store
+from detect_changes import detect_changes, update_checksums_cache
+from symbol_index import build_index, find_symbols, get_index_path, sync_index
+
+STORE_PY = '''class Store:
+    """Key-value store."""
+
+    def get(self, key):
+        """Get a value."""
+        return key
+
+
+def get_store():
+    """Create a store."""
+    return Store()
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "src" / "store").mkdir(parents=True)
+    (tmp_path / "src" / "store" / "store.py").write_text(STORE_PY, encoding="utf-8")
+    (tmp_path / "src" / "ui").mkdir()
+    (tmp_path / "src" / "ui" / "button.ts").write_text(
+        "/** Render a button. */\nexport function renderButton() {}\n", encoding="utf-8")
+    wiki = tmp_path / ".mini-wiki"
+    (wiki / "wiki" / "modules").mkdir(parents=True)
+    (wiki / "wiki" / "modules" / "store.md").write_text("# store\n", encoding="utf-8")
+    cache_store.save_document(str(wiki), "structure", {"modules": [
+        {"name": "store", "path": "src/store"},
+        {"name": "ui", "path": "src/ui"},
+    ]})
+    return tmp_path
+
+
+def _checksums(root):
+    return detect_changes(str(root), track_symbols=False)["current_checksums"]
+
+
+def test_build_and_exact_lookup(project):
+    counts = build_index(str(project), _checksums(project), workers=1)
+    wiki_dir = str(project / ".mini-wiki")
+
+    assert counts == {"updated": 2, "removed": 0, "symbols": 4}
+    [store] = find_symbols(wiki_dir, "Store")
+    assert (store.kind, store.file, store.line) == ("class", "src/store/store.py", 1)
+    assert (store.module, store.page) == ("store", "modules/store.md")
+    # 方法可以按限定名或短名查询
+    assert [s.name for s in find_symbols(wiki_dir, "Store.get")] == ["Store.get"]
+    assert [s.name for s in find_symbols(wiki_dir, "get")] == ["Store.get"]
+
+
+def test_prefix_lookup(project):
+    build_index(str(project), _checksums(project), workers=1)
+
+    names = [s.name for s in find_symbols(str(project / ".mini-wiki"), "get", prefix=True)]
+
+    assert names == ["Store.get", "get_store"]
+
+
+def test_sync_index_is_incremental(project):
+    wiki_dir = str(project / ".mini-wiki")
+    build_index(str(project), _checksums(project), workers=1)
+    assert sync_index(str(project), _checksums(project), workers=1)["updated"] == 0
+
+    (project / "src" / "ui" / "button.ts").unlink()
+    (project / "src" / "store" / "store.py").write_text(
+        STORE_PY.replace("def get_store", "def make_store"), encoding="utf-8")
+    counts = sync_index(str(project), _checksums(project), workers=1)
+
+    assert counts == {"updated": 1, "removed": 1, "symbols": 3}
+    assert find_symbols(wiki_dir, "renderButton") == []
+    assert find_symbols(wiki_dir, "get_store") == []
+    assert [s.name for s in find_symbols(wiki_dir, "make_store")] == ["make_store"]
+
+
+def test_sync_index_uses_checksums_cache_and_doc_mapping(project):
+    changes = detect_changes(str(project))
+    update_checksums_cache(str(project), changes["current_checksums"],
+                           doc_mapping={"src/ui/button.ts": "api/ui.md"})
+
+    sync_index(str(project), workers=1)
+
+    [button] = find_symbols(str(project / ".mini-wiki"), "renderButton")
+    assert button.page == "api/ui.md"
+
+
+def test_find_symbols_without_index(tmp_path):
+    assert find_symbols(str(tmp_path / ".mini-wiki"), "x") == []
+    assert not get_index_path(str(tmp_path / ".mini-wiki")).exists()
@@ -0,0 +1,40 @@
+"""Tests for scripts/wiki_config.py."""
+
+from init_wiki import init_mini_wiki
+from wiki_config import load_config, load_scan_settings
+
+
+def _write_config(root, text):
+    wiki = root / ".mini-wiki"
+    wiki.mkdir(exist_ok=True)
+    (wiki / "config.yaml").write_text(text, encoding="utf-8")
+
+
+def test_load_config_missing(tmp_path):
+    assert load_config(str(tmp_path)) == {}
+
+
+def test_load_config_invalid_yaml(tmp_path):
+    _write_config(tmp_path, "exclude: [unterminated\n")
+    assert load_config(str(tmp_path)) == {}
+
+
+def test_load_scan_settings_from_default_config(tmp_path):
+    init_mini_wiki(str(tmp_path))
+
+    settings = load_scan_settings(str(tmp_path), {".mini-wiki"})
+
+    assert settings.max_file_size == 100000
+    assert settings.matcher.excludes_dir("node_modules")
+    assert settings.matcher.excludes_dir(".mini-wiki")
+
+
+def test_load_scan_settings_merges_patterns(tmp_path):
+    _write_config(tmp_path, "exclude:\n  - generated\n  - '*.pb.go'\n")
+
+    settings = load_scan_settings(str(tmp_path), {"node_modules"})
+
+    assert settings.matcher.excludes_dir("generated")
+    assert settings.matcher.excludes_dir("node_modules")
+    assert settings.matcher.excludes_file("api.pb.go")
+    assert settings.max_file_size is None